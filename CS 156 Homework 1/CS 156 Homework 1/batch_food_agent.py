@@ -0,0 +1,226 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import ctypes
+import json
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+from sys import argv, stdout
+
+from board_components import ConnectedComponents
+from board_printer import direction_letters
+from board_square import BoardSquare
+from board_square_type import BoardSquareType
+from board_state import BoardState
+from compact_board import CompactBoard
+from food_agent_ai import FoodAgentAI
+from tiled_board import TiledBoard
+import board_state_generator
+import food_agent
+import maze_file
+import tiled_board
+
+
+QUERIES_PER_TASK = 64
+
+'''The FoodAgentAI of a worker process, set up by _init_worker.'''
+_worker_ai = None
+
+
+def print_error(error_message):
+    print('')
+    print(error_message)
+    print('')
+    print('Usage: batch_food_agent.py [file name] [queries file name] '
+          '[heuristic name] [engine name] [process count]')
+    print('\t[queries file name] -> one "start_x start_y goal_x goal_y" '
+          'query per line')
+    print('\t[heuristic name] -> ' + '|'.join(_heuristic_names()))
+    print('\t[engine name] -> ' + '|'.join(sorted(food_agent.engine_map)) +
+          ' (optional, default ' + food_agent.DEFAULT_ENGINE_NAME + ')')
+    print('\t[process count] -> (optional, default one per CPU)')
+
+
+def _heuristic_names():
+    return sorted(list(food_agent.heuristic_map) +
+                  list(food_agent.board_heuristic_map))
+
+
+def share_board(board):
+    """Copies the squares of a CompactBoard into shared memory. Returns the
+    shared ctypes array, which worker processes can wrap in a CompactBoard
+    without copying."""
+    num_cells = len(board.cells)
+    shared_cells = RawArray(ctypes.c_ubyte, num_cells)
+    cells = (ctypes.c_ubyte * num_cells).from_buffer(board.cells)
+    ctypes.memmove(shared_cells, cells, num_cells)
+    return shared_cells
+
+
+def read_queries(queries_file):
+    """Yields (start, goal) pairs of BoardSquares from lines of
+    "start_x start_y goal_x goal_y". Blank lines and lines starting with #
+    are skipped."""
+    for line_number, line in enumerate(queries_file, 1):
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        if len(fields) != 4:
+            raise ValueError('Line ' + str(line_number) +
+                             ' of the queries does not have four numbers')
+        start_x, start_y, goal_x, goal_y = [int(field) for field in fields]
+        yield BoardSquare(start_x, start_y), BoardSquare(goal_x, goal_y)
+
+
+def _init_worker(width, height, shared_cells, maze_file_path, heuristic,
+                 engine_name):
+    """Wraps the shared squares in a board for this worker process, or opens
+    the .maze or .tiles file if there is one. The board's components are
+    labelled once, so queries between them fail without searching, except
+    on a TiledBoard, which may be too large to label."""
+    global _worker_ai
+    if maze_file_path is not None:
+        board = board_state_generator.generate_from_file(maze_file_path).board
+    else:
+        board = CompactBoard(width, height, cells=shared_cells)
+    components = None
+    if not isinstance(board, TiledBoard):
+        components = ConnectedComponents.for_board(board)
+    board_state = BoardState(board, 0, 0)
+    _worker_ai = FoodAgentAI(board_state, heuristic,
+                             food_agent.engine_map[engine_name],
+                             components=components)
+
+
+def _is_open(board, location):
+    return 0 <= location.x < board.width and \
+        0 <= location.y < board.height and \
+        board.get_square(location.x, location.y) != BoardSquareType.wall
+
+
+def solve_query(query):
+    """Solves one (start, goal) query in a worker process. Returns the
+    result as a line of JSON."""
+    start, goal = query
+    ai = _worker_ai
+    board = ai.board_state.board
+    result = {
+        'start': [start.x, start.y],
+        'goal': [goal.x, goal.y],
+        'path_length': None,
+        'directions': None,
+        'expansions': 0,
+    }
+    if _is_open(board, start) and _is_open(board, goal):
+        ai.board_state.agent.set_location(start)
+        ai.find_path(goal_location=goal)
+        result['expansions'] = ai.nodes_expanded
+        if not ai.board_is_unsolvable:
+            # Ignore agent start position node.
+            directions = ai.movement_path_list[1:]
+            result['path_length'] = len(directions)
+            result['directions'] = ''.join(direction_letters[direction]
+                                           for direction in directions)
+    return json.dumps(result, sort_keys=True)
+
+
+def solve_queries(board, queries, heuristic, engine_name,
+                  process_count=None, maze_file_path=None):
+    """Solves (start, goal) queries on a CompactBoard with a pool of worker
+    processes that share its squares. Yields one line of JSON per query, in
+    the order of queries, as soon as it is solved.
+
+    If the board was opened from maze_file_path, a .maze or .tiles file,
+    each worker opens that file instead, so they share its pages without
+    copying it into shared memory."""
+    shared_cells = None
+    if maze_file_path is None:
+        shared_cells = share_board(board)
+    pool = multiprocessing.Pool(
+        processes=process_count,
+        initializer=_init_worker,
+        initargs=(board.width, board.height, shared_cells, maze_file_path,
+                  heuristic, engine_name))
+    try:
+        for result in pool.imap(solve_query, queries, QUERIES_PER_TASK):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+class _NamedHeuristic(object):
+    """A heuristic from food_agent.heuristic_map that can be sent to worker
+    processes."""
+
+    def __init__(self, name):
+        self.name = name
+        self._heuristic = food_agent.heuristic_map[name]
+
+    def __call__(self, p1, p2):
+        return self._heuristic(p1, p2)
+
+    def __getstate__(self):
+        return self.name
+
+    def __setstate__(self, name):
+        self.__init__(name)
+
+
+def main(args):
+    NUM_SUPPORTED_PROGRAM_ARGS = 3
+    NUM_OPTIONAL_PROGRAM_ARGS = 2
+    # Python passes in the name of the executed module as the first argument
+    NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
+    num_args = len(args)
+    if not NUM_EXPECTED_ARGS <= num_args <= \
+            NUM_EXPECTED_ARGS + NUM_OPTIONAL_PROGRAM_ARGS:
+        print_error('You must enter three arguments.')
+        return
+    ascii_board_file_path, queries_file_path, heuristic_name = args[1:4]
+    engine_name = food_agent.DEFAULT_ENGINE_NAME
+    if num_args > NUM_EXPECTED_ARGS:
+        engine_name = args[4]
+    process_count = None
+    if num_args > NUM_EXPECTED_ARGS + 1:
+        process_count = int(args[5])
+    if heuristic_name not in _heuristic_names():
+        print_error('Invalid heuristic name "' + heuristic_name + '"')
+        return
+    if engine_name not in food_agent.engine_map:
+        print_error('Invalid engine name "' + engine_name + '"')
+        return
+    if tiled_board.is_tiles_file(ascii_board_file_path) and \
+            (engine_name not in food_agent.bounded_engine_names or
+             heuristic_name in food_agent.board_heuristic_map):
+        print_error(food_agent.bounded_board_error())
+        return
+
+    board = board_state_generator.generate_from_file(
+        ascii_board_file_path, compact=True).board
+    if heuristic_name in food_agent.board_heuristic_map:
+        heuristic = food_agent.board_heuristic_map[heuristic_name](
+            board, ascii_board_file_path)
+    else:
+        # Lambdas cannot be sent to worker processes, so the workers look
+        # the heuristic up by name.
+        heuristic = _NamedHeuristic(heuristic_name)
+    with open(queries_file_path, 'r') as queries_file:
+        try:
+            # Read up front so a bad line is reported before any work.
+            queries = list(read_queries(queries_file))
+        except ValueError as error:
+            print_error(str(error))
+            return
+    maze_file_path = None
+    if maze_file.is_maze_file(ascii_board_file_path) or \
+            tiled_board.is_tiles_file(ascii_board_file_path):
+        maze_file_path = ascii_board_file_path
+    for result in solve_queries(board, queries, heuristic, engine_name,
+                                process_count, maze_file_path):
+        stdout.write(result + '\n')
+    stdout.flush()
+
+
+if __name__ == '__main__':
+    main(argv)
@@ -0,0 +1,3 @@
+"""Benchmarks for FoodAgentAI on generated boards. Run from the directory
+above this one, for example: python -m benchmarks.run_benchmarks"""
+__author__ = "Christopher Raleigh and Anthony Ferrero"
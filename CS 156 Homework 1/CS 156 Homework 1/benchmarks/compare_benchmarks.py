@@ -0,0 +1,86 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import json
+from sys import argv
+
+DEFAULT_TOLERANCE = 0.2
+CASE_FIELDS = ('generator', 'size', 'seed', 'heuristic', 'engine',
+               'epsilon')
+'''Values of case fields missing from results written before the field was
+added.'''
+case_field_defaults = {
+    'epsilon': 1.0,
+}
+'''Fields that should only change when the search itself changes.'''
+EXACT_FIELDS = ('path_length', 'nodes_expanded')
+'''Fields that are noisy, so only growth beyond the tolerance, and by at
+least the given amount, is reported.'''
+measured_field_minimums = {
+    'setup_seconds': 0.01,
+    'search_seconds': 0.01,
+    'peak_memory_kb': 1024,
+}
+
+
+def print_error(error_message):
+    print('')
+    print(error_message)
+    print('')
+    print('Usage: python -m benchmarks.compare_benchmarks [old results file '
+          'name] [new results file name] [tolerance]')
+    print('\t[tolerance] -> how much a time or memory may grow, as a '
+          'fraction (optional, default ' + str(DEFAULT_TOLERANCE) + ')')
+
+
+def _results_by_case(results_file_path):
+    with open(results_file_path, 'r') as results_file:
+        results = json.load(results_file)['results']
+    return dict((tuple(result.get(field, case_field_defaults.get(field))
+                       for field in CASE_FIELDS), result)
+                for result in results)
+
+
+def regressions(old_results, new_results, tolerance=DEFAULT_TOLERANCE):
+    """Yields a line describing each change between two runs that may be a
+    regression, for the cases both runs have."""
+    for case in sorted(set(old_results) & set(new_results)):
+        old_result = old_results[case]
+        new_result = new_results[case]
+        case_name = ' '.join(str(part) for part in case)
+        for field in EXACT_FIELDS:
+            if old_result[field] != new_result[field]:
+                yield '%s: %s changed from %s to %s' % (
+                    case_name, field, old_result[field], new_result[field])
+        for field in sorted(measured_field_minimums):
+            old_value = old_result[field]
+            new_value = new_result[field]
+            if new_value > old_value * (1 + tolerance) and \
+                    new_value - old_value >= measured_field_minimums[field]:
+                yield '%s: %s grew from %s to %s' % (
+                    case_name, field, old_result[field], new_result[field])
+
+
+def main(args):
+    NUM_SUPPORTED_PROGRAM_ARGS = 2
+    NUM_OPTIONAL_PROGRAM_ARGS = 1
+    # Python passes in the name of the executed module as the first argument
+    NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
+    num_args = len(args)
+    if not NUM_EXPECTED_ARGS <= num_args <= \
+            NUM_EXPECTED_ARGS + NUM_OPTIONAL_PROGRAM_ARGS:
+        print_error('You must enter two arguments.')
+        return
+    tolerance = DEFAULT_TOLERANCE
+    if num_args > NUM_EXPECTED_ARGS:
+        try:
+            tolerance = float(args[3])
+        except ValueError as error:
+            print_error(str(error))
+            return
+    for line in regressions(_results_by_case(args[1]),
+                            _results_by_case(args[2]), tolerance):
+        print(line)
+
+
+if __name__ == '__main__':
+    main(argv)
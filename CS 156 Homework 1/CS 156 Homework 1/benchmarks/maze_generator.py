@@ -0,0 +1,136 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import binascii
+import random
+
+from board_square import BoardSquare
+from board_square_type import BoardSquareType
+from board_state import BoardState
+from compact_board import CompactBoard
+
+
+'''Each generator makes the same board for the same arguments and seed. The
+agent starts in the top left corner and the food is placed near the bottom
+right one, replacing any wall there.'''
+
+
+def random_walls(width, height, density, seed):
+    """Returns a board state where each square is a wall with probability
+    density, except the squares next to the agent and food, which are
+    cleared so that neither is walled in from the start. The board may
+    still be unsolvable."""
+    rng = random.Random(seed)
+    board = CompactBoard(width, height)
+    cells = board.cells
+    # A random byte below the threshold becomes a wall; the table turns
+    # whole rows of random bytes into squares at once.
+    threshold = int(round(density * 256))
+    table = bytearray([BoardSquareType.wall] * threshold +
+                      [BoardSquareType.empty] * (256 - threshold))
+    table = str(table)
+    for y in xrange(height):
+        row_bits = rng.getrandbits(8 * width)
+        row = binascii.unhexlify('%0*x' % (2 * width, row_bits))
+        row_start = board.index(0, y)
+        cells[row_start:row_start + width] = row.translate(table)
+    for x, y in [(1, 0), (0, 1), (1, 1), (width - 2, height - 1),
+                 (width - 1, height - 2), (width - 2, height - 2)]:
+        if 0 <= x < width and 0 <= y < height:
+            board.set_square(x, y, BoardSquareType.empty)
+    return _place_agent_and_food(board, BoardSquare(width - 1, height - 1))
+
+
+def recursive_division(width, height, seed):
+    """Returns a board state holding a perfect maze made by recursive
+    division: chambers are split by a wall with one gap until they are one
+    square wide. Walls only run along odd rows and columns and gaps only
+    fall on even ones, so every square with even x and y is connected to
+    every other."""
+    rng = random.Random(seed)
+    board = CompactBoard(width, height)
+    cells = board.cells
+    stride = board.stride
+    wall = BoardSquareType.wall
+    chambers = [(0, 0, width - 1, height - 1)]
+    while chambers:
+        left, top, right, bottom = chambers.pop()
+        chamber_width = right - left + 1
+        chamber_height = bottom - top + 1
+        # A wall across a corridor one square wide would be all gap.
+        if chamber_width < 2 or chamber_height < 2 or \
+                (chamber_width < 3 and chamber_height < 3):
+            continue
+        if chamber_height > chamber_width or \
+                (chamber_height == chamber_width and rng.random() < 0.5):
+            if chamber_height < 3:
+                continue
+            y = top + 1 + 2 * rng.randrange((bottom - top) // 2)
+            gap_x = left + 2 * rng.randrange((right - left) // 2 + 1)
+            row_start = board.index(left, y)
+            cells[row_start:row_start + chamber_width] = \
+                bytearray([wall]) * chamber_width
+            cells[board.index(gap_x, y)] = BoardSquareType.empty
+            chambers.append((left, top, right, y - 1))
+            chambers.append((left, y + 1, right, bottom))
+        else:
+            if chamber_width < 3:
+                continue
+            x = left + 1 + 2 * rng.randrange((right - left) // 2)
+            gap_y = top + 2 * rng.randrange((bottom - top) // 2 + 1)
+            column_start = board.index(x, top)
+            cells[column_start:column_start + chamber_height * stride:
+                  stride] = bytearray([wall]) * chamber_height
+            cells[board.index(x, gap_y)] = BoardSquareType.empty
+            chambers.append((left, top, x - 1, bottom))
+            chambers.append((x + 1, top, right, bottom))
+    food_location = BoardSquare((width - 1) & ~1, (height - 1) & ~1)
+    return _place_agent_and_food(board, food_location)
+
+
+def open_rooms(width, height, room_size, seed):
+    """Returns a board state divided into open rooms room_size squares
+    across, with a door at a random place in each wall between two
+    rooms."""
+    rng = random.Random(seed)
+    board = CompactBoard(width, height)
+    cells = board.cells
+    stride = board.stride
+    wall = BoardSquareType.wall
+    step = room_size + 1
+    for y in xrange(room_size, height, step):
+        row_start = board.index(0, y)
+        cells[row_start:row_start + width] = bytearray([wall]) * width
+    for x in xrange(room_size, width, step):
+        column_start = board.index(x, 0)
+        cells[column_start:column_start + height * stride:stride] = \
+            bytearray([wall]) * height
+    for y in xrange(room_size, height, step):
+        for left in xrange(0, width, step):
+            right = min(left + room_size, width)
+            cells[board.index(rng.randrange(left, right), y)] = \
+                BoardSquareType.empty
+    for x in xrange(room_size, width, step):
+        for top in xrange(0, height, step):
+            bottom = min(top + room_size, height)
+            cells[board.index(x, rng.randrange(top, bottom))] = \
+                BoardSquareType.empty
+    return _place_agent_and_food(board, BoardSquare(width - 1, height - 1))
+
+
+def _place_agent_and_food(board, food_location):
+    board.set_square(0, 0, BoardSquareType.empty)
+    if food_location.x != 0 or food_location.y != 0:
+        board.set_square(food_location.x, food_location.y,
+                         BoardSquareType.food)
+        board.set_food_location(food_location)
+    return BoardState(board, 0, 0)
+
+
+'''Maps each generator name to a function of (width, height, seed).'''
+generator_map = {
+    'random_walls': lambda width, height, seed:
+        random_walls(width, height, 0.25, seed),
+    'recursive_division': recursive_division,
+    'open_rooms': lambda width, height, seed:
+        open_rooms(width, height, 20, seed),
+}
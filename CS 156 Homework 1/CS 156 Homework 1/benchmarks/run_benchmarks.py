@@ -0,0 +1,155 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import json
+import multiprocessing
+import resource
+import time
+from sys import argv, stdout
+
+from food_agent_ai import FoodAgentAI
+from landmark_heuristic import LandmarkHeuristic
+from benchmarks.maze_generator import generator_map
+import food_agent
+
+
+SIZES = [10, 100, 500, 1000, 2000, 4000]
+DEFAULT_MAX_SIZE = 500
+SEED = 156
+'''Heuristics from food_agent.board_heuristic_map, built straight from the
+board so no table files are written.'''
+board_heuristic_builders = {
+    'landmarks': LandmarkHeuristic.build,
+}
+'''The weight given to the estimates of the weighted a_star cases. With no
+deadline, ARA* stops after its first pass, so the expansions repeat from
+one run to the next.'''
+WEIGHTED_EPSILON = 2.0
+'''Each (engine name, epsilon) pair run: every engine, then the built in
+A* as ARA*.'''
+search_modes = [(engine_name, 1.0)
+                for engine_name in sorted(food_agent.engine_map)] + \
+    [('a_star', WEIGHTED_EPSILON)]
+
+
+def print_error(error_message):
+    print('')
+    print(error_message)
+    print('')
+    print('Usage: python -m benchmarks.run_benchmarks [output file name] '
+          '[largest board size]')
+    print('\t[largest board size] -> boards from ' + str(SIZES[0]) + 'x' +
+          str(SIZES[0]) + ' up to this size are run (optional, default ' +
+          str(DEFAULT_MAX_SIZE) + ', at most ' + str(SIZES[-1]) + ')')
+
+
+def benchmark_cases(max_size=DEFAULT_MAX_SIZE, seed=SEED):
+    """Returns every (generator, size, heuristic, engine, epsilon) case to
+    run, as dicts, in a fixed order."""
+    heuristic_names = sorted(list(food_agent.heuristic_map) +
+                             list(board_heuristic_builders))
+    return [{'generator': generator_name,
+             'size': size,
+             'seed': seed,
+             'heuristic': heuristic_name,
+             'engine': engine_name,
+             'epsilon': epsilon}
+            for generator_name in sorted(generator_map)
+            for size in SIZES if size <= max_size
+            for heuristic_name in heuristic_names
+            for engine_name, epsilon in search_modes]
+
+
+def _peak_memory_kb():
+    # Linux reports ru_maxrss in kilobytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_case(case):
+    """Generates the board of a case and solves it. Returns the case with
+    its results added. setup_seconds covers building the heuristic and
+    engine, and peak_memory_kb is how much the peak memory of this process
+    grew while doing that and searching."""
+    size = case['size']
+    board_state = generator_map[case['generator']](size, size, case['seed'])
+    board = board_state.board
+    memory_before = _peak_memory_kb()
+    started = time.time()
+    heuristic_name = case['heuristic']
+    if heuristic_name in board_heuristic_builders:
+        heuristic = board_heuristic_builders[heuristic_name](board)
+    else:
+        heuristic = food_agent.heuristic_map[heuristic_name]
+    ai = FoodAgentAI(board_state, heuristic,
+                     food_agent.engine_map[case['engine']])
+    setup_seconds = time.time() - started
+    started = time.time()
+    ai.find_path(epsilon=case['epsilon'])
+    search_seconds = time.time() - started
+    result = dict(case)
+    result['setup_seconds'] = round(setup_seconds, 4)
+    result['search_seconds'] = round(search_seconds, 4)
+    result['nodes_expanded'] = ai.nodes_expanded
+    result['path_length'] = None
+    if not ai.board_is_unsolvable:
+        result['path_length'] = len(ai.movement_path_list) - 1
+    result['peak_memory_kb'] = _peak_memory_kb() - memory_before
+    return result
+
+
+def run_cases(cases):
+    """Runs each case in a new process, one at a time, so the peak memory
+    and time of one case do not affect another. Yields the results in
+    order."""
+    pool = multiprocessing.Pool(processes=1, maxtasksperchild=1)
+    try:
+        for result in pool.imap(run_case, cases):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def write_results(results, output_file):
+    """Writes results as JSON laid out one field per line in a fixed
+    order, so results from two commits can be compared with diff."""
+    json.dump({'results': results}, output_file, indent=2,
+              separators=(',', ': '), sort_keys=True)
+    output_file.write('\n')
+
+
+def main(args):
+    NUM_SUPPORTED_PROGRAM_ARGS = 1
+    NUM_OPTIONAL_PROGRAM_ARGS = 1
+    # Python passes in the name of the executed module as the first argument
+    NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
+    num_args = len(args)
+    if not NUM_EXPECTED_ARGS <= num_args <= \
+            NUM_EXPECTED_ARGS + NUM_OPTIONAL_PROGRAM_ARGS:
+        print_error('You must enter one argument.')
+        return
+    output_file_path = args[1]
+    max_size = DEFAULT_MAX_SIZE
+    if num_args > NUM_EXPECTED_ARGS:
+        try:
+            max_size = int(args[2])
+        except ValueError as error:
+            print_error(str(error))
+            return
+    if not SIZES[0] <= max_size <= SIZES[-1]:
+        print_error('Invalid largest board size "' + args[2] + '"')
+        return
+
+    results = []
+    for result in run_cases(benchmark_cases(max_size)):
+        results.append(result)
+        stdout.write('%(generator)s %(size)d %(heuristic)s %(engine)s '
+                     '%(epsilon)g: %(search_seconds).4fs, '
+                     '%(nodes_expanded)d expanded\n' % result)
+        stdout.flush()
+    with open(output_file_path, 'w') as output_file:
+        write_results(results, output_file)
+
+
+if __name__ == '__main__':
+    main(argv)
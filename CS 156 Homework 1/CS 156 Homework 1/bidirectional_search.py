@@ -0,0 +1,154 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from direction import opposite_directions
+from food_agent_ai import cell_heuristic, search_target
+from node import Node
+from node_priority_queue import NodePriorityQueue
+
+
+class BidirectionalAStar(object):
+    """New Bidirectional A* (NBA*, Pijls and Post) between the agent and the
+    food.
+
+    One A* runs forward from the agent towards the food and another
+    backward from the food towards the agent, both using the same
+    heuristic. Each square is expanded by at most one of them, and squares
+    that cannot improve on the best meeting point found so far are
+    rejected. When either frontier runs out, the best meeting point is
+    proven optimal (for a consistent heuristic such as manhattan)."""
+
+    name = 'bidirectional'
+
+    class _Side(object):
+        """The state of the search in one direction."""
+
+        def __init__(self, start_cell, estimate):
+            self.estimate = estimate
+            start_node = Node(agent_location=start_cell,
+                              direction=None,
+                              path_cost=0,
+                              cost=estimate(start_cell))
+            self.frontier = NodePriorityQueue(start_node)
+            '''Maps each cell reached from this side to the node with the
+            shortest known path to it.'''
+            self.nodes = {start_cell: start_node}
+            '''The least cost in the frontier, which no path through an
+            unexpanded square can beat.'''
+            self.bound = start_node.get_cost()
+            self.nodes_expanded = 0
+
+    def __init__(self, board, heuristic):
+        self.board = board
+        self._heuristic = heuristic
+        self.forward_nodes_expanded = 0
+        self.backward_nodes_expanded = 0
+        self.nodes_expanded = 0
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food returned by
+        Board.get_food_location, or to goal_cell if it is not None. Returns
+        None if it cannot be reached."""
+        board = self.board
+        target_location = search_target(board, goal_cell)
+        if target_location is None:
+            return None
+        target_cell = board.cell_id(target_location.x, target_location.y)
+        forward = self._Side(
+            start_cell,
+            cell_heuristic(board, self._heuristic, target_location))
+        backward = self._Side(
+            target_cell,
+            cell_heuristic(board, self._heuristic,
+                           board.cell_location(start_cell)))
+
+        '''Squares expanded or rejected by either side.'''
+        closed_cells = set()
+        best_path_cost = None
+        meeting_cell = None
+        if start_cell == target_cell:
+            best_path_cost = 0
+            meeting_cell = start_cell
+        while forward.frontier and backward.frontier:
+            if len(forward.frontier) <= len(backward.frontier):
+                side, other = forward, backward
+            else:
+                side, other = backward, forward
+            current_node = side.frontier.pop()
+            current_cell = current_node.get_agent_location()
+            if current_cell not in closed_cells:
+                closed_cells.add(current_cell)
+                path_cost = current_node.get_path_cost()
+                if best_path_cost is None or \
+                        (current_node.get_cost() < best_path_cost and
+                         path_cost + other.bound -
+                         other.estimate(current_cell) < best_path_cost):
+                    side.nodes_expanded += 1
+                    meeting = self._expand(side, other, current_node,
+                                           closed_cells)
+                    if meeting is not None and \
+                            (best_path_cost is None or
+                             meeting[0] < best_path_cost):
+                        best_path_cost, meeting_cell = meeting
+            if side.frontier:
+                side.bound = side.frontier.peek().get_cost()
+
+        self.forward_nodes_expanded = forward.nodes_expanded
+        self.backward_nodes_expanded = backward.nodes_expanded
+        self.nodes_expanded = forward.nodes_expanded + backward.nodes_expanded
+        if meeting_cell is None:
+            return None
+        return self._solution(forward.nodes[meeting_cell],
+                              backward.nodes[meeting_cell])
+
+    def _expand(self, side, other, current_node, closed_cells):
+        """Adds the children of current_node to the frontier of side.
+        Returns (path cost, cell) for the best path found through a child
+        that the other side has also reached, or None."""
+        best_meeting = None
+        child_path_cost = current_node.get_path_cost() + 1
+        for direction, child_cell in \
+                self.board.successors(current_node.get_agent_location()):
+            if child_cell in closed_cells:
+                continue
+            known_node = side.nodes.get(child_cell)
+            if known_node is not None and \
+                    known_node.get_path_cost() <= child_path_cost:
+                continue
+            child_cost = child_path_cost + side.estimate(child_cell)
+            child = Node(agent_location=child_cell,
+                         direction=direction,
+                         cost=child_cost,
+                         path_cost=child_path_cost,
+                         parent=current_node)
+            side.nodes[child_cell] = child
+            if known_node is None:
+                side.frontier.push(child)
+            else:
+                side.frontier.set_priority(node=child, new_cost=child_cost)
+
+            other_node = other.nodes.get(child_cell)
+            if other_node is not None:
+                meeting_path_cost = child_path_cost + \
+                    other_node.get_path_cost()
+                if best_meeting is None or \
+                        meeting_path_cost < best_meeting[0]:
+                    best_meeting = (meeting_path_cost, child_cell)
+        return best_meeting
+
+    def _solution(self, forward_node, backward_node):
+        """Joins the forward path to the meeting square with the backward
+        path from it into the directions from the agent to the food."""
+        directions = []
+        current_node = forward_node
+        while current_node.get_parent() is not None:
+            directions.append(current_node.get_direction())
+            current_node = current_node.get_parent()
+        directions.reverse()
+        # The backward search moved from the food, so each of its moves is
+        # made in the opposite direction on the way to the food.
+        current_node = backward_node
+        while current_node.get_parent() is not None:
+            directions.append(
+                opposite_directions[current_node.get_direction()])
+            current_node = current_node.get_parent()
+        return directions
@@ -1,22 +1,164 @@
 __author__ = "Christopher Raleigh and Anthony Ferrero"
 
+import hashlib
+import struct
+
 from board_square_type import BoardSquareType
 from board_square import BoardSquare
+from direction import Direction
 
 
 class Board(object):
     """A rectangular collection of squares, not including a food agent."""
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, squares=None):
+        """squares, if given, is a list of columns of square types to use
+        instead of an empty board."""
         self.width = width
         self.height = height
-        self.squares = [[BoardSquareType.empty for i in xrange(height)]
-                        for i in xrange(width)]
+        if squares is None:
+            squares = [[BoardSquareType.empty for i in xrange(height)]
+                       for i in xrange(width)]
+        self.squares = squares
         self._food_location = None
+        self._content_hash = None
+        self._change_listeners = []
+
+    @property
+    def cell_count(self):
+        """The number of cell ids used by this board."""
+        return self.width * self.height
+
+    def cell_id(self, x, y):
+        """Returns the integer id of a square, used by searches in place of
+        a BoardSquare."""
+        return y * self.width + x
+
+    def cell_location(self, cell, square=None):
+        """Returns the location of a cell id. If square is given, it is
+        updated and returned instead of creating a new BoardSquare."""
+        y, x = divmod(cell, self.width)
+        if square is None:
+            return BoardSquare(x, y)
+        square.x = x
+        square.y = y
+        return square
+
+    def cell_type(self, cell):
+        """Returns the type of the square with a cell id."""
+        y, x = divmod(cell, self.width)
+        return self.squares[x][y]
+
+    def successors(self, cell):
+        """Yields (direction, cell id) for every square that can be moved to
+        from a cell, in the order up, down, left, right."""
+        width = self.width
+        y, x = divmod(cell, width)
+        column = self.squares[x]
+        wall = BoardSquareType.wall
+        if y > 0 and column[y - 1] != wall:
+            yield Direction.up, cell - width
+        if y < self.height - 1 and column[y + 1] != wall:
+            yield Direction.down, cell + width
+        if x > 0 and self.squares[x - 1][y] != wall:
+            yield Direction.left, cell - 1
+        if x < width - 1 and self.squares[x + 1][y] != wall:
+            yield Direction.right, cell + 1
+
+    def neighbor(self, cell, direction):
+        """Returns the cell id reached by moving from a cell in direction, or
+        None if that move is blocked."""
+        width = self.width
+        y, x = divmod(cell, width)
+        if direction == Direction.up:
+            y -= 1
+            cell -= width
+        elif direction == Direction.down:
+            y += 1
+            cell += width
+        elif direction == Direction.left:
+            x -= 1
+            cell -= 1
+        elif direction == Direction.right:
+            x += 1
+            cell += 1
+        else:
+            return None
+        if not (0 <= x < width and 0 <= y < self.height):
+            return None
+        if self.squares[x][y] == BoardSquareType.wall:
+            return None
+        return cell
 
     def set_square(self, x, y, square_type):
         """Sets the type of a square."""
         self.squares[x][y] = square_type
+        self._square_changed(x, y)
+
+    def add_change_listener(self, listener):
+        """Calls listener(board, x, y) after each call to set_square."""
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        self._change_listeners.remove(listener)
+
+    def _square_changed(self, x, y):
+        self._content_hash = None
+        for listener in self._change_listeners:
+            listener(self, x, y)
+
+    def get_square(self, x, y):
+        """Returns the type of a square."""
+        return self.squares[x][y]
+
+    def get_row(self, y):
+        """Returns the types of the squares of row y as a bytearray."""
+        squares = self.squares
+        return bytearray(squares[x][y] for x in xrange(self.width))
+
+    def can_move(self, x, y, direction):
+        """Can move from a square in the specified direction."""
+        target_x = x
+        target_y = y
+        if direction == Direction.up:
+            target_y -= 1
+        elif direction == Direction.down:
+            target_y += 1
+        elif direction == Direction.left:
+            target_x -= 1
+        elif direction == Direction.right:
+            target_x += 1
+        else:
+            return False
+        if (target_x < 0) or (target_y < 0):
+            return False
+        max_x = self.width - 1
+        max_y = self.height - 1
+        if (target_x > max_x) or (target_y > max_y):
+            return False
+        if self.squares[target_x][target_y] == BoardSquareType.wall:
+            return False
+        return True
+
+    def content_hash(self):
+        """Returns a hex digest of the size and squares of the board. Boards
+        with the same squares have the same hash whatever their class. It is
+        computed once and kept until a square changes."""
+        if self._content_hash is None:
+            digest = hashlib.sha1(struct.pack('<II', self.width, self.height))
+            self._update_digest(digest)
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def _update_digest(self, digest):
+        """Adds the squares to digest in row-major order."""
+        for y in xrange(self.height):
+            digest.update(self.get_row(y))
+
+    def set_food_location(self, food_location):
+        """Sets the food location returned by get_food_location, for loaders
+        that find it while reading the board."""
+        self._food_location = food_location
 
     def get_food_location(self):
         """Lazily evaluated food location."""
@@ -26,3 +168,14 @@ class Board(object):
                     if self.squares[x][y] == BoardSquareType.food:
                         self._food_location = BoardSquare(x, y)
         return self._food_location
+
+    def get_food_locations(self):
+        """Returns the location of every food square, in row-major order.
+        Unlike get_food_location, the squares are read again on each
+        call."""
+        squares = self.squares
+        food = BoardSquareType.food
+        return [BoardSquare(x, y)
+                for y in xrange(self.height)
+                for x in xrange(self.width)
+                if squares[x][y] == food]
@@ -0,0 +1,209 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import re
+from array import array
+from collections import deque
+from weakref import WeakKeyDictionary
+
+from board_square_type import BoardSquareType
+
+
+'''Matches each run of squares in a row that are not walls.'''
+_open_run = re.compile('[^' + re.escape(chr(BoardSquareType.wall)) + ']+')
+'''The ConnectedComponents made by for_board, by board.'''
+_components_by_board = WeakKeyDictionary()
+
+
+class ConnectedComponents(object):
+    """Labels every open square of a board with the connected component it
+    is in, so whether one square can reach another is answered without
+    searching.
+
+    Each open cell is given a label when the board is scanned, one per run
+    of open squares in a row, and labels of runs that touch are joined in
+    a union-find, so a cell's component is the root of its label. The
+    labels follow set_square: a new open square joins the components next
+    to it, and a new wall searches outward from its neighbors at the same
+    time, giving new labels to any parts that no longer meet."""
+
+    def __init__(self, board):
+        self.board = board
+        '''The label of each cell id, or -1 for walls.'''
+        self.labels = array('i', [-1]) * board.cell_count
+        '''The parent of each label in the union-find, itself for roots.'''
+        self._parents = []
+        self._label_runs()
+        board.add_change_listener(self._square_changed)
+
+    @staticmethod
+    def for_board(board):
+        """Returns the ConnectedComponents of board, labelling it the first
+        time it is asked for."""
+        components = _components_by_board.get(board)
+        if components is None:
+            components = ConnectedComponents(board)
+            _components_by_board[board] = components
+        return components
+
+    def component(self, cell):
+        """Returns the id of the component holding a cell, or -1 if it is a
+        wall. Ids are only stable until the board changes."""
+        label = self.labels[cell]
+        if label == -1:
+            return -1
+        return self._find(label)
+
+    def connected(self, cell, other_cell):
+        """Returns whether there is a path between two cells. A wall is not
+        connected to anything."""
+        component = self.component(cell)
+        return component != -1 and component == self.component(other_cell)
+
+    def _new_label(self):
+        label = len(self._parents)
+        self._parents.append(label)
+        return label
+
+    def _find(self, label):
+        parents = self._parents
+        while parents[label] != label:
+            # Path halving keeps later finds short.
+            parents[label] = parents[parents[label]]
+            label = parents[label]
+        return label
+
+    def _union(self, label, other_label):
+        """Joins the components of two labels. Returns the root of both."""
+        root = self._find(label)
+        other_root = self._find(other_label)
+        if root == other_root:
+            return root
+        if other_root < root:
+            root, other_root = other_root, root
+        self._parents[other_root] = root
+        return root
+
+    def _row(self, y):
+        """Returns the squares of row y as a string, one byte per square."""
+        return str(self.board.get_row(y))
+
+    def _label_runs(self):
+        """Gives each run of open squares a label, joined with the labels of
+        the runs it touches in the row above. Cell ids are consecutive
+        along a row on every board, so each run is labelled with one slice
+        assignment."""
+        board = self.board
+        labels = self.labels
+        cell_id = board.cell_id
+        above_runs = []
+        for y in xrange(board.height):
+            row_start = cell_id(0, y)
+            runs = []
+            # The first run above that could touch the current one.
+            above = 0
+            for match in _open_run.finditer(self._row(y)):
+                start, end = match.span()
+                while above < len(above_runs) and \
+                        above_runs[above][1] <= start:
+                    above += 1
+                label = None
+                touching = above
+                while touching < len(above_runs) and \
+                        above_runs[touching][0] < end:
+                    above_label = above_runs[touching][2]
+                    if label is None:
+                        label = above_label
+                    else:
+                        label = self._union(label, above_label)
+                    touching += 1
+                if label is None:
+                    label = self._new_label()
+                runs.append((start, end, label))
+                labels[row_start + start:row_start + end] = \
+                    array('i', [label]) * (end - start)
+            above_runs = runs
+
+    def _square_changed(self, board, x, y):
+        cell = board.cell_id(x, y)
+        is_wall = board.get_square(x, y) == BoardSquareType.wall
+        was_wall = self.labels[cell] == -1
+        if is_wall and not was_wall:
+            self.labels[cell] = -1
+            self._split(cell)
+        elif was_wall and not is_wall:
+            self._join(cell)
+
+    def _join(self, cell):
+        """Labels a cell that was a wall, joining the components next to
+        it."""
+        label = None
+        for direction, next_cell in self.board.successors(cell):
+            next_label = self.labels[next_cell]
+            if label is None:
+                label = next_label
+            else:
+                label = self._union(label, next_label)
+        if label is None:
+            label = self._new_label()
+        self.labels[cell] = label
+
+    def _split(self, cell):
+        """Relabels the parts of a component that a new wall at cell cut
+        apart.
+
+        A breadth-first search is run from each open neighbor of cell, one
+        expansion each in turn. Searches that meet are joined. Once at most
+        one group of joined searches still has cells to expand, every other
+        group has found all of its part, so only the smaller parts are ever
+        searched in full."""
+        starts = [next_cell for direction, next_cell
+                  in self.board.successors(cell)]
+        search_count = len(starts)
+        if search_count < 2:
+            return
+        groups = range(search_count)
+
+        def find_group(search):
+            while groups[search] != search:
+                search = groups[search]
+            return search
+
+        owners = dict((start, search) for search, start in enumerate(starts))
+        queues = [deque([start]) for start in starts]
+        reached = [[start] for start in starts]
+        successors = self.board.successors
+        while True:
+            roots = set(find_group(search)
+                        for search in xrange(search_count))
+            if len(roots) == 1:
+                return
+            open_roots = set(find_group(search)
+                             for search in xrange(search_count)
+                             if queues[search])
+            if len(open_roots) <= 1:
+                break
+            for search in xrange(search_count):
+                queue = queues[search]
+                if not queue:
+                    continue
+                for direction, next_cell in successors(queue.popleft()):
+                    owner = owners.get(next_cell)
+                    if owner is None:
+                        owners[next_cell] = search
+                        reached[search].append(next_cell)
+                        queue.append(next_cell)
+                        continue
+                    root = find_group(owner)
+                    other_root = find_group(search)
+                    if root != other_root:
+                        groups[max(root, other_root)] = min(root, other_root)
+
+        # The part still being searched keeps the old labels.
+        kept_root = min(open_roots or roots)
+        labels = self.labels
+        for root in roots - set([kept_root]):
+            label = self._new_label()
+            for search in xrange(search_count):
+                if find_group(search) == root:
+                    for reached_cell in reached[search]:
+                        labels[reached_cell] = label
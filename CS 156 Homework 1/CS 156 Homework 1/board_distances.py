@@ -0,0 +1,77 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from array import array
+from collections import deque
+
+from board_square_type import BoardSquareType
+from compact_board import CompactBoard
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def breadth_first_distances(board, source_cells, directions=None):
+    """Returns an array holding, for each cell id of board, the number of
+    moves from the nearest of source_cells, or -1 if none can reach it.
+    directions is an optional table indexed by cell id, given the move
+    each reached cell was first reached by on a shortest path from the
+    sources. Other cells are left alone."""
+    distances = array('i', [-1]) * board.cell_count
+    queue = deque(source_cells)
+    for cell in queue:
+        distances[cell] = 0
+    successors = board.successors
+    while queue:
+        cell = queue.popleft()
+        next_distance = distances[cell] + 1
+        for direction, next_cell in successors(cell):
+            if distances[next_cell] == -1:
+                distances[next_cell] = next_distance
+                if directions is not None:
+                    directions[next_cell] = direction
+                queue.append(next_cell)
+    return distances
+
+
+def distance_field(board, source_cells):
+    """Returns the same distances as breadth_first_distances. When NumPy is
+    installed and board is a CompactBoard, the whole wavefront is advanced
+    one move at a time with array operations instead of one cell at a
+    time."""
+    if numpy is not None and isinstance(board, CompactBoard):
+        return _wavefront_distances(board, source_cells)
+    return breadth_first_distances(board, source_cells)
+
+
+def _wavefront_distances(board, source_cells):
+    cells = numpy.frombuffer(board.cells, dtype=numpy.uint8)
+    open_cells = cells != BoardSquareType.wall
+    stride = board.stride
+    offsets = numpy.array([-stride, stride, -1, 1], dtype=numpy.intp)
+    distances = numpy.full(len(cells), -1, dtype=numpy.intc)
+    frontier = numpy.unique(numpy.asarray(source_cells, dtype=numpy.intp))
+    distances[frontier] = 0
+    distance = 0
+    while frontier.size:
+        distance += 1
+        # The border of walls keeps every neighbor of an open cell in
+        # bounds.
+        neighbors = (frontier[:, numpy.newaxis] + offsets).ravel()
+        neighbors = neighbors[open_cells[neighbors] &
+                              (distances[neighbors] == -1)]
+        frontier = numpy.unique(neighbors)
+        distances[frontier] = distance
+    # Searches read the field one cell at a time, which is faster from an
+    # array than from NumPy.
+    return array('i', distances.tobytes())
+
+
+def row_major_cells(board):
+    """Returns the cell ids of board in row-major order, so tables indexed
+    by cell id can be stored the same way for every kind of board."""
+    cell_id = board.cell_id
+    return [cell_id(x, y)
+            for y in xrange(board.height)
+            for x in xrange(board.width)]
@@ -1,21 +1,156 @@
 __author__ = "Christopher Raleigh and Anthony Ferrero"
 
+import io
+import sys
+
 from board_square_type import BoardSquareType
+from direction import Direction
+
+
+direction_letters = {
+    Direction.up: 'U',
+    Direction.down: 'D',
+    Direction.left: 'L',
+    Direction.right: 'R',
+}
+'''The square type drawn over each square of the path in overlay mode,
+showing the direction the agent left it in.'''
+direction_arrows = {
+    Direction.up: '^',
+    Direction.down: 'v',
+    Direction.left: '<',
+    Direction.right: '>',
+}
+'''How far each direction moves the agent, as (x, y).'''
+_direction_offsets = {
+    Direction.up: (0, -1),
+    Direction.down: (0, 1),
+    Direction.left: (-1, 0),
+    Direction.right: (1, 0),
+}
+FULL = 'full'
+DIFF = 'diff'
+OVERLAY = 'overlay'
+DIRECTIONS = 'directions'
+render_modes = [FULL, DIFF, OVERLAY, DIRECTIONS]
+'''Bytes of output held before writing it to stdout.'''
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
 
 def print_board(board_state):
     """Prints a board."""
-    board = board_state.board
-    agent = board_state.agent
-    for j in xrange(board.height):
-        row = ''
-        for i in xrange(board.width):
-            if (agent.x == i) and (agent.y == j):
-                next_char = '@'
-            else:
-                next_char = board_square_type_to_char(board.squares[i][j])
-            row += next_char
-        print(row)
+    rows = board_rows(board_state.board)
+    print(_frame(rows, board_state.agent.x, board_state.agent.y))
+
+
+def board_rows(board):
+    """Returns each row of a board as a string of readable characters,
+    without the agent."""
+    return [str(board.get_row(y)).translate(_char_table)
+            for y in xrange(board.height)]
+
+
+def render_solution(board_state, directions, mode=FULL, output=None):
+    """Writes the solution along directions from the agent's location.
+
+    In full mode the board is drawn before and after each step. In diff
+    mode the board is drawn once, then each step lists the squares that
+    changed as "x,y:character". In overlay mode the board is drawn once
+    with the path over it. In directions mode only the directions are
+    written, one letter each.
+
+    Each frame is joined from rows formatted once up front and written in
+    one call. output defaults to a buffered writer over stdout."""
+    if output is None:
+        output = _buffered_stdout()
+    try:
+        {
+            FULL: _render_full,
+            DIFF: _render_diff,
+            OVERLAY: _render_overlay,
+            DIRECTIONS: _render_directions,
+        }[mode](board_state, directions, output.write)
+    finally:
+        output.flush()
+
+
+def _render_full(board_state, directions, write):
+    rows = board_rows(board_state.board)
+    x = board_state.agent.x
+    y = board_state.agent.y
+    write('Initial:\n' + _frame(rows, x, y) + '\n')
+    for step_number, direction in enumerate(directions, 1):
+        x, y = _moved(x, y, direction)
+        write('\nStep ' + str(step_number) + ':\n' + _frame(rows, x, y) +
+              '\n')
+
+
+def _render_diff(board_state, directions, write):
+    rows = board_rows(board_state.board)
+    x = board_state.agent.x
+    y = board_state.agent.y
+    write('Initial:\n' + _frame(rows, x, y) + '\n')
+    for step_number, direction in enumerate(directions, 1):
+        next_x, next_y = _moved(x, y, direction)
+        write('Step ' + str(step_number) + ': ' +
+              _changed_square(x, y, rows[y][x]) + ' ' +
+              _changed_square(next_x, next_y, '@') + '\n')
+        x = next_x
+        y = next_y
+
+
+def _render_overlay(board_state, directions, write):
+    rows = board_rows(board_state.board)
+    x = board_state.agent.x
+    y = board_state.agent.y
+    # Only the rows the path crosses are copied to be drawn on.
+    drawn_rows = {}
+    for direction in directions:
+        row = drawn_rows.get(y)
+        if row is None:
+            row = drawn_rows[y] = list(rows[y])
+        row[x] = direction_arrows[direction]
+        x, y = _moved(x, y, direction)
+    start = board_state.agent
+    drawn_rows.setdefault(start.y, list(rows[start.y]))[start.x] = '@'
+    for y, row in drawn_rows.iteritems():
+        rows[y] = ''.join(row)
+    write('\n'.join(rows) + '\n')
+
+
+def _render_directions(board_state, directions, write):
+    write(''.join(direction_letters[direction] for direction in directions) +
+          '\n')
+
+
+def _frame(rows, agent_x, agent_y):
+    """Joins rows into one string with the agent drawn in."""
+    row = rows[agent_y]
+    rows[agent_y] = row[:agent_x] + '@' + row[agent_x + 1:]
+    frame = '\n'.join(rows)
+    rows[agent_y] = row
+    return frame
+
+
+def _moved(x, y, direction):
+    offset_x, offset_y = _direction_offsets[direction]
+    return x + offset_x, y + offset_y
+
+
+def _changed_square(x, y, character):
+    return str(x) + ',' + str(y) + ':' + character
+
+
+def _buffered_stdout():
+    """Returns a writer over stdout's file descriptor with a buffer of
+    OUTPUT_BUFFER_SIZE, after flushing what was printed before, or stdout
+    itself if it has no file descriptor."""
+    sys.stdout.flush()
+    try:
+        file_descriptor = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return sys.stdout
+    return io.open(file_descriptor, 'wb', OUTPUT_BUFFER_SIZE, closefd=False)
 
 
 def board_square_type_to_char(square_type):
@@ -25,3 +160,7 @@ def board_square_type_to_char(square_type):
         BoardSquareType.wall: '#',
         BoardSquareType.food: '%',
     }.get(square_type, '.')
+
+
+'''Translates a row of square types to readable characters at once.'''
+_char_table = ''.join(board_square_type_to_char(i) for i in xrange(256))
@@ -13,4 +13,5 @@ class BoardSquare(object):
                self.x == other.x and self.y == other.y
 
     def __hash__(self):
-        return hash(self.x) ^ hash(self.y) ^ hash((self.x, self.y))
+        # Arithmetic instead of hashing a new (x, y) tuple on every call.
+        return self.x * 1000003 ^ self.y
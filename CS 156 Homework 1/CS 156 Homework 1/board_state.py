@@ -16,7 +16,7 @@ class BoardState(object):
     def food_eaten(self):
         """Returns true if the food agent occupies a space with food."""
         agent = self.agent
-        return self.board.squares[agent.x][agent.y] == BoardSquareType.food
+        return self.board.get_square(agent.x, agent.y) == BoardSquareType.food
 
     def reset_agent_position(self):
         self.agent.set_location(self.agent_start_location)
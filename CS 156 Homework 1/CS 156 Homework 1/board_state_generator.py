@@ -1,31 +1,130 @@
 __author__ = "Christopher Raleigh and Anthony Ferrero"
 
+import os
+from itertools import chain
+
 from board_square_type import BoardSquareType
 from board import Board
+from board_square import BoardSquare
+from compact_board import CompactBoard
 from board_state import BoardState
+import maze_file
+import tiled_board
+
+
+def generate_from_file(ascii_board_file_path, compact=False):
+    """Returns a maze from an inputted file. If compact is true, the maze is
+    stored in a CompactBoard. Binary .maze files are always mapped into a
+    CompactBoard; see maze_file.open_maze. .tiles files are opened on a
+    TiledBoard, which reads them a tile at a time; see
+    tiled_board.open_tiles.
+
+    The file is streamed a row at a time: each row is translated to square
+    types in bulk and copied into a buffer sized from the file size, and
+    the agent and food are found in the same pass. Raises ValueError if the
+    rows are not all the same width."""
+    if maze_file.is_maze_file(ascii_board_file_path):
+        return maze_file.open_maze(ascii_board_file_path)
+    if tiled_board.is_tiles_file(ascii_board_file_path):
+        return tiled_board.open_tiles(ascii_board_file_path)
+    with open(ascii_board_file_path, 'rb') as ascii_board_file:
+        rows = AsciiBoardRows(ascii_board_file, ascii_board_file_path)
+        board_width = rows.width
+        file_size = os.fstat(ascii_board_file.fileno()).st_size
+        # Exact when every line ends like the first one, except perhaps the
+        # last, which is the usual case.
+        estimated_height = -(-file_size // rows.first_line_length)
 
+        stride = board_width + 2
+        wall = chr(BoardSquareType.wall)
+        wall_row = wall * stride
+        cells = bytearray(stride * (estimated_height + 2))
+        cells[0:stride] = wall_row
+        for y, row in enumerate(rows):
+            row_start = (y + 1) * stride
+            if row_start + stride > len(cells):
+                cells.extend(bytearray(stride))
+            cells[row_start:row_start + stride] = wall + row + wall
 
-def generate_from_file(ascii_board_file_path):
-    """Returns a maze from an inputted file."""
-    agent_x = 0
-    agent_y = 0
-    with open(ascii_board_file_path, 'r') as ascii_board_file:
-        file_lines = ascii_board_file.readlines()
-        board_width = len(file_lines[0]) - 1
-        board_height = len(file_lines)
-        board = Board(width=board_width, height=board_height)
-        for j in xrange(board_height):
-            for i in xrange(board_width):
-                next_char = file_lines[j][i]
-                if next_char is '@':
-                    agent_x = i
-                    agent_y = j
-                square_type = char_to_board_square_type(next_char)
-                board.set_square(i, j, square_type)
-    board_state = BoardState(board, agent_x, agent_y)
+    board_height = rows.height
+    bottom_row_start = (board_height + 1) * stride
+    del cells[bottom_row_start:]
+    cells.extend(wall_row)
+    board = CompactBoard(width=board_width, height=board_height, cells=cells)
+    if not compact:
+        board = Board(width=board_width, height=board_height,
+                      squares=_columns(board))
+    if rows.food_location is not None:
+        board.set_food_location(rows.food_location)
+    agent_location = rows.agent_location
+    board_state = BoardState(board, agent_location.x, agent_location.y)
     return board_state
 
 
+class AsciiBoardRows(object):
+    """The rows of an ASCII board file, read one at a time.
+
+    Iterating yields each row translated to square types, one byte each,
+    checking that every row has the same width and finding the agent and
+    food on the way. Raises ValueError for a ragged or empty board."""
+
+    def __init__(self, ascii_board_file, ascii_board_file_path):
+        """ascii_board_file is the open file, positioned at its start."""
+        first_line = ascii_board_file.readline()
+        self.width = len(first_line.rstrip('\r\n'))
+        if self.width == 0:
+            raise ValueError(ascii_board_file_path +
+                             ' does not start with a row of squares')
+        self.first_line_length = len(first_line)
+        '''The number of rows read so far.'''
+        self.height = 0
+        '''Where the agent is, or (0, 0) if no row read so far has it.'''
+        self.agent_location = BoardSquare(0, 0)
+        '''The food square Board.get_food_location would pick among the rows
+        read so far, or None.'''
+        self.food_location = None
+        self._lines = chain([first_line], ascii_board_file)
+        self._path = ascii_board_file_path
+
+    def __iter__(self):
+        blank_line_number = None
+        for line_number, line in enumerate(self._lines, 1):
+            row = line.rstrip('\r\n')
+            if not row:
+                # Blank lines may only follow the last row.
+                if blank_line_number is None:
+                    blank_line_number = line_number
+                continue
+            if blank_line_number is not None or len(row) != self.width:
+                raise ValueError(
+                    'Row ' + str(line_number) + ' of ' + self._path +
+                    ' has ' + str(len(row)) + ' squares instead of ' +
+                    str(self.width))
+
+            agent_index = row.rfind('@')
+            if agent_index != -1:
+                self.agent_location = BoardSquare(agent_index, self.height)
+            # Board.get_food_location picks the greatest x, then y.
+            food_index = row.rfind('%')
+            if food_index != -1 and \
+                    (self.food_location is None or
+                     food_index >= self.food_location.x):
+                self.food_location = BoardSquare(food_index, self.height)
+            self.height += 1
+            yield translate_row(row)
+
+
+def _columns(compact_board):
+    """Returns the squares of a CompactBoard as the list of columns used by
+    Board."""
+    cells = compact_board.cells
+    stride = compact_board.stride
+    column_length = compact_board.height * stride
+    return [list(cells[column_start:column_start + column_length:stride])
+            for column_start in (compact_board.index(x, 0)
+                                 for x in xrange(compact_board.width))]
+
+
 def char_to_board_square_type(character):
     """Changes a square type to a readable character."""
     return {
@@ -33,3 +132,14 @@ def char_to_board_square_type(character):
         '#': BoardSquareType.wall,
         '%': BoardSquareType.food,
     }.get(character, BoardSquareType.empty)
+
+
+def translate_row(row):
+    """Changes a row of characters to a string of square types, one byte
+    each, all at once."""
+    return row.translate(_square_type_table)
+
+
+'''Translates a row of characters to a string of square types at once.'''
+_square_type_table = ''.join(chr(char_to_board_square_type(chr(i)))
+                             for i in xrange(256))
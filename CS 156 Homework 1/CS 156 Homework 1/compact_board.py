@@ -0,0 +1,152 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from board import Board
+from board_square_type import BoardSquareType
+from board_square import BoardSquare
+from direction import Direction
+
+
+class CompactBoard(Board):
+    """A board stored as one byte per square in row-major order.
+
+    The squares are surrounded by a one square border of walls, so the
+    neighbors of any square on the board can be looked up by adding a
+    precomputed offset to its index, without bounds checks."""
+
+    def __init__(self, width, height, cells=None):
+        """cells, if given, is an existing buffer of squares laid out as
+        described above, such as a bytearray or a ctypes array over shared
+        memory. It is used without copying."""
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        if cells is None:
+            cells = bytearray(self.stride * (height + 2))
+            self._fill_border(cells)
+        self.cells = cells
+        self.neighbor_offsets = {
+            Direction.up: -self.stride,
+            Direction.down: self.stride,
+            Direction.left: -1,
+            Direction.right: 1,
+        }
+        self._successor_offsets = tuple(
+            (direction, self.neighbor_offsets[direction])
+            for direction in [Direction.up, Direction.down,
+                              Direction.left, Direction.right])
+        self._food_location = None
+        self._content_hash = None
+        self._change_listeners = []
+
+    def _fill_border(self, cells):
+        """Sets every square of the border to a wall."""
+        stride = self.stride
+        wall_row = bytearray([BoardSquareType.wall]) * stride
+        wall_column = bytearray([BoardSquareType.wall]) * self.height
+        bottom_row_start = stride * (self.height + 1)
+        cells[0:stride] = wall_row
+        cells[bottom_row_start:bottom_row_start + stride] = wall_row
+        cells[stride:bottom_row_start:stride] = wall_column
+        cells[2 * stride - 1:bottom_row_start:stride] = wall_column
+
+    def index(self, x, y):
+        """Returns the index of a square in cells."""
+        return (y + 1) * self.stride + x + 1
+
+    @property
+    def cell_count(self):
+        """The number of cell ids used by this board, including the border."""
+        return len(self.cells)
+
+    def cell_id(self, x, y):
+        """Returns the integer id of a square, which is its index in cells."""
+        return self.index(x, y)
+
+    def cell_location(self, cell, square=None):
+        """Returns the location of a cell id. If square is given, it is
+        updated and returned instead of creating a new BoardSquare."""
+        y, x = divmod(cell, self.stride)
+        if square is None:
+            return BoardSquare(x - 1, y - 1)
+        square.x = x - 1
+        square.y = y - 1
+        return square
+
+    def cell_type(self, cell):
+        """Returns the type of the square with a cell id."""
+        return self.cells[cell]
+
+    def successors(self, cell):
+        """Yields (direction, cell id) for every square that can be moved to
+        from a cell, in the order up, down, left, right."""
+        cells = self.cells
+        wall = BoardSquareType.wall
+        for direction, offset in self._successor_offsets:
+            if cells[cell + offset] != wall:
+                yield direction, cell + offset
+
+    def neighbor(self, cell, direction):
+        """Returns the cell id reached by moving from a cell in direction, or
+        None if that move is blocked."""
+        cell += self.neighbor_offsets[direction]
+        if self.cells[cell] == BoardSquareType.wall:
+            return None
+        return cell
+
+    def set_square(self, x, y, square_type):
+        """Sets the type of a square."""
+        self.cells[self.index(x, y)] = square_type
+        self._square_changed(x, y)
+
+    def get_square(self, x, y):
+        """Returns the type of a square."""
+        return self.cells[self.index(x, y)]
+
+    def get_row(self, y):
+        """Returns the types of the squares of row y as a bytearray."""
+        row_start = self.index(0, y)
+        return bytearray(self.cells[row_start:row_start + self.width])
+
+    def can_move(self, x, y, direction):
+        """Can move from a square in the specified direction."""
+        offset = self.neighbor_offsets.get(direction)
+        if offset is None:
+            return False
+        target = self.index(x, y) + offset
+        return self.cells[target] != BoardSquareType.wall
+
+    def get_food_location(self):
+        """Lazily evaluated food location. Matches Board by choosing the
+        food square with the greatest x, then the greatest y."""
+        if self._food_location is None:
+            food = chr(BoardSquareType.food)
+            cells = self.cells
+            if not isinstance(cells, bytearray):
+                cells = bytearray(cells)
+            stride = self.stride
+            best = None
+            index = cells.find(food)
+            while index != -1:
+                x = index % stride - 1
+                y = index // stride - 1
+                if best is None or (x, y) > best:
+                    best = (x, y)
+                index = cells.find(food, index + 1)
+            if best is not None:
+                self._food_location = BoardSquare(best[0], best[1])
+        return self._food_location
+
+    def get_food_locations(self):
+        """Returns the location of every food square, in row-major order.
+        Unlike get_food_location, the squares are read again on each
+        call."""
+        food = chr(BoardSquareType.food)
+        cells = self.cells
+        if not isinstance(cells, bytearray):
+            cells = bytearray(cells)
+        food_locations = []
+        index = cells.find(food)
+        while index != -1:
+            food_locations.append(self.cell_location(index))
+            index = cells.find(food, index + 1)
+        return food_locations
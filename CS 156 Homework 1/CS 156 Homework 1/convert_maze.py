@@ -0,0 +1,49 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from sys import argv
+
+import board_state_generator
+import maze_file
+import tiled_board
+
+
+def print_error(error_message):
+    print('')
+    print(error_message)
+    print('')
+    print('Usage: convert_maze.py [file name] [maze file name]')
+    print('\t[file name] -> a board in the ASCII format of the Tests folder,'
+          ' or a ' + maze_file.FILE_EXTENSION + ' or ' +
+          tiled_board.FILE_EXTENSION + ' file')
+    print('\t[maze file name] -> the ' + maze_file.FILE_EXTENSION + ' or ' +
+          tiled_board.FILE_EXTENSION + ' file to write, by its extension')
+
+
+def main(args):
+    NUM_SUPPORTED_PROGRAM_ARGS = 2
+    # Python passes in the name of the executed module as the first argument
+    NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
+    if len(args) != NUM_EXPECTED_ARGS:
+        print_error('You must enter two arguments.')
+        return
+    board_file_path, maze_file_path = args[1:]
+    is_ascii = not (maze_file.is_maze_file(board_file_path) or
+                    tiled_board.is_tiles_file(board_file_path))
+    try:
+        if tiled_board.is_tiles_file(maze_file_path) and is_ascii:
+            # Streamed, so boards too large to load can be converted.
+            tiled_board.convert_ascii(board_file_path, maze_file_path)
+            return
+        board_state = board_state_generator.generate_from_file(
+            board_file_path, compact=True)
+    except ValueError as error:
+        print_error(str(error))
+        return
+    if tiled_board.is_tiles_file(maze_file_path):
+        tiled_board.write_tiles(board_state, maze_file_path)
+    else:
+        maze_file.write_maze(board_state, maze_file_path)
+
+
+if __name__ == '__main__':
+    main(argv)
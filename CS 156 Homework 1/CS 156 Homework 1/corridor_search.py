@@ -0,0 +1,397 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import heapq
+import time
+from array import array
+from collections import deque
+
+from board_square_type import BoardSquareType
+from direction import opposite_directions
+from food_agent_ai import search_target
+
+
+NO_DIRECTION = -1
+
+
+class CorridorSearch(object):
+    """A* over a board reduced to its junctions and the corridors between
+    them.
+
+    The board is reduced in two steps when the engine is made, and again
+    after a square is set:
+
+    1. Dead ends are pruned by repeatedly removing squares with at most one
+       open neighbor left. Each pruned square records the move toward the
+       squares that remain, so the pruned squares form trees hanging off
+       the rest, and the only path out of a pocket is to follow them.
+    2. The remaining squares with three or more neighbors are junctions,
+       and each chain of squares with two neighbors between them is
+       collapsed into one edge weighted by its length. A loop without any
+       junction gets one of its squares as a junction.
+
+    A search follows the pruned squares out of the start's and goal's
+    pockets, runs A* over the junctions between the squares they lead to,
+    and then walks each corridor used to turn the edges back into one
+    direction per move. Paths have the same length as the ones found by
+    A*."""
+
+    name = 'corridor'
+
+    def __init__(self, board, heuristic):
+        self.board = board
+        self._heuristic = heuristic
+        self.nodes_expanded = 0
+        self.build_seconds = 0.0
+        self.pruned_count = 0
+        self._built = False
+        self._build()
+        board.add_change_listener(self._square_changed)
+
+    @property
+    def junction_count(self):
+        return len(self._junction_cells)
+
+    @property
+    def edge_count(self):
+        return len(self._edge_lengths)
+
+    def _build(self):
+        started = time.time()
+        board = self.board
+        cell_count = board.cell_count
+        self.pruned_count = 0
+        '''1 for each square removed as part of a dead end.'''
+        self._pruned = bytearray(cell_count)
+        '''For each pruned square, the move toward the squares that remain,
+        or NO_DIRECTION at the last square of a board part with no
+        loops.'''
+        self._exits = array('b', [NO_DIRECTION]) * cell_count
+        '''For each square left, how many of its neighbors are left.'''
+        self._degrees = bytearray(cell_count)
+        self._prune_dead_ends()
+        '''The junction id of each junction square, or -1.'''
+        self._junction_ids = array('i', [-1]) * cell_count
+        self._junction_cells = []
+        '''The ids of the edges at each junction.'''
+        self._junction_edges = []
+        '''The edge each corridor square is on, or -1, and how many moves
+        it is from the edge's first junction.'''
+        self._edge_ids = array('i', [-1]) * cell_count
+        self._edge_offsets = array('i', [0]) * cell_count
+        self._edge_junctions = []
+        self._edge_lengths = []
+        '''The moves into each edge from its first and second junctions.'''
+        self._edge_directions = []
+        self._collapse_corridors()
+        self._built = True
+        self.build_seconds = time.time() - started
+
+    def _prune_dead_ends(self):
+        board = self.board
+        successors = board.successors
+        pruned = self._pruned
+        exits = self._exits
+        degrees = self._degrees
+        wall = BoardSquareType.wall
+        queue = deque()
+        for cell in xrange(board.cell_count):
+            if board.cell_type(cell) == wall:
+                continue
+            degree = sum(1 for move in successors(cell))
+            degrees[cell] = degree
+            if degree <= 1:
+                queue.append(cell)
+        while queue:
+            cell = queue.popleft()
+            if pruned[cell]:
+                continue
+            pruned[cell] = 1
+            self.pruned_count += 1
+            # Only one neighbor at most is left when a square is pruned.
+            for direction, next_cell in successors(cell):
+                if pruned[next_cell]:
+                    continue
+                exits[cell] = direction
+                degrees[next_cell] -= 1
+                if degrees[next_cell] == 1:
+                    queue.append(next_cell)
+
+    def _collapse_corridors(self):
+        board = self.board
+        wall = BoardSquareType.wall
+        pruned = self._pruned
+        degrees = self._degrees
+        for cell in xrange(board.cell_count):
+            if board.cell_type(cell) != wall and not pruned[cell] and \
+                    degrees[cell] >= 3:
+                self._add_junction(cell)
+        for junction in xrange(len(self._junction_cells)):
+            self._trace_edges(junction)
+        # Whatever is left of the remaining squares are loops.
+        edge_ids = self._edge_ids
+        for cell in xrange(board.cell_count):
+            if board.cell_type(cell) != wall and not pruned[cell] and \
+                    self._junction_ids[cell] == -1 and edge_ids[cell] == -1:
+                self._trace_edges(self._add_junction(cell))
+
+    def _add_junction(self, cell):
+        junction = len(self._junction_cells)
+        self._junction_ids[cell] = junction
+        self._junction_cells.append(cell)
+        self._junction_edges.append([])
+        return junction
+
+    def _remaining_moves(self, cell):
+        pruned = self._pruned
+        return [(direction, next_cell) for direction, next_cell
+                in self.board.successors(cell) if not pruned[next_cell]]
+
+    def _trace_edges(self, junction):
+        """Adds an edge for each corridor leaving a junction that has not
+        been traced from its other end."""
+        junction_ids = self._junction_ids
+        edge_ids = self._edge_ids
+        junction_cell = self._junction_cells[junction]
+        for first_direction, first_cell in \
+                self._remaining_moves(junction_cell):
+            if edge_ids[first_cell] != -1:
+                continue
+            if junction_ids[first_cell] != -1 and \
+                    junction_ids[first_cell] < junction:
+                continue
+            edge = len(self._edge_lengths)
+            previous_cell = junction_cell
+            cell = first_cell
+            direction = first_direction
+            length = 1
+            while junction_ids[cell] == -1:
+                edge_ids[cell] = edge
+                self._edge_offsets[cell] = length
+                for next_direction, next_cell in self._remaining_moves(cell):
+                    if next_cell != previous_cell:
+                        break
+                previous_cell = cell
+                cell = next_cell
+                direction = next_direction
+                length += 1
+            other_junction = junction_ids[cell]
+            self._edge_junctions.append((junction, other_junction))
+            self._edge_lengths.append(length)
+            self._edge_directions.append((first_direction,
+                                          opposite_directions[direction]))
+            self._junction_edges[junction].append(edge)
+            if other_junction != junction:
+                self._junction_edges[other_junction].append(edge)
+
+    def _square_changed(self, board, x, y):
+        self._built = False
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food, or to
+        goal_cell if it is not None. Returns None if it cannot be
+        reached."""
+        board = self.board
+        self.nodes_expanded = 0
+        target_location = search_target(board, goal_cell)
+        if target_location is None:
+            return None
+        goal_cell = board.cell_id(target_location.x, target_location.y)
+        wall = BoardSquareType.wall
+        if board.cell_type(start_cell) == wall or \
+                board.cell_type(goal_cell) == wall:
+            return None
+        if not self._built:
+            self._build()
+
+        start_cells, start_directions = self._pocket_exit(start_cell)
+        goal_cells, goal_directions = self._pocket_exit(goal_cell)
+        # Paths that stay inside one pocket meet on the way out of it.
+        start_moves = dict((cell, moves)
+                           for moves, cell in enumerate(start_cells))
+        for goal_moves, cell in enumerate(goal_cells):
+            if cell in start_moves:
+                return start_directions[:start_moves[cell]] + \
+                    self._reversed(goal_directions[:goal_moves])
+        if self._pruned[start_cells[-1]] or self._pruned[goal_cells[-1]]:
+            return None
+        middle_directions = self._junction_path(start_cells[-1],
+                                                goal_cells[-1])
+        if middle_directions is None:
+            return None
+        return start_directions + middle_directions + \
+            self._reversed(goal_directions)
+
+    def _pocket_exit(self, cell):
+        """Follows the exits from a cell until a square that was not pruned,
+        or the end of a board part with no loops. Returns the squares
+        visited, starting with cell, and the moves between them."""
+        pruned = self._pruned
+        exits = self._exits
+        neighbor = self.board.neighbor
+        cells = [cell]
+        directions = []
+        while pruned[cell] and exits[cell] != NO_DIRECTION:
+            directions.append(exits[cell])
+            cell = neighbor(cell, exits[cell])
+            cells.append(cell)
+        return cells, directions
+
+    def _reversed(self, directions):
+        """Returns the moves that retrace directions from their end."""
+        return [opposite_directions[direction]
+                for direction in reversed(directions)]
+
+    def _start_anchors(self, cell):
+        """Returns (junction, moves, first direction) for each junction that
+        a square that was not pruned reaches along its corridor."""
+        junction = self._junction_ids[cell]
+        if junction != -1:
+            return [(junction, 0, None)]
+        edge = self._edge_ids[cell]
+        offset = self._edge_offsets[cell]
+        first_junction, second_junction = self._edge_junctions[edge]
+        return [(first_junction, offset,
+                 self._corridor_direction(cell, edge, offset - 1)),
+                (second_junction, self._edge_lengths[edge] - offset,
+                 self._corridor_direction(cell, edge, offset + 1))]
+
+    def _goal_anchors(self, cell):
+        """Returns (junction, moves, first direction) for each junction from
+        which a square that was not pruned is reached along its
+        corridor."""
+        junction = self._junction_ids[cell]
+        if junction != -1:
+            return [(junction, 0, None)]
+        edge = self._edge_ids[cell]
+        offset = self._edge_offsets[cell]
+        first_junction, second_junction = self._edge_junctions[edge]
+        first_direction, second_direction = self._edge_directions[edge]
+        return [(first_junction, offset, first_direction),
+                (second_junction, self._edge_lengths[edge] - offset,
+                 second_direction)]
+
+    def _corridor_direction(self, cell, edge, offset):
+        """Returns the move from a corridor square to the square offset
+        moves along its edge, which is one move away."""
+        first_junction, second_junction = self._edge_junctions[edge]
+        if offset == 0:
+            target_cell = self._junction_cells[first_junction]
+        elif offset == self._edge_lengths[edge]:
+            target_cell = self._junction_cells[second_junction]
+        else:
+            target_cell = None
+        edge_ids = self._edge_ids
+        edge_offsets = self._edge_offsets
+        for direction, next_cell in self._remaining_moves(cell):
+            if next_cell == target_cell or \
+                    (target_cell is None and edge_ids[next_cell] == edge and
+                     edge_offsets[next_cell] == offset):
+                return direction
+
+    def _junction_path(self, start_cell, goal_cell):
+        """Returns the directions between two squares that were not pruned,
+        found by A* over the junctions, or None if there is no path."""
+        board = self.board
+        heuristic = self._heuristic
+        junction_cells = self._junction_cells
+        goal_location = board.cell_location(goal_cell)
+
+        def estimate(junction):
+            return heuristic(board.cell_location(junction_cells[junction]),
+                             goal_location)
+
+        '''Maps each junction the goal square is reached from along its
+        corridor to (moves, first direction).'''
+        goal_anchors = {}
+        for junction, moves, direction in self._goal_anchors(goal_cell):
+            if junction not in goal_anchors or \
+                    moves < goal_anchors[junction][0]:
+                goal_anchors[junction] = (moves, direction)
+        '''The shortest path to the goal square found so far, as (moves,
+        the junction its last leg starts from or None for the start
+        square, first direction of that leg, moves in that leg).'''
+        best_goal = None
+        edge = self._edge_ids[start_cell]
+        if edge != -1 and edge == self._edge_ids[goal_cell]:
+            start_offset = self._edge_offsets[start_cell]
+            goal_offset = self._edge_offsets[goal_cell]
+            step = 1 if goal_offset > start_offset else -1
+            moves = abs(goal_offset - start_offset)
+            best_goal = (moves, None, self._corridor_direction(
+                start_cell, edge, start_offset + step), moves)
+
+        path_costs = {}
+        '''Maps each junction reached to the leg it was reached by: (the
+        junction the leg starts from or None for the start square, first
+        direction, moves).'''
+        came_from = {}
+        frontier = []
+        for junction, moves, direction in self._start_anchors(start_cell):
+            if junction not in path_costs or moves < path_costs[junction]:
+                path_costs[junction] = moves
+                came_from[junction] = (None, direction, moves)
+                heapq.heappush(frontier, (moves + estimate(junction), moves,
+                                          junction))
+        edge_junctions = self._edge_junctions
+        edge_lengths = self._edge_lengths
+        edge_directions = self._edge_directions
+        while frontier:
+            cost, moves, junction = heapq.heappop(frontier)
+            if best_goal is not None and cost >= best_goal[0]:
+                break
+            if moves > path_costs[junction]:
+                continue
+            self.nodes_expanded += 1
+            if junction in goal_anchors:
+                goal_moves, direction = goal_anchors[junction]
+                if best_goal is None or moves + goal_moves < best_goal[0]:
+                    best_goal = (moves + goal_moves, junction, direction,
+                                 goal_moves)
+            for edge in self._junction_edges[junction]:
+                first_junction, second_junction = edge_junctions[edge]
+                if first_junction == second_junction:
+                    continue
+                if first_junction == junction:
+                    next_junction = second_junction
+                    direction = edge_directions[edge][0]
+                else:
+                    next_junction = first_junction
+                    direction = edge_directions[edge][1]
+                length = edge_lengths[edge]
+                next_moves = moves + length
+                if next_junction not in path_costs or \
+                        next_moves < path_costs[next_junction]:
+                    path_costs[next_junction] = next_moves
+                    came_from[next_junction] = (junction, direction, length)
+                    heapq.heappush(frontier,
+                                   (next_moves + estimate(next_junction),
+                                    next_moves, next_junction))
+        if best_goal is None:
+            return None
+
+        # Walk the legs back from the goal, then expand them in order.
+        moves, junction, direction, leg_moves = best_goal
+        legs = []
+        while junction is not None:
+            legs.append((junction_cells[junction], direction, leg_moves))
+            junction, direction, leg_moves = came_from[junction]
+        legs.append((start_cell, direction, leg_moves))
+        directions = []
+        for cell, direction, leg_moves in reversed(legs):
+            directions.extend(self._walk(cell, direction, leg_moves))
+        return directions
+
+    def _walk(self, cell, direction, moves):
+        """Returns the directions of a walk of some moves along a corridor,
+        starting from cell with a move in direction."""
+        neighbor = self.board.neighbor
+        directions = []
+        for move in xrange(moves):
+            directions.append(direction)
+            previous_cell = cell
+            cell = neighbor(cell, direction)
+            if move + 1 < moves:
+                for direction, next_cell in self._remaining_moves(cell):
+                    if next_cell != previous_cell:
+                        break
+        return directions
@@ -7,3 +7,12 @@ class Direction(object):
     down = 1
     left = 2
     right = 3
+
+
+'''The direction that undoes each move.'''
+opposite_directions = {
+    Direction.up: Direction.down,
+    Direction.down: Direction.up,
+    Direction.left: Direction.right,
+    Direction.right: Direction.left,
+}
@@ -0,0 +1,73 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from board_distances import distance_field
+from board_square_type import BoardSquareType
+from food_agent_ai import search_target
+
+
+class DistanceFieldSearch(object):
+    """Follows the exact distance field of the goal downhill.
+
+    The distance from every square to the goal is computed once with
+    board_distances.distance_field and kept until the goal changes or a
+    square of the board is set. Each search after that only walks from the
+    start to the goal, one step to a neighbor one move closer at a time, so
+    it costs time proportional to the length of the path. The heuristic is
+    not used."""
+
+    name = 'distance_field'
+
+    def __init__(self, board, heuristic):
+        self.board = board
+        self.nodes_expanded = 0
+        self._goal_cell = None
+        self._field = None
+        board.add_change_listener(self._square_changed)
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food, or to
+        goal_cell if it is not None. Returns None if it cannot be
+        reached."""
+        board = self.board
+        target_location = search_target(board, goal_cell)
+        if target_location is None:
+            self.nodes_expanded = 0
+            return None
+        goal_cell = board.cell_id(target_location.x, target_location.y)
+        if board.cell_type(goal_cell) == BoardSquareType.wall:
+            # A field grown from a wall would lead to its neighbors.
+            self.nodes_expanded = 0
+            return None
+        field = self.field(goal_cell)
+        distance = field[start_cell]
+        if distance < 0:
+            return None
+        successors = board.successors
+        directions = []
+        cell = start_cell
+        while distance > 0:
+            distance -= 1
+            for direction, next_cell in successors(cell):
+                if field[next_cell] == distance:
+                    directions.append(direction)
+                    cell = next_cell
+                    break
+            else:
+                # Only a field that does not match the board gets here.
+                return None
+        return directions
+
+    def field(self, goal_cell):
+        """Returns the distance from each cell to goal_cell, building it if
+        it is not cached. Sets nodes_expanded to the number of squares the
+        goal can reach if it was built, or to 0."""
+        if self._field is None or goal_cell != self._goal_cell:
+            self._field = distance_field(self.board, [goal_cell])
+            self._goal_cell = goal_cell
+            self.nodes_expanded = len(self._field) - self._field.count(-1)
+        else:
+            self.nodes_expanded = 0
+        return self._field
+
+    def _square_changed(self, board, x, y):
+        self._field = None
@@ -0,0 +1,97 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from array import array
+
+from board_distances import breadth_first_distances
+from direction import opposite_directions
+
+
+NO_DIRECTION = -1
+
+
+class FlowField(object):
+    """The first move of a shortest path to the nearest goal from every
+    square of a board, for many agents heading to the same goals.
+
+    One breadth-first search is run backward from all of the goals at
+    once. Each square reached records the move it was reached by, whose
+    opposite leads back toward the goals, so finding an agent's next move,
+    or its whole path, is a lookup per step with no search of its own. The
+    field is built when first used and again after a square of the board
+    is set."""
+
+    def __init__(self, board, goal_locations=None):
+        """goal_locations is a list of the squares to head to. If it is
+        None, every food square of the board is a goal, read again each
+        time the field is built."""
+        self.board = board
+        self.goal_locations = goal_locations
+        '''The number of squares reached the last time the field was
+        built.'''
+        self.nodes_expanded = 0
+        self._distances = None
+        self._directions = None
+        board.add_change_listener(self._square_changed)
+
+    def _build(self):
+        board = self.board
+        goal_locations = self.goal_locations
+        if goal_locations is None:
+            goal_locations = board.get_food_locations()
+        directions = array('b', [NO_DIRECTION]) * board.cell_count
+        distances = breadth_first_distances(
+            board,
+            [board.cell_id(location.x, location.y)
+             for location in goal_locations],
+            directions)
+        self._distances = distances
+        self._directions = directions
+        self.nodes_expanded = len(distances) - distances.count(-1)
+
+    def _fields(self):
+        if self._distances is None:
+            self._build()
+        return self._distances, self._directions
+
+    def distance(self, location):
+        """Returns the number of moves from a square to the nearest goal, or
+        None if no goal can be reached."""
+        distances = self._fields()[0]
+        distance = distances[self.board.cell_id(location.x, location.y)]
+        if distance < 0:
+            return None
+        return distance
+
+    def direction(self, location):
+        """Returns the first move from a square toward the nearest goal, or
+        None if it is a goal or no goal can be reached."""
+        directions = self._fields()[1]
+        direction = directions[self.board.cell_id(location.x, location.y)]
+        if direction == NO_DIRECTION:
+            return None
+        return opposite_directions[direction]
+
+    def path(self, location):
+        """Returns the directions from a square to the nearest goal, or None
+        if no goal can be reached."""
+        distances, directions = self._fields()
+        board = self.board
+        cell = board.cell_id(location.x, location.y)
+        if distances[cell] < 0:
+            return None
+        neighbor = board.neighbor
+        path = []
+        for step in xrange(distances[cell]):
+            direction = opposite_directions[directions[cell]]
+            path.append(direction)
+            cell = neighbor(cell, direction)
+        return path
+
+    def paths(self, locations):
+        """Returns path(location) for each of locations, building the field
+        at most once."""
+        return [self.path(location) for location in locations]
+
+    def _square_changed(self, board, x, y):
+        self._distances = None
+        self._directions = None
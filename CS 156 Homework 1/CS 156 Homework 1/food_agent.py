@@ -1,59 +1,224 @@
 ﻿__author__ = "Christopher Raleigh and Anthony Ferrero"
 
 from sys import argv
+from functools import partial
 from math import sqrt
+import time
 
+from bidirectional_search import BidirectionalAStar
+from board_components import ConnectedComponents
+from corridor_search import CorridorSearch
+from distance_field_search import DistanceFieldSearch
 from food_agent_ai import FoodAgentAI
+from hierarchical_search import HierarchicalSearch
+from incremental_search import DStarLite
+from jump_point_search import JumpPointSearch
+from landmark_heuristic import LandmarkHeuristic
+from memory_bounded_search import IterativeDeepeningAStar
+from tiled_board import TiledBoard
 import board_printer
 import board_state_generator
+import tiled_board
+
+
+heuristic_map = {
+    'manhattan': lambda p1, p2: abs(p1.x - p2.x) + abs(p1.y - p2.y),
+    'euclidean': lambda p1, p2: sqrt((p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2),
+    'made_up': lambda p1, p2: sqrt(abs((p1.x - p2.x) * (p1.y - p2.y)))
+}
+# Heuristics precomputed for a board, made from it and its file path.
+board_heuristic_map = {
+    'landmarks': LandmarkHeuristic.for_board_file,
+}
+# None selects the A* built into FoodAgentAI. Like it, jump_point stops at
+# whichever food square it reaches first. The other engines search for the
+# one square Board.get_food_location returns, so on a board with several
+# food squares their paths can be longer than a_star's. Each engine's name
+# attribute is its key here.
+engine_map = {
+    'a_star': None,
+    'jump_point': JumpPointSearch,
+    'bidirectional': BidirectionalAStar,
+    'd_star_lite': DStarLite,
+    'distance_field': DistanceFieldSearch,
+    'hierarchical': HierarchicalSearch,
+    'ida_star': IterativeDeepeningAStar,
+    'corridor': CorridorSearch,
+}
+DEFAULT_ENGINE_NAME = 'a_star'
+# Engines whose memory grows with the squares they search rather than with
+# the board, the only ones run on .tiles boards, which may not fit in
+# memory.
+bounded_engine_names = ['a_star', 'jump_point', 'bidirectional',
+                        'd_star_lite', 'ida_star']
+option_names = ['epsilon', 'deadline', 'memory', 'render']
+flag_names = ['stats', 'components']
 
 
 def print_error(error_message):
     print('')
     print(error_message)
     print('')
-    print('Usage: cs_156_homework_1.py [file name] [heuristic name]')
-    print('\t[heuristic name] -> manhattan|euclidean|made_up')
-
-
-NUM_SUPPORTED_PROGRAM_ARGS = 2
-# Python passes in the name of the executed module as the first argument
-NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
-if len(argv) == NUM_EXPECTED_ARGS:
-    heuristic_map = {
-        'manhattan': lambda p1, p2: abs(p1.x - p2.x) + abs(p1.y - p2.y),
-        'euclidean': lambda p1, p2: sqrt((p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2),
-        'made_up': lambda p1, p2: sqrt(abs((p1.x - p2.x) * (p1.y - p2.y)))
-    }
-    heuristic_name = argv[2]
-    if heuristic_name in heuristic_map:
-        ascii_board_file_path = argv[1]
+    print('Usage: cs_156_homework_1.py [file name] [heuristic name] '
+          '[engine name] [options]')
+    print('\t[heuristic name] -> manhattan|euclidean|made_up|landmarks')
+    print('\t[engine name] -> a_star|jump_point|bidirectional|d_star_lite|'
+          'distance_field|hierarchical|ida_star|corridor (optional, '
+          'default a_star)')
+    print('\t                 a_star and jump_point stop at any food; the '
+          'others head for')
+    print('\t                 the food square furthest right, then down')
+    print('\t[options] -> --epsilon [weight of at least 1] and '
+          '--deadline [milliseconds], for the a_star engine')
+    print('\t              --memory [kilobytes], the memory limit of the '
+          'ida_star engine')
+    print('\t              --render ' + '|'.join(board_printer.render_modes) +
+          ', how to show the solution (default ' + board_printer.FULL +
+          ')')
+    print('\t              --stats, to print search statistics as JSON')
+    print('\t              --components, to label connected components '
+          'before searching')
+
+
+def bounded_board_error():
+    return ('A ' + tiled_board.FILE_EXTENSION + ' board can only be '
+            'searched by the ' + '|'.join(bounded_engine_names) +
+            ' engines, without --components or a precomputed heuristic, '
+            'as the others need memory for every square.')
+
+
+def parse_options(args):
+    """Splits "--name value" options and "--name" flags out of args.
+    Returns the remaining arguments and a dict of option values by name,
+    where each flag given has the value True. Raises ValueError for an
+    unknown option or one without a value."""
+    arguments = []
+    options = {}
+    remaining_args = iter(args)
+    for arg in remaining_args:
+        if not arg.startswith('--'):
+            arguments.append(arg)
+            continue
+        name = arg[2:]
+        if name in flag_names:
+            options[name] = True
+            continue
+        if name not in option_names:
+            raise ValueError('Invalid option "' + arg + '"')
+        try:
+            options[name] = next(remaining_args)
+        except StopIteration:
+            raise ValueError('Option "' + arg + '" needs a value')
+    return arguments, options
+
+
+def solve(ascii_board_file_path, heuristic_name, engine, epsilon=1.0,
+          deadline_milliseconds=None, print_stats=False,
+          use_components=False, render_mode=board_printer.FULL):
+    board_state_2 = \
+        board_state_generator.generate_from_file(ascii_board_file_path)
+    if heuristic_name in board_heuristic_map:
+        heuristic = board_heuristic_map[heuristic_name](
+            board_state_2.board, ascii_board_file_path)
+    else:
         heuristic = heuristic_map[heuristic_name]
+    components = None
+    if use_components:
+        components = ConnectedComponents.for_board(board_state_2.board)
+    try:
+        current_ai = FoodAgentAI(board_state_2, heuristic, engine,
+                                 collect_stats=print_stats,
+                                 components=components)
+    except ValueError as error:
+        # The ida_star engine checks its memory limit against the board.
+        print_error(str(error))
+        return
+
+    deadline = None
+    if deadline_milliseconds is not None:
+        deadline = time.time() + deadline_milliseconds / 1000.0
+    current_ai.find_path(epsilon=epsilon, deadline=deadline)
+    if current_ai.board_is_unsolvable:
+        print('This board is unsolvable')
+    else:
+        # Make sure agent starts where it began from originally.
+        board_state_2.reset_agent_position()
+        # Ignore agent start position node.
+        current_ai.movement_path_list.remove(None)
+        board_printer.render_solution(board_state_2,
+                                      current_ai.movement_path_list,
+                                      render_mode)
+        print('Problem Solved! I had some noodles!')
+        if epsilon > 1:
+            print('The path is at most ' +
+                  str(current_ai.suboptimality_bound) +
+                  ' times longer than the shortest.')
+    if isinstance(current_ai.engine, IterativeDeepeningAStar):
+        print('Expanded ' + str(current_ai.engine.re_expansions) +
+              ' nodes again to stay within the memory limit.')
+    if isinstance(board_state_2.board, TiledBoard):
+        print('Mapped tiles ' + str(board_state_2.board.tile_misses) +
+              ' times; ' + str(board_state_2.board.resident_tile_count) +
+              ' are resident.')
+    if print_stats:
+        print(current_ai.stats.to_json())
 
-        board_state_2 = \
-            board_state_generator.generate_from_file(ascii_board_file_path)
-        current_ai = FoodAgentAI(board_state_2, heuristic)
 
-        current_ai.find_path()
-        if current_ai.board_is_unsolvable:
-            print('This board is unsolvable')
+def main(args):
+    try:
+        args, options = parse_options(args)
+        epsilon = float(options.get('epsilon', 1.0))
+        deadline_milliseconds = None
+        if 'deadline' in options:
+            deadline_milliseconds = float(options['deadline'])
+        memory_limit = None
+        if 'memory' in options:
+            memory_limit = int(options['memory']) * 1024
+        render_mode = options.get('render', board_printer.FULL)
+    except ValueError as error:
+        print_error(str(error))
+        return
+    NUM_SUPPORTED_PROGRAM_ARGS = 2
+    NUM_OPTIONAL_PROGRAM_ARGS = 1
+    # Python passes in the name of the executed module as the first argument
+    NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
+    num_args = len(args)
+    if NUM_EXPECTED_ARGS <= num_args <= \
+            NUM_EXPECTED_ARGS + NUM_OPTIONAL_PROGRAM_ARGS:
+        heuristic_name = args[2]
+        engine_name = DEFAULT_ENGINE_NAME
+        if num_args > NUM_EXPECTED_ARGS:
+            engine_name = args[3]
+        if heuristic_name not in heuristic_map and \
+                heuristic_name not in board_heuristic_map:
+            print_error('Invalid heuristic name "' + heuristic_name + '"')
+        elif engine_name not in engine_map:
+            print_error('Invalid engine name "' + engine_name + '"')
+        elif epsilon < 1:
+            print_error('The epsilon must be at least 1.')
+        elif (epsilon > 1 or deadline_milliseconds is not None) and \
+                engine_name != 'a_star':
+            print_error('--epsilon and --deadline only apply to the a_star '
+                        'engine.')
+        elif memory_limit is not None and engine_name != 'ida_star':
+            print_error('--memory only applies to the ida_star engine.')
+        elif render_mode not in board_printer.render_modes:
+            print_error('Invalid render mode "' + render_mode + '"')
+        elif tiled_board.is_tiles_file(args[1]) and \
+                (engine_name not in bounded_engine_names or
+                 heuristic_name in board_heuristic_map or
+                 'components' in options):
+            print_error(bounded_board_error())
         else:
-            # Make sure agent starts where it began from originally.
-            board_state_2.reset_agent_position()
-            # Ignore agent start position node.
-            current_ai.movement_path_list.remove(None)
-            print('Initial:')
-            board_printer.print_board(board_state_2)
-
-            solution_step_nums = xrange(len(current_ai.movement_path_list))
-            for step_number in solution_step_nums:
-                print('')
-                step_direction = current_ai.movement_path_list[step_number]
-                board_state_2.agent.move(step_direction)
-                print('Step ' + str(step_number + 1) + ':')
-                board_printer.print_board(board_state_2)
-            print('Problem Solved! I had some noodles!')
+            engine = engine_map[engine_name]
+            if memory_limit is not None:
+                engine = partial(engine, memory_limit=memory_limit)
+            solve(args[1], heuristic_name, engine, epsilon,
+                  deadline_milliseconds, 'stats' in options,
+                  'components' in options, render_mode)
     else:
-        print_error('Invalid heuristic name "' + heuristic_name + '"')
-else:
-    print_error('You must enter two arguments.')
+        print_error('You must enter two arguments.')
+
+
+if __name__ == '__main__':
+    main(argv)
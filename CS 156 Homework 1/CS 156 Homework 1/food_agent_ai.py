@@ -1,18 +1,70 @@
 __author__ = "Christopher Raleigh and Anthony Ferrero"
 
+import time
+
+from board_square import BoardSquare
+from board_square_type import BoardSquareType
 from direction import Direction
-from node_priority_queue import NodePriorityQueue
-from node import Node
+from node_priority_queue import CellPriorityQueue
+from search_state import CLOSED, OPEN, SearchState
+from search_stats import SearchStats
 
 
 class FoodAgentAI(object):
     """An intelligence that controls a food agent"""
 
-    def __init__(self, board_state, heuristic):
+    '''How much ARA* lowers epsilon after each solution it finds.'''
+    EPSILON_STEP = 0.5
+    '''How many nodes ARA* expands between checks of its deadline.'''
+    DEADLINE_CHECK_INTERVAL = 64
+
+    def __init__(self, board_state, heuristic, engine=None, path_cache=None,
+                 collect_stats=False, components=None):
+        """engine is an optional search engine class, such as
+        JumpPointSearch, used by find_path instead of the built in A*. Its
+        name, the key of the engine in food_agent.engine_map, identifies
+        its paths in path_cache.
+        path_cache is an optional PathCache that find_path checks before
+        searching. If collect_stats is true, each find_path leaves a
+        SearchStats in stats; otherwise stats stays None and the heuristic
+        is not timed. components is an optional ConnectedComponents of the
+        board, used to give up at once when the goal is in another
+        component than the agent."""
         self.board_state = board_state
+        self.stats = None
+        if collect_stats:
+            self.stats = SearchStats()
+            heuristic = self._timed_heuristic(heuristic)
         self._heuristic = heuristic
         self.board_is_unsolvable = False
         self.movement_path_list = []
+        self.nodes_expanded = 0
+        '''After find_path, a proven bound on how many times longer than
+        optimal the path found is, or None if there is no proof.'''
+        self.suboptimality_bound = None
+        self.path_cache = path_cache
+        self.components = components
+        self.engine = None
+        '''Identifies the engine in path_cache keys.'''
+        self._engine_name = 'a_star'
+        if engine is not None:
+            self.engine = engine(board_state.board, heuristic)
+            self._engine_name = self.engine.name
+        '''The tables of the built in A* and ARA*, made by their first search
+        and reused by the rest.'''
+        self._search_state = None
+        self._frontier = None
+
+    def _timed_heuristic(self, heuristic):
+        """Wraps a heuristic so the time spent in it is added to stats."""
+        def timed_heuristic(p1, p2):
+            started = time.time()
+            estimate = heuristic(p1, p2)
+            stats = self.stats
+            stats.heuristic_seconds += time.time() - started
+            stats.heuristic_calls += 1
+            return estimate
+        return timed_heuristic
 
     def on_food_agent_turn(self):
         """Actions for the AI to perform on its agent's turn."""
@@ -22,7 +74,10 @@ class FoodAgentAI(object):
     @staticmethod
     def solution(tree):
         """Returns a list of directions the agent should move to
-           get to the food via an optimal path."""
+           get to the food via an optimal path, starting with the direction
+           of the root of tree. find_path keeps its search tree in a
+           SearchState instead; this is for callers with a tree of Node
+           objects."""
         solution_list = []
         current_node = tree
         while current_node is not None:
@@ -46,61 +101,289 @@ class FoodAgentAI(object):
                 possible_directions.append(next_direction)
         return possible_directions
 
-    def find_path(self):
-        """Uses A* to find a path from the agent's current position to the food
-           on the board."""
-        start_node_cost = 0
-        start_node = Node(agent_location=self.board_state.agent.get_location(),
-                          direction=None,
-                          path_cost=start_node_cost,
-                          cost=start_node_cost)
-        frontier = NodePriorityQueue(start_node)
-        explored_locations = set()
+    def find_path(self, goal_location=None, epsilon=1.0, deadline=None):
+        """Finds a path from the agent's current position to the food on the
+           board, or to goal_location if given, using A* or the engine if
+           one was given. The search works on cell ids and never moves the
+           agent; replay movement_path_list to move it. If components
+           shows the goal is in another component, nothing is searched.
 
+           An epsilon greater than 1 runs ARA* instead of A*: its first path
+           is at most epsilon times longer than optimal, and if a deadline
+           (a time.time() value) is given, it keeps improving the path
+           until the deadline or until it is proven optimal. The path cache
+           and engines are not used then. Raises ValueError if epsilon is
+           less than 1, or is used with an engine."""
+        if epsilon < 1:
+            raise ValueError('epsilon must be at least 1')
+        if epsilon > 1 and self.engine is not None:
+            raise ValueError('epsilon only applies to the built in A*')
+        if self.stats is not None:
+            self.stats = SearchStats()
+            started = time.time()
+        board = self.board_state.board
         agent = self.board_state.agent
-        while True:
-            no_solution = len(frontier) == 0
-            if no_solution:
-                self.board_is_unsolvable = True
+        start_cell = board.cell_id(agent.x, agent.y)
+        goal_cell = None
+        if goal_location is not None:
+            goal_cell = board.cell_id(goal_location.x, goal_location.y)
+        path_cache = self.path_cache
+        target_location = search_target(board, goal_cell)
+        self.suboptimality_bound = None
+        if target_location is not None and not self._may_reach(
+                board, start_cell, goal_cell, target_location):
+            directions = None
+            self.nodes_expanded = 0
+        elif epsilon > 1:
+            directions = self._ara_star(board, start_cell, goal_cell,
+                                        epsilon, deadline)
+        elif path_cache is not None and target_location is not None:
+            cache_key = path_cache.key(board, agent.get_location(),
+                                       goal_location, self._engine_name)
+            try:
+                directions = path_cache[cache_key]
+                self.nodes_expanded = 0
+                if self.stats is not None:
+                    self.stats.path_cache_hit = True
+            except KeyError:
+                directions = self._search(board, start_cell, goal_cell)
+                path_cache[cache_key] = directions
+        else:
+            directions = self._search(board, start_cell, goal_cell)
+        self.board_is_unsolvable = directions is None
+        if directions is not None:
+            # The start position has no direction.
+            self.movement_path_list = [None] + directions
+        if self.stats is not None:
+            self.stats.nodes_expanded = self.nodes_expanded
+            self.stats.wall_seconds = time.time() - started
+
+    def _may_reach(self, board, start_cell, goal_cell, target_location):
+        """Returns False if components shows the goal cannot be reached
+        from start_cell. Without goal_cell the search stops at any food, so
+        every food square is checked, starting with target_location."""
+        components = self.components
+        if components is None:
+            return True
+        if components.connected(
+                start_cell,
+                board.cell_id(target_location.x, target_location.y)):
+            return True
+        if goal_cell is not None:
+            return False
+        return any(components.connected(start_cell,
+                                         board.cell_id(food.x, food.y))
+                   for food in board.get_food_locations())
+
+    def _search(self, board, start_cell, goal_cell):
+        """Returns the directions found by the engine or A*."""
+        if self.engine is not None:
+            directions = self.engine.search(start_cell, goal_cell)
+            self.nodes_expanded = self.engine.nodes_expanded
+            return directions
+        directions = self._a_star(board, start_cell, goal_cell)
+        if directions is not None:
+            self.suboptimality_bound = 1.0
+        return directions
+
+    def _start_search(self, board, start_cell, start_cost):
+        """Returns the SearchState and frontier for a search from
+        start_cell. After the first search they are reset instead of made
+        again, which costs time for the cells the last search reached
+        rather than for every cell of the board."""
+        state = self._search_state
+        if state is None:
+            state = self._search_state = SearchState(board.cell_count)
+            self._frontier = CellPriorityQueue(start_cell, start_cost,
+                                               board.cell_count)
+        else:
+            self._frontier.restart(start_cell, start_cost)
+        state.start(start_cell)
+        return state, self._frontier
+
+    def _a_star(self, board, start_cell, goal_cell=None):
+        """Uses A* to find the directions from start_cell to the food, or to
+           goal_cell if it is not None. Returns None if it cannot be
+           reached."""
+        estimate = cell_heuristic(board, self._heuristic,
+                                  search_target(board, goal_cell))
+        state, frontier = self._start_search(board, start_cell, 0)
+        path_costs = state.path_costs
+        explored = state.closed
+
+        food = BoardSquareType.food
+        nodes_expanded = 0
+        nodes_generated = 0
+        decrease_keys = 0
+        frontier_size = peak_frontier_size = 1
+        directions = None
+        while frontier:
+            if frontier_size > peak_frontier_size:
+                peak_frontier_size = frontier_size
+            current_cell = frontier.pop()
+            frontier_size -= 1
+            if current_cell == goal_cell or \
+                    (goal_cell is None and
+                     board.cell_type(current_cell) == food):
+                directions = state.solution(current_cell)
                 break
 
-            current_node = frontier.pop()
-            '''Not using move(), because A* can switch between considering
-            completely different paths at any time.'''
-            agent.set_location(current_node.get_agent_location())
-            if self.board_state.food_eaten():
-                self.movement_path_list = self.solution(current_node)
+            explored[current_cell] = CLOSED
+            nodes_expanded += 1
+            child_path_cost = path_costs[current_cell] + 1
+            for direction, child_cell in board.successors(current_cell):
+                if explored[child_cell]:
+                    continue
+                known_path_cost = path_costs[child_cell]
+                if known_path_cost != -1 and \
+                        known_path_cost <= child_path_cost:
+                    continue
+                state.reach(child_cell, current_cell, direction,
+                            child_path_cost)
+                child_cost = child_path_cost + estimate(child_cell)
+                nodes_generated += 1
+                if known_path_cost == -1:
+                    frontier.push(child_cell, child_cost)
+                    frontier_size += 1
+                else:
+                    frontier.set_priority(child_cell, child_cost)
+                    decrease_keys += 1
+        self.nodes_expanded = nodes_expanded
+        if self.stats is not None:
+            # Closed cells are never expanded again, so each expansion
+            # adds one to the explored set.
+            self.stats.record_search(nodes_generated, decrease_keys,
+                                     peak_frontier_size, nodes_expanded)
+        return directions
+
+    def _ara_star(self, board, start_cell, goal_cell, epsilon, deadline):
+        """Uses ARA* (Likhachev, Gordon and Thrun) to find the directions
+           from start_cell to the food, or to goal_cell if it is not None.
+           Each pass is an A* with the estimates weighted by epsilon that
+           reuses the work of the passes before it. Returns the best path
+           found, or None if the goal cannot be reached, and sets
+           suboptimality_bound."""
+        target_location = search_target(board, goal_cell)
+        self.nodes_expanded = 0
+        if target_location is None:
+            return None
+        goal_cell = board.cell_id(target_location.x, target_location.y)
+        estimate = cell_heuristic(board, self._heuristic, target_location)
+        state, frontier = self._start_search(board, start_cell,
+                                             epsilon * estimate(start_cell))
+        path_costs = state.path_costs
+        closed = state.closed
+        '''Cells whose path cost fell after they were expanded in this pass,
+        to be expanded again in the next one.'''
+        inconsistent_cells = set()
+        bound = None
+        check_interval = self.DEADLINE_CHECK_INTERVAL
+        nodes_generated = 0
+        decrease_keys = 0
+        frontier_size = peak_frontier_size = 1
+        explored_size = 0
+        while True:
+            interrupted = False
+            while frontier:
+                if frontier_size > peak_frontier_size:
+                    peak_frontier_size = frontier_size
+                current_cell = frontier.peek()
+                goal_path_cost = path_costs[goal_cell]
+                if goal_path_cost != -1 and goal_path_cost <= \
+                        frontier.get_location_priority(current_cell):
+                    break
+                # The first path is always finished, so there is one to
+                # return.
+                if deadline is not None and bound is not None and \
+                        self.nodes_expanded % check_interval == 0 and \
+                        time.time() >= deadline:
+                    interrupted = True
+                    break
+                frontier.pop()
+                frontier_size -= 1
+                if closed[current_cell] == OPEN:
+                    explored_size += 1
+                closed[current_cell] = CLOSED
+                self.nodes_expanded += 1
+                child_path_cost = path_costs[current_cell] + 1
+                for direction, child_cell in board.successors(current_cell):
+                    known_path_cost = path_costs[child_cell]
+                    if known_path_cost != -1 and \
+                            known_path_cost <= child_path_cost:
+                        continue
+                    state.reach(child_cell, current_cell, direction,
+                                child_path_cost)
+                    if closed[child_cell] == CLOSED:
+                        inconsistent_cells.add(child_cell)
+                        continue
+                    child_cost = child_path_cost + \
+                        epsilon * estimate(child_cell)
+                    nodes_generated += 1
+                    if child_cell in frontier:
+                        frontier.set_priority(child_cell, child_cost)
+                        decrease_keys += 1
+                    else:
+                        frontier.push(child_cell, child_cost)
+                        frontier_size += 1
+
+            goal_path_cost = path_costs[goal_cell]
+            if goal_path_cost == -1:
                 break
+            # No path can be shorter than the least path cost plus estimate
+            # of a cell still to be expanded.
+            open_cells = list(inconsistent_cells)
+            while frontier:
+                open_cells.append(frontier.pop())
+            lower_bound = None
+            if open_cells:
+                lower_bound = min(path_costs[cell] + estimate(cell)
+                                  for cell in open_cells)
+            if bound is None:
+                bound = epsilon
+            if lower_bound is None or lower_bound >= goal_path_cost:
+                bound = 1.0
+            elif lower_bound > 0:
+                bound = min(bound, float(goal_path_cost) / lower_bound)
+            if bound <= 1 or interrupted or deadline is None or \
+                    time.time() >= deadline:
+                break
+
+            epsilon = max(1.0, epsilon - self.EPSILON_STEP)
+            inconsistent_cells = set()
+            state.reopen()
+            first_cell = open_cells[0]
+            frontier.restart(
+                first_cell,
+                path_costs[first_cell] + epsilon * estimate(first_cell))
+            for cell in open_cells[1:]:
+                frontier.push(cell,
+                              path_costs[cell] + epsilon * estimate(cell))
+            frontier_size = len(open_cells)
+        if self.stats is not None:
+            self.stats.record_search(nodes_generated, decrease_keys,
+                                     peak_frontier_size, explored_size)
+        if goal_path_cost == -1:
+            return None
+        self.suboptimality_bound = bound
+        return state.solution(goal_cell)
+
+
+def search_target(board, goal_cell):
+    """Returns the location of goal_cell, or if it is None, the one food
+    square Board.get_food_location returns. Engines that search for this
+    square, rather than testing every square for food, can miss a nearer
+    food square on boards with several."""
+    if goal_cell is None:
+        return board.get_food_location()
+    return board.cell_location(goal_cell)
+
+
+def cell_heuristic(board, heuristic, goal_location):
+    """Adapts a heuristic over board squares to one over the cell ids of
+    board. A single BoardSquare is reused for every call, so estimating
+    allocates nothing."""
+    location = BoardSquare(0, 0)
 
-            explored_locations.add(current_node.get_agent_location())
-            for direction in self.possible_actions():
-                # Must try to move from the position of current_node repeatedly
-                agent.set_location(current_node.get_agent_location())
-                agent.move(direction)
-
-                child = self._make_child_node(current_node, direction)
-                child_in_frontier = child in frontier
-
-                if child.get_agent_location() not in explored_locations and \
-                        not child_in_frontier:
-                    frontier.push(child)
-                elif child_in_frontier and \
-                                frontier.get_priority(child) > child.get_cost():
-                    frontier.set_priority(
-                        node=child,
-                        new_cost=child.get_cost()
-                    )
-
-    def _make_child_node(self, current_node, direction):
-        """Creates a child node of current_node."""
-        child_node_path_cost = current_node.get_path_cost() + 1
-        heuristic_value = self._heuristic(
-            self.board_state.agent.get_location(),
-            self.board_state.board.get_food_location()
-        )
-        child_node_cost = child_node_path_cost + heuristic_value
-        return Node(agent_location=self.board_state.agent.get_location(),
-                    direction=direction,
-                    cost=child_node_cost,
-                    path_cost=child_node_path_cost,
-                    parent=current_node)
+    def estimate(cell):
+        return heuristic(board.cell_location(cell, location), goal_location)
+    return estimate
@@ -1,6 +1,5 @@
 __author__ = "Christopher Raleigh and Anthony Ferrero"
 
-from board_square_type import BoardSquareType
 from direction import Direction
 from board_square import BoardSquare
 
@@ -15,28 +14,7 @@ class FoodAgent(object):
 
     def can_move(self, direction):
         """Can move in the specified direction."""
-        target_x = self.x
-        target_y = self.y
-        if direction == Direction.up:
-            target_y -= 1
-        elif direction == Direction.down:
-            target_y += 1
-        elif direction == Direction.left:
-            target_x -= 1
-        elif direction == Direction.right:
-            target_x += 1
-        else:
-            return False
-        if (target_x < 0) or (target_y < 0):
-            return False
-        board = self.board
-        max_x = board.width - 1
-        max_y = board.height - 1
-        if (target_x > max_x) or (target_y > max_y):
-            return False
-        if board.squares[target_x][target_y] == BoardSquareType.wall:
-            return False
-        return True
+        return self.board.can_move(self.x, self.y, direction)
 
     def move(self, direction):
         """Moves one square in the specified direction"""
@@ -0,0 +1,1126 @@
+__author__ = 'Christopher Raleigh and Anthony Ferrero'
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from StringIO import StringIO
+
+from batch_food_agent import solve_queries
+from benchmarks import maze_generator, run_benchmarks
+from bidirectional_search import BidirectionalAStar
+from board import Board
+from board_components import ConnectedComponents
+from board_square import BoardSquare
+from board_square_type import BoardSquareType
+from board_state import BoardState
+from compact_board import CompactBoard
+from corridor_search import CorridorSearch
+from direction import Direction
+from distance_field_search import DistanceFieldSearch
+from flow_field import FlowField
+from food_agent_ai import FoodAgentAI
+import food_agent
+from hierarchical_search import HierarchicalSearch
+from incremental_search import DStarLite
+from jump_point_search import JumpPointSearch
+from landmark_heuristic import LandmarkHeuristic
+from memory_bounded_search import IterativeDeepeningAStar
+from node import Node
+import maze_file
+from node_priority_queue import CellPriorityQueue, NodePriorityQueue
+from path_cache import PathCache
+from portfolio_search import PortfolioSearch, PortfolioStats
+from search_state import SparseCells
+import search_state
+import tiled_board
+import board_distances
+import board_printer
+from board_distances import breadth_first_distances
+import board_state_generator
+
+TESTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'Tests')
+
+
+def board_file_path(test_number):
+    return os.path.join(TESTS_DIRECTORY, 'Test ' + str(test_number) + '.txt')
+
+
+def manhattan(p1, p2):
+    return abs(p1.x - p2.x) + abs(p1.y - p2.y)
+
+
+def solve(board_state, heuristic=manhattan, engine=None):
+    """Returns the directions found by FoodAgentAI, without the start
+    position's None, or None if the board is unsolvable."""
+    ai = FoodAgentAI(board_state, heuristic, engine)
+    ai.find_path()
+    if ai.board_is_unsolvable:
+        return None
+    return [d for d in ai.movement_path_list if d is not None]
+
+
+def replay(board_state, directions):
+    """Moves the agent of board_state along directions and returns whether
+    every move succeeded and the food was eaten at the end."""
+    board_state.reset_agent_position()
+    for direction in directions:
+        if not board_state.agent.move(direction):
+            return False
+    return board_state.food_eaten()
+
+
+'''Steps from the agent of several_food_board_state to the nearest food,
+and to the food square Board.get_food_location picks.'''
+NEAREST_FOOD_STEPS = 2
+PICKED_FOOD_STEPS = 5
+
+
+def several_food_board_state(compact=False):
+    """Returns this board, with three food squares:
+
+    ..%
+    .@.
+    %##
+    ..%"""
+    board = CompactBoard(3, 4) if compact else Board(3, 4)
+    for x, y in [(2, 0), (0, 2), (2, 3)]:
+        board.set_square(x, y, BoardSquareType.food)
+    board.set_square(1, 2, BoardSquareType.wall)
+    board.set_square(2, 2, BoardSquareType.wall)
+    return BoardState(board, 1, 1)
+
+
+def make_node(x, y, cost, parent=None):
+    return Node(agent_location=BoardSquare(x, y),
+                direction=None,
+                cost=cost,
+                path_cost=cost,
+                parent=parent)
+
+
+class NodePriorityQueueTestCase(unittest.TestCase):
+    def test_pop_order(self):
+        frontier = NodePriorityQueue(make_node(0, 0, 5))
+        for x, cost in [(1, 3), (2, 8), (3, 1), (4, 3)]:
+            frontier.push(make_node(x, 0, cost))
+        popped = [frontier.pop().get_agent_location().x
+                  for i in xrange(len(frontier))]
+        # Equal costs come out in insertion order.
+        self.assertEqual(popped, [3, 1, 4, 0, 2])
+
+    def test_set_priority(self):
+        frontier = NodePriorityQueue(make_node(0, 0, 5))
+        frontier.push(make_node(1, 0, 6))
+        frontier.push(make_node(2, 0, 7))
+        parent = make_node(9, 9, 0)
+        improved = make_node(2, 0, 1, parent=parent)
+        frontier.set_priority(node=improved, new_cost=1)
+        self.assertEqual(frontier.get_priority(improved), 1)
+        popped = frontier.pop()
+        self.assertIs(popped, improved)
+        self.assertIs(popped.get_parent(), parent)
+        self.assertFalse(improved in frontier)
+        frontier.set_priority(node=make_node(0, 0, 10), new_cost=10)
+        self.assertEqual(frontier.pop().get_agent_location().x, 1)
+        self.assertEqual(frontier.pop().get_cost(), 10)
+        self.assertEqual(len(frontier), 0)
+
+    def test_priority_ordering(self):
+        low = NodePriorityQueue.Priority(1, 0, None, 0)
+        high = NodePriorityQueue.Priority(2, 1, None, 1)
+        tie = NodePriorityQueue.Priority(1, 2, None, 2)
+        self.assertTrue(cmp(low, high) < 0)
+        self.assertTrue(cmp(high, low) > 0)
+        self.assertTrue(cmp(low, tie) < 0)
+        self.assertTrue(low < tie < high)
+
+
+class CellPriorityQueueTestCase(unittest.TestCase):
+    def test_pop_order(self):
+        frontier = CellPriorityQueue(0, 5, cell_count=10)
+        for cell, cost in [(1, 3), (2, 8), (3, 1), (4, 3)]:
+            frontier.push(cell, cost)
+        self.assertIn(4, frontier)
+        self.assertNotIn(5, frontier)
+        self.assertEqual(frontier.peek(), 3)
+        popped = [frontier.pop() for i in xrange(len(frontier))]
+        # Equal costs come out in insertion order.
+        self.assertEqual(popped, [3, 1, 4, 0, 2])
+        self.assertNotIn(4, frontier)
+
+    def test_set_priority(self):
+        frontier = CellPriorityQueue(0, 5, cell_count=10)
+        frontier.push(1, 6)
+        frontier.push(2, 7)
+        frontier.set_priority(2, 1)
+        self.assertEqual(frontier.get_location_priority(2), 1)
+        self.assertEqual(frontier.pop(), 2)
+        self.assertIsNone(frontier.get_location_priority(2))
+        frontier.set_priority(0, 10)
+        self.assertEqual([frontier.pop(), frontier.pop()], [1, 0])
+        self.assertEqual(len(frontier), 0)
+
+
+class CompactBoardTestCase(unittest.TestCase):
+    def test_matches_board(self):
+        for test_number in [1, 2, 3]:
+            path = board_file_path(test_number)
+            board_state = board_state_generator.generate_from_file(path)
+            compact_state = \
+                board_state_generator.generate_from_file(path, compact=True)
+            board = board_state.board
+            compact_board = compact_state.board
+            for x in xrange(board.width):
+                for y in xrange(board.height):
+                    self.assertEqual(board.get_square(x, y),
+                                     compact_board.get_square(x, y))
+                    for direction in [Direction.up, Direction.down,
+                                      Direction.left, Direction.right]:
+                        self.assertEqual(
+                            board.can_move(x, y, direction),
+                            compact_board.can_move(x, y, direction))
+            self.assertEqual(board.get_food_location(),
+                             compact_board.get_food_location())
+            self.assertEqual(solve(board_state), solve(compact_state))
+
+    def test_border_is_wall(self):
+        board = CompactBoard(3, 2)
+        self.assertFalse(board.can_move(0, 0, Direction.up))
+        self.assertFalse(board.can_move(0, 0, Direction.left))
+        self.assertFalse(board.can_move(2, 1, Direction.down))
+        self.assertFalse(board.can_move(2, 1, Direction.right))
+        self.assertTrue(board.can_move(0, 0, Direction.right))
+        board.set_square(1, 0, BoardSquareType.wall)
+        self.assertFalse(board.can_move(0, 0, Direction.right))
+        self.assertEqual(len(board.cells), 5 * 4)
+
+
+class BoardStateGeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generate(self, contents, compact=False):
+        path = os.path.join(self.directory, 'board.txt')
+        with open(path, 'wb') as board_file:
+            board_file.write(contents)
+        return board_state_generator.generate_from_file(path, compact)
+
+    def test_line_endings(self):
+        for contents in ['%.#\r\n.@.\r\n', '%.#\n.@.', '%.#\n.@.\n\n\n']:
+            for compact in [False, True]:
+                board_state = self.generate(contents, compact)
+                board = board_state.board
+                self.assertEqual((board.width, board.height), (3, 2))
+                self.assertEqual(board_state.agent.get_location(),
+                                 BoardSquare(1, 1))
+                self.assertEqual(board.get_food_location(), BoardSquare(0, 0))
+                self.assertEqual(board.get_square(2, 0), BoardSquareType.wall)
+                self.assertEqual(board.get_square(1, 1),
+                                 BoardSquareType.empty)
+
+    def test_food_location_matches_scan(self):
+        board_state = self.generate('%..%\n...%\n%@..\n', compact=True)
+        self.assertEqual(board_state.board.get_food_location(),
+                         BoardSquare(3, 1))
+
+    def test_ragged_rows(self):
+        for contents in ['...\n..\n...\n', '...\n\n...\n', '...\n....\n']:
+            self.assertRaises(ValueError, self.generate, contents)
+
+
+class MazeFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'Test 3.maze')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        for compact in [False, True]:
+            board_state = board_state_generator.generate_from_file(
+                board_file_path(3), compact)
+            maze_file.write_maze(board_state, self.path)
+            opened = board_state_generator.generate_from_file(self.path)
+            self.assertEqual(opened.board.content_hash(),
+                             board_state.board.content_hash())
+            self.assertEqual(opened.agent.get_location(), BoardSquare(3, 4))
+            self.assertEqual(opened.board.get_food_location(),
+                             BoardSquare(6, 4))
+            self.assertEqual(len(solve(opened)), 9)
+
+    def test_changes_not_written_back(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        maze_file.write_maze(board_state, self.path)
+        opened = maze_file.open_maze(self.path)
+        opened.board.set_square(0, 0, BoardSquareType.wall)
+        self.assertEqual(opened.board.get_square(0, 0), BoardSquareType.wall)
+        reopened = maze_file.open_maze(self.path)
+        self.assertEqual(reopened.board.get_square(0, 0),
+                         BoardSquareType.empty)
+
+    def test_not_a_maze(self):
+        with open(self.path, 'wb') as bad_file:
+            bad_file.write('.......\n')
+        self.assertRaises(ValueError, maze_file.open_maze, self.path)
+
+
+class TiledBoardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'Test 3.tiles')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_test_3(self, tile_size=2, max_resident_tiles=2):
+        tiled_board.convert_ascii(board_file_path(3), self.path, tile_size)
+        return tiled_board.open_tiles(self.path, max_resident_tiles)
+
+    def test_round_trip(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        for tile_size in [1, 2, 3, 16]:
+            opened = self.open_test_3(tile_size)
+            self.assertEqual(opened.board.content_hash(),
+                             board_state.board.content_hash())
+            self.assertEqual(opened.agent.get_location(), BoardSquare(3, 4))
+            self.assertEqual(opened.board.get_food_location(),
+                             BoardSquare(6, 4))
+            converted = open(self.path, 'rb').read()
+            tiled_board.write_tiles(board_state, self.path, tile_size)
+            self.assertEqual(open(self.path, 'rb').read(), converted)
+
+    def test_search(self):
+        board_state = self.open_test_3()
+        directions = solve(board_state)
+        self.assertEqual(len(directions), 9)
+        self.assertTrue(replay(board_state, directions))
+        board_state.reset_agent_position()
+        self.assertEqual(solve(board_state, engine=IterativeDeepeningAStar),
+                         directions)
+        self.assertGreater(board_state.board.tile_misses, 0)
+        self.assertLessEqual(board_state.board.resident_tile_count, 2)
+
+    def test_bounded_engines(self):
+        sparse_cell_count = search_state.SPARSE_CELL_COUNT
+        search_state.SPARSE_CELL_COUNT = 0
+        try:
+            board_state = self.open_test_3()
+            for engine_name in food_agent.bounded_engine_names:
+                board_state.reset_agent_position()
+                directions = solve(board_state,
+                                   engine=food_agent.engine_map[engine_name])
+                self.assertEqual(len(directions), 9)
+                self.assertTrue(replay(board_state, directions))
+        finally:
+            search_state.SPARSE_CELL_COUNT = sparse_cell_count
+
+    def test_changes_kept_after_eviction(self):
+        board = self.open_test_3().board
+        board.set_square(0, 0, BoardSquareType.wall)
+        for y in xrange(board.height):
+            board.get_row(y)
+        self.assertEqual(board.get_square(0, 0), BoardSquareType.wall)
+        reopened = tiled_board.open_tiles(self.path)
+        self.assertEqual(reopened.board.get_square(0, 0),
+                         BoardSquareType.empty)
+
+    def test_not_tiles(self):
+        with open(self.path, 'wb') as bad_file:
+            bad_file.write('.......\n')
+        self.assertRaises(ValueError, tiled_board.open_tiles, self.path)
+        self.open_test_3()
+        with open(self.path, 'ab') as long_file:
+            long_file.write('\0')
+        self.assertRaises(ValueError, tiled_board.open_tiles, self.path)
+
+
+class ConnectedComponentsTestCase(unittest.TestCase):
+    def test_follows_walls(self):
+        for compact in [False, True]:
+            board = board_state_generator.generate_from_file(
+                board_file_path(3), compact=compact).board
+            components = ConnectedComponents.for_board(board)
+            self.assertIs(ConnectedComponents.for_board(board), components)
+            start = board.cell_id(0, 0)
+            food = board.cell_id(6, 4)
+            self.assertTrue(components.connected(start, food))
+
+            # (6, 3) is the only way to the food.
+            board.set_square(6, 3, BoardSquareType.wall)
+            self.assertFalse(components.connected(start, food))
+            self.assertEqual(components.component(board.cell_id(6, 3)), -1)
+            board.set_square(6, 3, BoardSquareType.empty)
+            self.assertTrue(components.connected(start, food))
+
+    def test_unsolvable_without_search(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        board_state.board.set_square(6, 3, BoardSquareType.wall)
+        ai = FoodAgentAI(
+            board_state, manhattan,
+            components=ConnectedComponents.for_board(board_state.board))
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+        self.assertEqual(ai.nodes_expanded, 0)
+
+    def test_any_food(self):
+        # Only the food at (1, 0) can be reached; the wall cuts off the
+        # food at (4, 0) that get_food_location chooses.
+        for compact in [False, True]:
+            board = (CompactBoard if compact else Board)(5, 1)
+            board.set_square(1, 0, BoardSquareType.food)
+            board.set_square(3, 0, BoardSquareType.wall)
+            board.set_square(4, 0, BoardSquareType.food)
+            ai = FoodAgentAI(BoardState(board, 0, 0), manhattan,
+                             components=ConnectedComponents.for_board(board))
+            ai.find_path()
+            self.assertFalse(ai.board_is_unsolvable)
+            self.assertEqual(ai.movement_path_list, [None, Direction.right])
+            ai.find_path(goal_location=BoardSquare(4, 0))
+            self.assertTrue(ai.board_is_unsolvable)
+
+
+class FlowFieldTestCase(unittest.TestCase):
+    def test_paths_match_a_star(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        field = FlowField(board_state.board)
+        starts = [BoardSquare(3, 4), BoardSquare(0, 0), BoardSquare(6, 4)]
+        paths = field.paths(starts)
+        self.assertEqual([len(path) for path in paths], [9, 10, 0])
+        self.assertTrue(replay(board_state, paths[0]))
+        self.assertEqual(field.direction(BoardSquare(3, 4)), paths[0][0])
+        self.assertIsNone(field.direction(BoardSquare(6, 4)))
+
+        board_state.board.set_square(6, 3, BoardSquareType.wall)
+        self.assertIsNone(field.path(BoardSquare(3, 4)))
+        self.assertIsNone(field.distance(BoardSquare(3, 4)))
+
+    def test_nearest_of_many_food_squares(self):
+        for board in [Board(7, 1), CompactBoard(7, 1)]:
+            board.set_square(0, 0, BoardSquareType.food)
+            board.set_square(6, 0, BoardSquareType.food)
+            self.assertEqual(board.get_food_locations(),
+                             [BoardSquare(0, 0), BoardSquare(6, 0)])
+            field = FlowField(board)
+            self.assertEqual(field.path(BoardSquare(2, 0)),
+                             [Direction.left] * 2)
+            self.assertEqual(field.path(BoardSquare(4, 0)),
+                             [Direction.right] * 2)
+            self.assertEqual(field.nodes_expanded, 7)
+
+
+class FoodAgentAITestCase(unittest.TestCase):
+    def test_find_path_leaves_agent(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        agent = board_state.agent
+        start = agent.get_location()
+        directions = solve(board_state)
+        self.assertEqual(agent.get_location(), start)
+        self.assertEqual(len(directions), 9)
+        self.assertTrue(replay(board_state, directions))
+
+    def test_tables_reused(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan)
+        for goal in [BoardSquare(0, 6), BoardSquare(6, 0), None,
+                     BoardSquare(4, 6)]:
+            for epsilon in [1.0, 2.0]:
+                fresh_ai = FoodAgentAI(board_state, manhattan)
+                fresh_ai.find_path(goal, epsilon)
+                ai.find_path(goal, epsilon)
+                self.assertEqual(ai.movement_path_list,
+                                 fresh_ai.movement_path_list)
+                self.assertEqual(ai.nodes_expanded, fresh_ai.nodes_expanded)
+
+    def test_sparse_tables(self):
+        sparse_cell_count = search_state.SPARSE_CELL_COUNT
+        search_state.SPARSE_CELL_COUNT = 0
+        try:
+            board_state = board_state_generator.generate_from_file(
+                board_file_path(3))
+            ai = FoodAgentAI(board_state, manhattan)
+            ai.find_path()
+            self.assertIsInstance(ai._search_state.path_costs, SparseCells)
+            self.assertEqual(len(ai.movement_path_list), 10)
+            ai.find_path(BoardSquare(0, 6))
+            self.assertEqual(len(ai.movement_path_list), 8)
+        finally:
+            search_state.SPARSE_CELL_COUNT = sparse_cell_count
+
+    def test_solution_of_node_tree(self):
+        root = make_node(0, 0, 0)
+        child = Node(agent_location=BoardSquare(1, 0),
+                     direction=Direction.right, cost=1, path_cost=1,
+                     parent=root)
+        self.assertEqual(FoodAgentAI.solution(child), [None, Direction.right])
+
+    def test_unsolvable(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(2))
+        self.assertIsNone(solve(board_state))
+
+    def test_stops_at_any_food(self):
+        board_state = several_food_board_state()
+        self.assertEqual(len(solve(board_state)), NEAREST_FOOD_STEPS)
+        ai = FoodAgentAI(board_state, manhattan)
+        ai.find_path(board_state.board.get_food_location())
+        self.assertEqual(len(ai.movement_path_list) - 1, PICKED_FOOD_STEPS)
+
+    def test_weighted_path_within_bound(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan)
+        ai.find_path(epsilon=3.0)
+        directions = ai.movement_path_list[1:]
+        self.assertTrue(1.0 <= ai.suboptimality_bound <= 3.0)
+        self.assertTrue(len(directions) <= ai.suboptimality_bound * 9)
+        self.assertTrue(replay(board_state, directions))
+
+    def test_anytime_search_reaches_optimal(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan)
+        ai.find_path(epsilon=3.0, deadline=time.time() + 60)
+        self.assertEqual(ai.suboptimality_bound, 1.0)
+        self.assertEqual(len(ai.movement_path_list), 10)
+        ai.find_path(epsilon=3.0, deadline=time.time() - 1)
+        self.assertFalse(ai.board_is_unsolvable)
+        self.assertRaises(ValueError, ai.find_path, epsilon=0.5)
+        ai = FoodAgentAI(board_state, manhattan, JumpPointSearch)
+        self.assertRaises(ValueError, ai.find_path, epsilon=2.0)
+
+    def test_stats(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan)
+        ai.find_path()
+        self.assertIsNone(ai.stats)
+        ai = FoodAgentAI(board_state, manhattan, collect_stats=True)
+        ai.find_path()
+        stats = ai.stats
+        self.assertEqual(stats.nodes_expanded, ai.nodes_expanded)
+        self.assertEqual(stats.explored_size, ai.nodes_expanded)
+        self.assertEqual(stats.heuristic_calls, stats.nodes_generated)
+        self.assertTrue(stats.peak_frontier_size >= 1)
+        self.assertTrue(stats.wall_seconds >= stats.heuristic_seconds)
+        self.assertEqual(json.loads(stats.to_json())['nodes_expanded'],
+                         ai.nodes_expanded)
+        board_state = maze_generator.open_rooms(21, 15, 4, 1)
+        ai = FoodAgentAI(board_state, manhattan, collect_stats=True)
+        ai.find_path(epsilon=3.0, deadline=time.time() + 60)
+        # Later passes of ARA* expand some squares again.
+        self.assertTrue(0 < ai.stats.explored_size < ai.nodes_expanded)
+        self.assertTrue(ai.stats.peak_frontier_size >= 1)
+
+        ai = FoodAgentAI(board_state, manhattan, JumpPointSearch,
+                         collect_stats=True)
+        ai.find_path()
+        self.assertEqual(ai.stats.nodes_expanded, ai.nodes_expanded)
+        self.assertIsNone(ai.stats.nodes_generated)
+
+    def test_successors(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(1))
+        for board in [board_state.board, CompactBoard(4, 2)]:
+            if isinstance(board, CompactBoard):
+                board.set_square(3, 0, BoardSquareType.wall)
+                board.set_square(0, 1, BoardSquareType.wall)
+                board.set_square(3, 1, BoardSquareType.wall)
+            cell = board.cell_id(1, 0)
+            successors = [(direction, board.cell_location(next_cell))
+                          for direction, next_cell in board.successors(cell)]
+            self.assertEqual(successors,
+                             [(Direction.down, BoardSquare(1, 1)),
+                              (Direction.left, BoardSquare(0, 0)),
+                              (Direction.right, BoardSquare(2, 0))])
+
+
+class JumpPointSearchTestCase(unittest.TestCase):
+    def test_matches_a_star(self):
+        for test_number in [1, 2, 3]:
+            for compact in [False, True]:
+                board_state = board_state_generator.generate_from_file(
+                    board_file_path(test_number), compact=compact)
+                expected = solve(board_state)
+                directions = solve(board_state, engine=JumpPointSearch)
+                if expected is None:
+                    self.assertIsNone(directions)
+                else:
+                    self.assertEqual(len(directions), len(expected))
+                    self.assertTrue(replay(board_state, directions))
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=JumpPointSearch)
+            # Like A*, it stops at the first food it reaches.
+            self.assertEqual(len(directions), NEAREST_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_open_room(self):
+        board = CompactBoard(30, 20)
+        for y in xrange(board.height):
+            if y != 10:
+                board.set_square(15, y, BoardSquareType.wall)
+        board.set_square(28, 18, BoardSquareType.food)
+        board_state = BoardState(board, 1, 2)
+        ai = FoodAgentAI(board_state, manhattan, JumpPointSearch)
+        ai.find_path()
+        directions = ai.movement_path_list[1:]
+        self.assertEqual(len(directions), 27 + 16)
+        self.assertTrue(replay(board_state, directions))
+        self.assertTrue(ai.nodes_expanded < 10)
+
+
+class BidirectionalAStarTestCase(unittest.TestCase):
+    def test_matches_a_star(self):
+        for test_number in [1, 2, 3]:
+            board_state = board_state_generator.generate_from_file(
+                board_file_path(test_number))
+            expected = solve(board_state)
+            ai = FoodAgentAI(board_state, manhattan, BidirectionalAStar)
+            ai.find_path()
+            engine = ai.engine
+            self.assertEqual(ai.nodes_expanded,
+                             engine.forward_nodes_expanded +
+                             engine.backward_nodes_expanded)
+            if expected is None:
+                self.assertTrue(ai.board_is_unsolvable)
+            else:
+                directions = ai.movement_path_list[1:]
+                self.assertEqual(len(directions), len(expected))
+                self.assertTrue(replay(board_state, directions))
+                self.assertTrue(engine.backward_nodes_expanded > 0)
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=BidirectionalAStar)
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_starts_on_food(self):
+        board = CompactBoard(3, 3)
+        board.set_square(1, 1, BoardSquareType.food)
+        self.assertEqual(solve(BoardState(board, 1, 1),
+                               engine=BidirectionalAStar), [])
+
+
+class DStarLiteTestCase(unittest.TestCase):
+    def test_matches_a_star(self):
+        for test_number in [1, 2, 3]:
+            for compact in [False, True]:
+                board_state = board_state_generator.generate_from_file(
+                    board_file_path(test_number), compact=compact)
+                expected = solve(board_state)
+                directions = solve(board_state, engine=DStarLite)
+                if expected is None:
+                    self.assertIsNone(directions)
+                else:
+                    self.assertEqual(len(directions), len(expected))
+                    self.assertTrue(replay(board_state, directions))
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=DStarLite)
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_replans_after_changes(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        board = board_state.board
+        ai = FoodAgentAI(board_state, manhattan, DStarLite)
+        ai.find_path()
+        first_expansions = ai.nodes_expanded
+        directions = ai.movement_path_list[1:]
+        self.assertEqual(len(directions), 9)
+
+        # Move part of the way, then block the square ahead.
+        agent = board_state.agent
+        for direction in directions[:2]:
+            self.assertTrue(agent.move(direction))
+        board.set_square(4, 6, BoardSquareType.wall)
+        ai.find_path()
+        self.assertEqual(ai.movement_path_list, [None] + solve(board_state))
+        self.assertTrue(ai.nodes_expanded < first_expansions)
+
+        board.set_square(6, 3, BoardSquareType.wall)
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+        board.set_square(6, 3, BoardSquareType.empty)
+        ai.find_path()
+        self.assertFalse(ai.board_is_unsolvable)
+        self.assertEqual(len(ai.movement_path_list),
+                         len(solve(board_state)) + 1)
+
+
+class DistanceFieldSearchTestCase(unittest.TestCase):
+    def test_matches_a_star(self):
+        for test_number in [1, 2, 3]:
+            for compact in [False, True]:
+                board_state = board_state_generator.generate_from_file(
+                    board_file_path(test_number), compact=compact)
+                expected = solve(board_state)
+                directions = solve(board_state, engine=DistanceFieldSearch)
+                if expected is None:
+                    self.assertIsNone(directions)
+                else:
+                    self.assertEqual(len(directions), len(expected))
+                    self.assertTrue(replay(board_state, directions))
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=DistanceFieldSearch)
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_field_is_cached(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3), compact=True)
+        ai = FoodAgentAI(board_state, manhattan, DistanceFieldSearch)
+        ai.find_path()
+        self.assertTrue(ai.nodes_expanded > 0)
+        board_state.agent.move(ai.movement_path_list[1])
+        ai.find_path()
+        self.assertEqual(ai.nodes_expanded, 0)
+        self.assertEqual(len(ai.movement_path_list), 9)
+        board_state.board.set_square(6, 3, BoardSquareType.wall)
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+
+    def test_wall_goal(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan, DistanceFieldSearch)
+        ai.find_path(goal_location=BoardSquare(2, 1))
+        self.assertTrue(ai.board_is_unsolvable)
+
+    @unittest.skipIf(board_distances.numpy is None, 'NumPy is not installed')
+    def test_wavefront_matches_breadth_first(self):
+        board = board_state_generator.generate_from_file(
+            board_file_path(3), compact=True).board
+        sources = [board.cell_id(0, 0), board.cell_id(6, 4)]
+        self.assertEqual(board_distances._wavefront_distances(board, sources),
+                         breadth_first_distances(board, sources))
+
+
+class HierarchicalSearchTestCase(unittest.TestCase):
+    @staticmethod
+    def small_clusters(board, heuristic):
+        return HierarchicalSearch(board, heuristic, cluster_size=3)
+
+    def test_finds_paths(self):
+        for test_number in [1, 2, 3]:
+            for compact in [False, True]:
+                board_state = board_state_generator.generate_from_file(
+                    board_file_path(test_number), compact=compact)
+                expected = solve(board_state)
+                directions = solve(board_state, engine=self.small_clusters)
+                if expected is None:
+                    self.assertIsNone(directions)
+                else:
+                    self.assertTrue(len(directions) >= len(expected))
+                    self.assertTrue(replay(board_state, directions))
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=self.small_clusters)
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_rebuilds_changed_clusters(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan, self.small_clusters)
+        engine = ai.engine
+        self.assertEqual((engine.columns, engine.rows), (3, 3))
+        self.assertTrue(engine.abstract_node_count > 0)
+        ai.find_path()
+        self.assertFalse(ai.board_is_unsolvable)
+        self.assertEqual(engine.nodes_expanded,
+                         engine.abstract_nodes_expanded +
+                         engine.refine_nodes_expanded)
+
+        # (6, 3) is in cluster (2, 1), on its borders with (1, 1) and
+        # (2, 0).
+        board_state.board.set_square(6, 3, BoardSquareType.wall)
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+        self.assertEqual(engine.clusters_rebuilt, 3)
+
+
+class MazeGeneratorTestCase(unittest.TestCase):
+    def test_same_seed_same_board(self):
+        for generator in maze_generator.generator_map.values():
+            first = generator(31, 17, 5).board
+            second = generator(31, 17, 5).board
+            self.assertEqual(first.cells, second.cells)
+            self.assertEqual(first.get_food_location(),
+                             second.get_food_location())
+
+    def test_mazes_solvable(self):
+        for board_state in [maze_generator.recursive_division(31, 17, 5),
+                            maze_generator.recursive_division(30, 16, 5),
+                            maze_generator.open_rooms(31, 17, 4, 5)]:
+            directions = solve(board_state)
+            self.assertIsNotNone(directions)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_random_walls_density(self):
+        board = maze_generator.random_walls(40, 40, 0.25, 5).board
+        walls = sum(1 for x in xrange(40) for y in xrange(40)
+                    if board.get_square(x, y) == BoardSquareType.wall)
+        self.assertTrue(300 < walls < 500)
+
+    def test_weighted_cases(self):
+        cases = run_benchmarks.benchmark_cases(10)
+        weighted_cases = [case for case in cases if case['epsilon'] > 1]
+        self.assertEqual(len(weighted_cases),
+                         len(cases) // len(run_benchmarks.search_modes))
+        result = run_benchmarks.run_case(weighted_cases[0])
+        self.assertTrue(result['nodes_expanded'] > 0)
+        self.assertIsNotNone(result['path_length'])
+
+
+class IterativeDeepeningAStarTestCase(unittest.TestCase):
+    @staticmethod
+    def no_table(board, heuristic):
+        return IterativeDeepeningAStar(
+            board, heuristic, memory_limit=(board.cell_count + 7) // 8 * 2)
+
+    @staticmethod
+    def short_path_table(board, heuristic):
+        # The table is emptied once the path is three squares long.
+        return IterativeDeepeningAStar(
+            board, heuristic, memory_limit=(board.cell_count + 7) // 8 * 2 +
+            3 * IterativeDeepeningAStar.PATH_STEP_BYTES)
+
+    def test_matches_a_star(self):
+        for test_number in [1, 2, 3]:
+            for compact in [False, True]:
+                for engine in [IterativeDeepeningAStar, self.no_table,
+                               self.short_path_table]:
+                    board_state = board_state_generator.generate_from_file(
+                        board_file_path(test_number), compact=compact)
+                    expected = solve(board_state)
+                    directions = solve(board_state, engine=engine)
+                    if expected is None:
+                        self.assertIsNone(directions)
+                    else:
+                        self.assertEqual(len(directions), len(expected))
+                        self.assertTrue(replay(board_state, directions))
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=IterativeDeepeningAStar)
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_counts_re_expansions(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan, self.no_table)
+        engine = ai.engine
+        self.assertEqual(engine.table_capacity, 0)
+        ai.find_path()
+        self.assertTrue(engine.iterations > 1)
+        self.assertTrue(0 < engine.re_expansions < engine.nodes_expanded)
+        self.assertRaises(ValueError, IterativeDeepeningAStar,
+                          board_state.board, manhattan, memory_limit=1)
+
+
+class CorridorSearchTestCase(unittest.TestCase):
+    def test_matches_a_star(self):
+        for test_number in [1, 2, 3]:
+            for compact in [False, True]:
+                board_state = board_state_generator.generate_from_file(
+                    board_file_path(test_number), compact=compact)
+                expected = solve(board_state)
+                directions = solve(board_state, engine=CorridorSearch)
+                if expected is None:
+                    self.assertIsNone(directions)
+                else:
+                    self.assertEqual(len(directions), len(expected))
+                    self.assertTrue(replay(board_state, directions))
+        for compact in [False, True]:
+            board_state = several_food_board_state(compact)
+            directions = solve(board_state, engine=CorridorSearch)
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+
+    def test_any_two_squares(self):
+        board = board_state_generator.generate_from_file(
+            board_file_path(3), compact=True).board
+        engine = CorridorSearch(board, manhattan)
+        self.assertTrue(engine.pruned_count > 0)
+        self.assertTrue(engine.edge_count > 0)
+        open_cells = [board.cell_id(x, y)
+                      for x in xrange(board.width)
+                      for y in xrange(board.height)
+                      if board.get_square(x, y) != BoardSquareType.wall]
+        for start_cell in open_cells:
+            distances = breadth_first_distances(board, [start_cell])
+            for goal_cell in open_cells:
+                directions = engine.search(start_cell, goal_cell)
+                self.assertEqual(len(directions), distances[goal_cell])
+                cell = start_cell
+                for direction in directions:
+                    cell = board.neighbor(cell, direction)
+                self.assertEqual(cell, goal_cell)
+
+    def test_rebuilds_after_changes(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        ai = FoodAgentAI(board_state, manhattan, CorridorSearch)
+        board_state.board.set_square(6, 3, BoardSquareType.wall)
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+
+
+class LandmarkHeuristicTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'Test 3.txt')
+        shutil.copy(board_file_path(3), self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_admissible(self):
+        board_state = board_state_generator.generate_from_file(self.path)
+        board = board_state.board
+        heuristic = LandmarkHeuristic.build(board, num_landmarks=3)
+        self.assertEqual(len(heuristic.landmarks), 3)
+        food_location = board.get_food_location()
+        food_cell = board.cell_id(food_location.x, food_location.y)
+        distances = breadth_first_distances(board, [food_cell])
+        for cell in xrange(board.cell_count):
+            if distances[cell] >= 0:
+                self.assertTrue(heuristic(board.cell_location(cell),
+                                          food_location) <= distances[cell])
+        self.assertEqual(len(solve(board_state, heuristic)), 9)
+
+    def test_stored_next_to_board(self):
+        board = board_state_generator.generate_from_file(self.path).board
+        built = LandmarkHeuristic.for_board_file(board, self.path)
+        tables_path = LandmarkHeuristic.tables_path(self.path,
+                                                    board.content_hash())
+        self.assertTrue(os.path.exists(tables_path))
+        loaded = LandmarkHeuristic.load(tables_path, board.content_hash())
+        self.assertEqual(loaded.landmarks, built.landmarks)
+        self.assertEqual(loaded.tables, built.tables)
+        self.assertIsNone(LandmarkHeuristic.load(tables_path, '0' * 40))
+
+
+class BatchFoodAgentTestCase(unittest.TestCase):
+    def test_solve_queries(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3), compact=True)
+        queries = [(BoardSquare(3, 4), BoardSquare(6, 4)),
+                   (BoardSquare(0, 0), BoardSquare(6, 0)),
+                   (BoardSquare(0, 0), BoardSquare(1, 1)),
+                   (BoardSquare(0, 0), BoardSquare(9, 9))]
+        results = [json.loads(line) for line in
+                   solve_queries(board_state.board, queries, manhattan,
+                                 'a_star', process_count=2)]
+        self.assertEqual([result['path_length'] for result in results],
+                         [9, 6, None, None])
+        self.assertEqual(results[1]['directions'], 'RRRRRR')
+        self.assertEqual(results[0]['start'], [3, 4])
+        self.assertTrue(results[0]['expansions'] > 0)
+
+
+class PortfolioSearchTestCase(unittest.TestCase):
+    def test_race(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3), compact=True)
+        portfolio = PortfolioSearch([('manhattan', 'a_star'),
+                                     ('euclidean', 'jump_point')])
+        directions = portfolio.race(board_state.board, BoardSquare(3, 4))
+        self.assertEqual(len(directions), 9)
+        self.assertTrue(replay(board_state, directions))
+        self.assertIn(portfolio.winner, portfolio.configurations)
+        self.assertIsNone(portfolio.race(board_state.board,
+                                         BoardSquare(0, 0),
+                                         BoardSquare(1, 1)))
+
+    def test_race_to_one_of_several_food_squares(self):
+        board_state = several_food_board_state(compact=True)
+        board = board_state.board
+        portfolio = PortfolioSearch([('manhattan', 'a_star'),
+                                     ('manhattan', 'jump_point'),
+                                     ('manhattan', 'bidirectional'),
+                                     ('manhattan', 'corridor')])
+        # a_star and jump_point alone would stop at a nearer food square.
+        for race_number in xrange(3):
+            directions = portfolio.race(board, BoardSquare(1, 1))
+            self.assertEqual(len(directions), PICKED_FOOD_STEPS)
+            self.assertTrue(replay(board_state, directions))
+            self.assertEqual(board_state.agent.get_location(),
+                             board.get_food_location())
+            board_state.reset_agent_position()
+
+    def test_rejects_suboptimal_engines(self):
+        self.assertRaises(ValueError, PortfolioSearch,
+                          [('manhattan', 'hierarchical')])
+
+    def test_launches_likely_winners(self):
+        stats = PortfolioStats()
+        configurations = [('euclidean', 'a_star'), ('manhattan', 'a_star'),
+                          ('manhattan', 'jump_point')]
+        for race_number in xrange(PortfolioStats.LEARNING_RACES - 1):
+            stats.record_win('board', configurations[2])
+        self.assertEqual(stats.likely_winners('board', configurations),
+                         [configurations[2]] + configurations[:2])
+        stats.record_win('board', configurations[1])
+        self.assertEqual(stats.likely_winners('board', configurations),
+                         [configurations[2], configurations[1]])
+        self.assertEqual(stats.likely_winners('other', configurations),
+                         configurations)
+
+
+class PathCacheTestCase(unittest.TestCase):
+    def test_find_path_uses_cache(self):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        cache = PathCache(capacity=2)
+        ai = FoodAgentAI(board_state, manhattan, path_cache=cache)
+        ai.find_path()
+        first_path = ai.movement_path_list
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        ai.find_path()
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(ai.movement_path_list, first_path)
+        self.assertEqual(ai.nodes_expanded, 0)
+
+        # Walling off the food must not return the cached path.
+        board_state.board.set_square(6, 3, BoardSquareType.wall)
+        self.assertEqual(len(cache), 0)
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        ai.find_path()
+        self.assertTrue(ai.board_is_unsolvable)
+        self.assertEqual(cache.hits, 2)
+
+    def test_goal_in_key(self):
+        board = CompactBoard(5, 1)
+        board.set_square(1, 0, BoardSquareType.food)
+        board.set_square(4, 0, BoardSquareType.food)
+        cache = PathCache()
+        ai = FoodAgentAI(BoardState(board, 0, 0), manhattan, path_cache=cache)
+        ai.find_path()
+        self.assertEqual(ai.movement_path_list, [None, Direction.right])
+        ai.find_path(goal_location=BoardSquare(4, 0))
+        self.assertEqual(ai.movement_path_list,
+                         [None] + [Direction.right] * 4)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        jump_point_ai = FoodAgentAI(BoardState(board, 0, 0), manhattan,
+                                    JumpPointSearch, path_cache=cache)
+        jump_point_ai.find_path()
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+    def test_engine_names(self):
+        for engine_name, engine in food_agent.engine_map.iteritems():
+            if engine is not None:
+                self.assertEqual(engine.name, engine_name)
+
+    def test_least_recently_used_evicted(self):
+        board = CompactBoard(3, 1)
+        cache = PathCache(capacity=2)
+        keys = [cache.key(board, BoardSquare(0, 0), BoardSquare(x, 0),
+                          'a_star')
+                for x in xrange(3)]
+        cache[keys[0]] = []
+        cache[keys[1]] = [Direction.right]
+        self.assertEqual(cache[keys[0]], [])
+        cache[keys[2]] = [Direction.right, Direction.right]
+        self.assertRaises(KeyError, lambda: cache[keys[1]])
+        self.assertEqual(cache[keys[0]], [])
+        self.assertEqual(len(cache), 2)
+
+    def test_store(self):
+        directory = tempfile.mkdtemp()
+        try:
+            store_path = os.path.join(directory, 'paths')
+            board = CompactBoard(3, 1)
+            cache = PathCache(store_path=store_path)
+            key = cache.key(board, BoardSquare(0, 0), BoardSquare(2, 0),
+                            'a_star')
+            cache[key] = [Direction.right, Direction.right]
+            cache.close()
+            cache = PathCache(store_path=store_path)
+            self.assertEqual(cache[key], [Direction.right, Direction.right])
+            board.set_square(1, 0, BoardSquareType.wall)
+            changed_key = cache.key(board, BoardSquare(0, 0),
+                                    BoardSquare(2, 0), 'a_star')
+            self.assertNotEqual(changed_key, key)
+            self.assertRaises(KeyError, lambda: cache[changed_key])
+            cache.close()
+            # Entries for the old squares still hold for boards with them.
+            cache = PathCache(store_path=store_path)
+            self.assertEqual(cache[key], [Direction.right, Direction.right])
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+class BoardPrinterTestCase(unittest.TestCase):
+    def render(self, mode):
+        board_state = board_state_generator.generate_from_file(
+            board_file_path(3))
+        output = StringIO()
+        board_printer.render_solution(board_state, solve(board_state), mode,
+                                      output)
+        return output.getvalue()
+
+    def test_full(self):
+        lines = self.render(board_printer.FULL).split('\n')
+        self.assertEqual(lines[:8], ['Initial:',
+                                     '.......',
+                                     '.#####.',
+                                     '.#.....',
+                                     '.#.###.',
+                                     '.#.@.#%',
+                                     '.###.##',
+                                     '......#'])
+        self.assertEqual(lines[-9:], ['Step 9:',
+                                      '.......',
+                                      '.#####.',
+                                      '.#.....',
+                                      '.#.###.',
+                                      '.#...#@',
+                                      '.###.##',
+                                      '......#',
+                                      ''])
+        self.assertEqual(len(lines), 8 + 9 * 9 + 1)
+
+    def test_diff(self):
+        lines = self.render(board_printer.DIFF).split('\n')
+        self.assertEqual(lines[8:10], ['Step 1: 3,4:. 2,4:@',
+                                       'Step 2: 2,4:. 2,3:@'])
+        self.assertEqual(lines[-2:], ['Step 9: 6,3:. 6,4:@', ''])
+
+    def test_overlay(self):
+        self.assertEqual(self.render(board_printer.OVERLAY),
+                         '.......\n'
+                         '.#####.\n'
+                         '.#>>>>v\n'
+                         '.#^###v\n'
+                         '.#^@.#%\n'
+                         '.###.##\n'
+                         '......#\n')
+
+    def test_directions(self):
+        self.assertEqual(self.render(board_printer.DIRECTIONS),
+                         'LUURRRRDD\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
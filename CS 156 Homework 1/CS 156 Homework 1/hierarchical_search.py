@@ -0,0 +1,344 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import heapq
+import time
+from collections import deque
+
+from board_square import BoardSquare
+from board_square_type import BoardSquareType
+from food_agent_ai import cell_heuristic, search_target
+
+
+class HierarchicalSearch(object):
+    """Hierarchical pathfinding A* (HPA*, Botea, Mueller and Schaeffer).
+
+    The board is divided into square clusters. Wherever open squares on
+    both sides of the border between two clusters line up, an entrance is
+    placed (one in the middle of a short opening, one at each end of a long
+    one), and the distances between the entrances of each cluster are
+    found by a search inside the cluster. A query joins the start and goal
+    to the entrances of their clusters, runs A* over this much smaller
+    graph of entrances, and then refines only the chosen entrances into
+    moves. Paths are usually a little longer than optimal, but a path is
+    found exactly when one exists.
+
+    Setting a square marks its cluster, and the neighboring clusters whose
+    shared border it lies on, to be rebuilt before the next search."""
+
+    name = 'hierarchical'
+    DEFAULT_CLUSTER_SIZE = 16
+    '''Openings at least this long get an entrance at each end.'''
+    LONG_ENTRANCE_LENGTH = 6
+
+    def __init__(self, board, heuristic, cluster_size=DEFAULT_CLUSTER_SIZE):
+        self.board = board
+        self._heuristic = heuristic
+        self.cluster_size = cluster_size
+        self.columns = (board.width + cluster_size - 1) // cluster_size
+        self.rows = (board.height + cluster_size - 1) // cluster_size
+        self.nodes_expanded = 0
+        self.abstract_nodes_expanded = 0
+        self.refine_nodes_expanded = 0
+        self.query_seconds = 0.0
+        self.clusters_rebuilt = 0
+        self._location = BoardSquare(0, 0)
+        '''Maps each border, a (cluster, cluster) pair with the left or top
+        cluster first, to the (cell, cell) pairs of its entrances.'''
+        self._border_entrances = {}
+        '''Maps each entrance cell to the cells across borders it leads
+        to in one move.'''
+        self._crossings = {}
+        '''Maps each cluster to its entrance cells, and each of those to
+        the distances to the others it can reach inside the cluster.'''
+        self._cluster_edges = {}
+        self._dirty_cells = set()
+        started = time.time()
+        for cluster_y in xrange(self.rows):
+            for cluster_x in xrange(self.columns):
+                cluster = (cluster_x, cluster_y)
+                if cluster_x + 1 < self.columns:
+                    self._build_border(cluster, (cluster_x + 1, cluster_y))
+                if cluster_y + 1 < self.rows:
+                    self._build_border(cluster, (cluster_x, cluster_y + 1))
+        for cluster_y in xrange(self.rows):
+            for cluster_x in xrange(self.columns):
+                self.rebuild_cluster((cluster_x, cluster_y))
+        self.clusters_rebuilt = 0
+        self.build_seconds = time.time() - started
+        board.add_change_listener(self._square_changed)
+
+    @property
+    def abstract_node_count(self):
+        return sum(len(edges) for edges in self._cluster_edges.itervalues())
+
+    @property
+    def abstract_edge_count(self):
+        """The number of entrance pairs joined inside a cluster or across a
+        border, each counted once."""
+        count = sum(len(cells) for cells in self._crossings.itervalues())
+        for edges in self._cluster_edges.itervalues():
+            count += sum(len(distances) for distances in edges.itervalues())
+        return count // 2
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food, or to
+        goal_cell if it is not None. Returns None if it cannot be
+        reached."""
+        started = time.time()
+        board = self.board
+        self._rebuild_dirty_clusters()
+        self.abstract_nodes_expanded = 0
+        self.refine_nodes_expanded = 0
+        directions = None
+        target_location = search_target(board, goal_cell)
+        if target_location is not None:
+            goal_cell = board.cell_id(target_location.x, target_location.y)
+            if board.cell_type(goal_cell) != BoardSquareType.wall:
+                path = self._abstract_path(start_cell, goal_cell,
+                                           target_location)
+                if path is not None:
+                    directions = self._refine(path)
+        self.nodes_expanded = self.abstract_nodes_expanded + \
+            self.refine_nodes_expanded
+        self.query_seconds = time.time() - started
+        return directions
+
+    def cluster_of(self, cell):
+        location = self.board.cell_location(cell, self._location)
+        return (location.x // self.cluster_size,
+                location.y // self.cluster_size)
+
+    def rebuild_cluster(self, cluster):
+        """Finds the distances between the entrances of a cluster again. Its
+        borders must be up to date."""
+        cluster_x, cluster_y = cluster
+        entrance_cells = set()
+        for neighbor, is_first in [((cluster_x - 1, cluster_y), False),
+                                   ((cluster_x + 1, cluster_y), True),
+                                   ((cluster_x, cluster_y - 1), False),
+                                   ((cluster_x, cluster_y + 1), True)]:
+            if is_first:
+                border = (cluster, neighbor)
+            else:
+                border = (neighbor, cluster)
+            for cells in self._border_entrances.get(border, ()):
+                entrance_cells.add(cells[0] if is_first else cells[1])
+        edges = dict((cell, {}) for cell in entrance_cells)
+        moves = self._cluster_moves(cluster)
+        '''Distances are the same both ways, so each search only looks for
+        the entrances not searched from yet.'''
+        unsearched_cells = set(entrance_cells)
+        for cell in entrance_cells:
+            unsearched_cells.discard(cell)
+            reached = self._search_cluster(moves, cell, unsearched_cells)
+            for other_cell in unsearched_cells:
+                if other_cell in reached:
+                    distance = reached[other_cell][0]
+                    edges[cell][other_cell] = distance
+                    edges[other_cell][cell] = distance
+        self._cluster_edges[cluster] = edges
+        self.clusters_rebuilt += 1
+
+    def _cluster_bounds(self, cluster):
+        """Returns the least and one past the greatest x and y in a
+        cluster."""
+        size = self.cluster_size
+        left = cluster[0] * size
+        top = cluster[1] * size
+        return (left, top, min(left + size, self.board.width),
+                min(top + size, self.board.height))
+
+    def _cluster_moves(self, cluster):
+        """Returns a dict mapping each open cell of a cluster to the
+        (direction, cell) moves that stay inside it."""
+        board = self.board
+        cell_id = board.cell_id
+        left, top, right, bottom = self._cluster_bounds(cluster)
+        cluster_cells = set(cell_id(x, y)
+                            for y in xrange(top, bottom)
+                            for x in xrange(left, right))
+        wall = BoardSquareType.wall
+        return dict((cell, [move for move in board.successors(cell)
+                            if move[1] in cluster_cells])
+                    for cell in cluster_cells
+                    if board.cell_type(cell) != wall)
+
+    def _build_border(self, first_cluster, second_cluster):
+        """Places the entrances on the border between two clusters, the
+        first being left of or above the second."""
+        board = self.board
+        border = (first_cluster, second_cluster)
+        for first_cell, second_cell in self._border_entrances.get(border,
+                                                                  ()):
+            self._crossings[first_cell].discard(second_cell)
+            self._crossings[second_cell].discard(first_cell)
+        left, top, right, bottom = self._cluster_bounds(first_cluster)
+        if first_cluster[1] == second_cluster[1]:
+            pairs = [(board.cell_id(right - 1, y), board.cell_id(right, y))
+                     for y in xrange(top, bottom)]
+        else:
+            pairs = [(board.cell_id(x, bottom - 1), board.cell_id(x, bottom))
+                     for x in xrange(left, right)]
+        wall = BoardSquareType.wall
+        entrances = []
+        opening = []
+        for cells in pairs + [None]:
+            if cells is not None and board.cell_type(cells[0]) != wall and \
+                    board.cell_type(cells[1]) != wall:
+                opening.append(cells)
+            elif opening:
+                if len(opening) >= self.LONG_ENTRANCE_LENGTH:
+                    entrances.append(opening[0])
+                    entrances.append(opening[-1])
+                else:
+                    entrances.append(opening[len(opening) // 2])
+                opening = []
+        self._border_entrances[border] = entrances
+        for first_cell, second_cell in entrances:
+            self._crossings.setdefault(first_cell, set()).add(second_cell)
+            self._crossings.setdefault(second_cell, set()).add(first_cell)
+
+    def _search_cluster(self, moves, source_cell, target_cells=None):
+        """Searches breadth first from source_cell using the moves of its
+        cluster, stopping early once every one of target_cells is reached if
+        they are given. Returns a dict mapping each reached cell to
+        (distance, parent cell, direction)."""
+        reached = {source_cell: (0, None, None)}
+        queue = deque([source_cell])
+        if target_cells is None:
+            target_cells = ()
+            targets_left = -1
+        else:
+            targets_left = len(target_cells) - (source_cell in target_cells)
+        while queue and targets_left != 0:
+            cell = queue.popleft()
+            next_distance = reached[cell][0] + 1
+            for direction, next_cell in moves[cell]:
+                if next_cell not in reached:
+                    reached[next_cell] = (next_distance, cell, direction)
+                    queue.append(next_cell)
+                    if next_cell in target_cells:
+                        targets_left -= 1
+        return reached
+
+    def _entrance_distances(self, cell):
+        """Returns the distances from cell to the entrances of its cluster
+        and the cells reached in getting them."""
+        cluster = self.cluster_of(cell)
+        reached = self._search_cluster(self._cluster_moves(cluster), cell)
+        return reached, dict((entrance_cell, reached[entrance_cell][0])
+                             for entrance_cell in self._cluster_edges[cluster]
+                             if entrance_cell in reached)
+
+    def _abstract_path(self, start_cell, goal_cell, goal_location):
+        """Runs A* over the entrances, joined to start_cell and goal_cell.
+        Returns the cells of the path found, or None."""
+        start_reached, start_edges = self._entrance_distances(start_cell)
+        goal_reached, goal_edges = self._entrance_distances(goal_cell)
+        self.abstract_nodes_expanded += len(start_reached) + len(goal_reached)
+        if goal_cell in start_reached:
+            start_edges[goal_cell] = start_reached[goal_cell][0]
+
+        estimate = cell_heuristic(self.board, self._heuristic, goal_location)
+        path_costs = {start_cell: 0}
+        parents = {start_cell: None}
+        frontier = [(estimate(start_cell), 0, start_cell)]
+        push_count = 1
+        closed_cells = set()
+        while frontier:
+            cost, order, cell = heapq.heappop(frontier)
+            if cell in closed_cells:
+                continue
+            if cell == goal_cell:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = parents[cell]
+                path.reverse()
+                return path
+            closed_cells.add(cell)
+            self.abstract_nodes_expanded += 1
+            edges = self._abstract_edges(cell, start_cell, start_edges,
+                                         goal_cell, goal_edges)
+            for next_cell, distance in edges:
+                next_path_cost = path_costs[cell] + distance
+                if next_cell in closed_cells or \
+                        path_costs.get(next_cell, next_path_cost + 1) <= \
+                        next_path_cost:
+                    continue
+                path_costs[next_cell] = next_path_cost
+                parents[next_cell] = cell
+                heapq.heappush(frontier,
+                               (next_path_cost + estimate(next_cell),
+                                push_count, next_cell))
+                push_count += 1
+        return None
+
+    def _abstract_edges(self, cell, start_cell, start_edges, goal_cell,
+                        goal_edges):
+        """Yields (cell, distance) for each node of the abstract graph
+        joined to cell."""
+        if cell == start_cell:
+            for edge in start_edges.iteritems():
+                yield edge
+        for next_cell in self._crossings.get(cell, ()):
+            yield next_cell, 1
+        cluster_edges = self._cluster_edges[self.cluster_of(cell)]
+        for edge in cluster_edges.get(cell, {}).iteritems():
+            yield edge
+        if cell in goal_edges:
+            yield goal_cell, goal_edges[cell]
+
+    def _refine(self, path):
+        """Turns a path through the abstract graph into moves."""
+        board = self.board
+        directions = []
+        for cell, next_cell in zip(path, path[1:]):
+            for direction, successor in board.successors(cell):
+                if successor == next_cell:
+                    directions.append(direction)
+                    break
+            else:
+                reached = self._search_cluster(
+                    self._cluster_moves(self.cluster_of(cell)), cell,
+                    (next_cell,))
+                self.refine_nodes_expanded += len(reached)
+                moves = []
+                while next_cell != cell:
+                    distance, parent_cell, direction = reached[next_cell]
+                    moves.append(direction)
+                    next_cell = parent_cell
+                moves.reverse()
+                directions.extend(moves)
+        return directions
+
+    def _square_changed(self, board, x, y):
+        self._dirty_cells.add((x, y))
+
+    def _rebuild_dirty_clusters(self):
+        """Rebuilds the borders and clusters around the squares set since
+        the last search."""
+        if not self._dirty_cells:
+            return
+        size = self.cluster_size
+        borders = set()
+        clusters = set()
+        for x, y in self._dirty_cells:
+            cluster_x = x // size
+            cluster_y = y // size
+            cluster = (cluster_x, cluster_y)
+            clusters.add(cluster)
+            if x % size == 0 and cluster_x > 0:
+                borders.add(((cluster_x - 1, cluster_y), cluster))
+            if x % size == size - 1 and cluster_x + 1 < self.columns:
+                borders.add((cluster, (cluster_x + 1, cluster_y)))
+            if y % size == 0 and cluster_y > 0:
+                borders.add(((cluster_x, cluster_y - 1), cluster))
+            if y % size == size - 1 and cluster_y + 1 < self.rows:
+                borders.add((cluster, (cluster_x, cluster_y + 1)))
+        for border in borders:
+            self._build_border(*border)
+            clusters.update(border)
+        for cluster in clusters:
+            self.rebuild_cluster(cluster)
+        self._dirty_cells = set()
@@ -0,0 +1,195 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import heapq
+
+from board_square_type import BoardSquareType
+from food_agent_ai import cell_heuristic, search_target
+
+INFINITY = float('inf')
+
+
+class DStarLite(object):
+    """Incremental replanning with D* Lite (Koenig and Likhachev).
+
+    The search runs backward from the goal and keeps its g and rhs values
+    between calls to search. The engine listens for set_square on its
+    board, so the next search only repairs the squares around the ones
+    that changed, and when the agent has moved along the path since the
+    last search the old values are reused by raising the key modifier
+    instead of starting over. Only a new goal starts a search from
+    nothing."""
+
+    name = 'd_star_lite'
+
+    def __init__(self, board, heuristic):
+        self.board = board
+        self._heuristic = heuristic
+        self.nodes_expanded = 0
+        self._goal_cell = None
+        self._changed_cells = set()
+        board.add_change_listener(self._square_changed)
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food, or to
+        goal_cell if it is not None. Returns None if it cannot be
+        reached."""
+        board = self.board
+        target_location = search_target(board, goal_cell)
+        if target_location is None:
+            return None
+        goal_cell = board.cell_id(target_location.x, target_location.y)
+        if board.cell_type(goal_cell) == BoardSquareType.wall:
+            return None
+        if goal_cell != self._goal_cell:
+            self._reset(start_cell, goal_cell)
+        else:
+            if start_cell != self._last_start_cell:
+                self._key_modifier += self._heuristic(
+                    board.cell_location(self._last_start_cell),
+                    board.cell_location(start_cell))
+                self._last_start_cell = start_cell
+                self._estimate = cell_heuristic(
+                    board, self._heuristic, board.cell_location(start_cell))
+            self._apply_changes()
+        self.nodes_expanded = 0
+        self._compute_shortest_path(start_cell)
+        return self._solution(start_cell)
+
+    def _square_changed(self, board, x, y):
+        self._changed_cells.add(board.cell_id(x, y))
+
+    def _reset(self, start_cell, goal_cell):
+        """Forgets the previous search and starts one towards goal_cell."""
+        self._goal_cell = goal_cell
+        self._last_start_cell = start_cell
+        self._key_modifier = 0
+        self._estimate = cell_heuristic(self.board, self._heuristic,
+                                        self.board.cell_location(start_cell))
+        self._g = {}
+        self._rhs = {goal_cell: 0}
+        '''A heap of (key, cell) with lazy deletion: an entry is only current
+        if _queued_keys still maps its cell to its key.'''
+        self._queue = []
+        self._queued_keys = {}
+        self._changed_cells = set()
+        self._push(goal_cell)
+
+    def _key(self, cell):
+        best = min(self._g.get(cell, INFINITY), self._rhs.get(cell, INFINITY))
+        return best + self._estimate(cell) + self._key_modifier, best
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self._queued_keys[cell] = key
+        heapq.heappush(self._queue, (key, cell))
+
+    def _top(self):
+        """Returns the (key, cell) with the least key in the queue, or None
+        if it is empty."""
+        queue = self._queue
+        queued_keys = self._queued_keys
+        while queue:
+            key, cell = queue[0]
+            if queued_keys.get(cell) == key:
+                return key, cell
+            heapq.heappop(queue)
+        return None
+
+    def _update_vertex(self, cell):
+        """Queues cell if its g and rhs values disagree."""
+        if self._g.get(cell, INFINITY) != self._rhs.get(cell, INFINITY):
+            self._push(cell)
+        else:
+            self._queued_keys.pop(cell, None)
+
+    def _best_rhs(self, cell):
+        """Returns the cost of the best path from cell through one of its
+        neighbors."""
+        if self.board.cell_type(cell) == BoardSquareType.wall:
+            return INFINITY
+        g = self._g
+        best = INFINITY
+        for direction, next_cell in self.board.successors(cell):
+            cost = g.get(next_cell, INFINITY) + 1
+            if cost < best:
+                best = cost
+        return best
+
+    def _apply_changes(self):
+        """Updates the squares that were set since the last search, and
+        their neighbors."""
+        goal_cell = self._goal_cell
+        for cell in self._changed_cells:
+            affected_cells = [cell]
+            affected_cells.extend(next_cell for direction, next_cell in
+                                  self.board.successors(cell))
+            for affected_cell in affected_cells:
+                if affected_cell != goal_cell:
+                    self._rhs[affected_cell] = self._best_rhs(affected_cell)
+                self._update_vertex(affected_cell)
+        self._changed_cells = set()
+
+    def _compute_shortest_path(self, start_cell):
+        g = self._g
+        rhs = self._rhs
+        goal_cell = self._goal_cell
+        successors = self.board.successors
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            old_key, cell = top
+            if not (old_key < self._key(start_cell) or
+                    rhs.get(start_cell, INFINITY) !=
+                    g.get(start_cell, INFINITY)):
+                break
+            new_key = self._key(cell)
+            if old_key < new_key:
+                self._push(cell)
+                continue
+            heapq.heappop(self._queue)
+            del self._queued_keys[cell]
+            self.nodes_expanded += 1
+            old_g = g.get(cell, INFINITY)
+            cell_rhs = rhs.get(cell, INFINITY)
+            if old_g > cell_rhs:
+                g[cell] = cell_rhs
+                for direction, next_cell in successors(cell):
+                    if next_cell != goal_cell and \
+                            rhs.get(next_cell, INFINITY) > cell_rhs + 1:
+                        rhs[next_cell] = cell_rhs + 1
+                    self._update_vertex(next_cell)
+            else:
+                g[cell] = INFINITY
+                affected_cells = [cell]
+                affected_cells.extend(next_cell for direction, next_cell in
+                                      successors(cell))
+                for affected_cell in affected_cells:
+                    if affected_cell != goal_cell and \
+                            (affected_cell == cell or
+                             rhs.get(affected_cell, INFINITY) == old_g + 1):
+                        rhs[affected_cell] = self._best_rhs(affected_cell)
+                    self._update_vertex(affected_cell)
+
+    def _solution(self, start_cell):
+        """Follows the least g values from start_cell down to the goal."""
+        g = self._g
+        if g.get(start_cell, INFINITY) == INFINITY:
+            return None
+        directions = []
+        cell = start_cell
+        while cell != self._goal_cell:
+            best_direction = None
+            best_cell = None
+            best_g = INFINITY
+            for direction, next_cell in self.board.successors(cell):
+                next_g = g.get(next_cell, INFINITY)
+                if next_g < best_g:
+                    best_direction = direction
+                    best_cell = next_cell
+                    best_g = next_g
+            if best_cell is None or best_g >= g[cell]:
+                return None
+            directions.append(best_direction)
+            cell = best_cell
+        return directions
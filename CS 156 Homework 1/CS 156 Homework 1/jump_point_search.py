@@ -0,0 +1,139 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from board_square_type import BoardSquareType
+from direction import Direction
+from food_agent_ai import cell_heuristic, search_target
+from node import Node
+from node_priority_queue import NodePriorityQueue
+
+
+class JumpPointSearch(object):
+    """A* over jump points for 4-connected boards where every move costs 1.
+
+    Instead of queueing every neighbor, the search moves in a straight line
+    until it reaches a square where the optimal path could turn, so open
+    rooms are crossed with a handful of expansions instead of one per
+    square. Paths have the same length as the ones found by A*."""
+
+    name = 'jump_point'
+
+    _turns = {
+        Direction.up: (Direction.left, Direction.right),
+        Direction.down: (Direction.left, Direction.right),
+        Direction.left: (Direction.up, Direction.down),
+        Direction.right: (Direction.up, Direction.down),
+    }
+
+    def __init__(self, board, heuristic):
+        self.board = board
+        self._heuristic = heuristic
+        self.nodes_expanded = 0
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food, or to
+        goal_cell if it is not None. Returns None if it cannot be reached."""
+        board = self.board
+        estimate = cell_heuristic(board, self._heuristic,
+                                  search_target(board, goal_cell))
+        start_node = Node(agent_location=start_cell,
+                          direction=None,
+                          path_cost=0,
+                          cost=0)
+        frontier = NodePriorityQueue(start_node)
+        explored_cells = set()
+
+        nodes_expanded = 0
+        directions = None
+        while frontier:
+            current_node = frontier.pop()
+            current_cell = current_node.get_agent_location()
+            if self._is_goal(current_cell, goal_cell):
+                directions = self.solution(current_node)
+                break
+
+            explored_cells.add(current_cell)
+            nodes_expanded += 1
+            for direction in self._pruned_directions(current_node):
+                jump = self._jump(current_cell, direction, goal_cell)
+                if jump is None:
+                    continue
+                child_cell, distance = jump
+                if child_cell in explored_cells:
+                    continue
+                child_path_cost = current_node.get_path_cost() + distance
+                queued_cost = frontier.get_location_priority(child_cell)
+                if queued_cost is not None and \
+                        queued_cost <= child_path_cost:
+                    continue
+                child_cost = child_path_cost + estimate(child_cell)
+                child = Node(agent_location=child_cell,
+                             direction=direction,
+                             cost=child_cost,
+                             path_cost=child_path_cost,
+                             parent=current_node)
+                if queued_cost is None:
+                    frontier.push(child)
+                elif queued_cost > child_cost:
+                    frontier.set_priority(node=child, new_cost=child_cost)
+        self.nodes_expanded = nodes_expanded
+        return directions
+
+    def _pruned_directions(self, node):
+        """Returns the directions worth jumping in from a node. A node
+        reached by moving in some direction only needs to keep going or
+        turn; turning back can never be shorter."""
+        direction = node.get_direction()
+        if direction is None:
+            return [Direction.up, Direction.down,
+                    Direction.left, Direction.right]
+        first_turn, second_turn = self._turns[direction]
+        return [first_turn, second_turn, direction]
+
+    def _is_goal(self, cell, goal_cell):
+        if goal_cell is None:
+            return self.board.cell_type(cell) == BoardSquareType.food
+        return cell == goal_cell
+
+    def _jump(self, cell, direction, goal_cell):
+        """Moves from cell in direction until reaching a jump point or the
+        goal. Returns (jump point cell, number of moves), or None if a wall
+        is reached first."""
+        board = self.board
+        first_turn, second_turn = self._turns[direction]
+        vertical = direction in (Direction.up, Direction.down)
+        distance = 0
+        while True:
+            previous_cell = cell
+            cell = board.neighbor(cell, direction)
+            if cell is None:
+                return None
+            distance += 1
+            if self._is_goal(cell, goal_cell):
+                return cell, distance
+            # A turn is forced where a side opens up that was blocked beside
+            # the previous square.
+            for turn in (first_turn, second_turn):
+                if board.neighbor(cell, turn) is not None and \
+                        board.neighbor(previous_cell, turn) is None:
+                    return cell, distance
+            # Horizontal moves are only taken at jump points, so a vertical
+            # move also stops wherever a horizontal move leads to one.
+            if vertical:
+                for turn in (first_turn, second_turn):
+                    if self._jump(cell, turn, goal_cell) is not None:
+                        return cell, distance
+
+    @staticmethod
+    def solution(tree):
+        """Returns the list of directions that leads to the jump point at
+        the end of tree, one direction per move."""
+        directions = []
+        current_node = tree
+        parent = current_node.get_parent()
+        while parent is not None:
+            distance = current_node.get_path_cost() - parent.get_path_cost()
+            directions.extend([current_node.get_direction()] * distance)
+            current_node = parent
+            parent = current_node.get_parent()
+        directions.reverse()
+        return directions
@@ -0,0 +1,167 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import os
+import struct
+import sys
+from array import array
+
+from board_distances import breadth_first_distances, row_major_cells
+from board_square_type import BoardSquareType
+
+
+class LandmarkHeuristic(object):
+    """An ALT (A*, landmarks and triangle inequality) heuristic.
+
+    Exact distances from a few landmark squares are precomputed with
+    breadth-first search. For any squares a and b and a landmark l,
+    |d(l, a) - d(l, b)| <= d(a, b), so the largest of these differences is
+    an admissible and consistent estimate that, unlike manhattan, accounts
+    for walls. Called like the heuristics in food_agent.py."""
+
+    DEFAULT_NUM_LANDMARKS = 8
+    FILE_EXTENSION = '.alt'
+    _MAGIC = 'ALT1'
+    _HEADER_FORMAT = '<4s40sIIIc'
+
+    def __init__(self, width, landmarks, tables):
+        """landmarks are row-major square indices (y * width + x), and
+        tables[i] holds the distance from landmarks[i] to each square in
+        row-major order, or -1 if it cannot be reached."""
+        self.width = width
+        self.landmarks = landmarks
+        self.tables = tables
+
+    def __call__(self, p1, p2):
+        width = self.width
+        index_1 = p1.y * width + p1.x
+        index_2 = p2.y * width + p2.x
+        estimate = 0
+        for table in self.tables:
+            distance_1 = table[index_1]
+            distance_2 = table[index_2]
+            if distance_1 < 0 or distance_2 < 0:
+                continue
+            difference = abs(distance_1 - distance_2)
+            if difference > estimate:
+                estimate = difference
+        return estimate
+
+    @classmethod
+    def build(cls, board, num_landmarks=DEFAULT_NUM_LANDMARKS):
+        """Picks landmarks by farthest-point selection, starting from the
+        food, and computes their distance tables."""
+        square_cells = row_major_cells(board)
+        food_location = board.get_food_location()
+        if food_location is not None:
+            seed_cell = board.cell_id(food_location.x, food_location.y)
+        else:
+            seed_cell = cls._first_open_cell(board, square_cells)
+        landmarks = []
+        tables = []
+        if seed_cell is None:
+            return cls(board.width, landmarks, tables)
+
+        '''Distance from each cell to the nearest landmark so far. Before
+        the first landmark it is the distance from the seed, so the first
+        landmark is as far from the food as possible.'''
+        nearest = breadth_first_distances(board, [seed_cell])
+        for i in xrange(num_landmarks):
+            landmark_cell = None
+            farthest = 0
+            for cell in square_cells:
+                if nearest[cell] > farthest:
+                    farthest = nearest[cell]
+                    landmark_cell = cell
+            if landmark_cell is None:
+                break
+            distances = breadth_first_distances(board, [landmark_cell])
+            landmark_location = board.cell_location(landmark_cell)
+            landmarks.append(landmark_location.y * board.width +
+                             landmark_location.x)
+            tables.append(array('i', (distances[cell]
+                                      for cell in square_cells)))
+            if not landmarks[1:]:
+                nearest = distances
+            else:
+                for cell in square_cells:
+                    if 0 <= distances[cell] < nearest[cell]:
+                        nearest[cell] = distances[cell]
+        return cls(board.width, landmarks, tables)
+
+    @staticmethod
+    def _first_open_cell(board, square_cells):
+        for cell in square_cells:
+            if board.cell_type(cell) != BoardSquareType.wall:
+                return cell
+        return None
+
+    @classmethod
+    def for_board_file(cls, board, board_file_path,
+                       num_landmarks=DEFAULT_NUM_LANDMARKS):
+        """Loads the tables stored next to the board file for the current
+        contents of board, or builds and stores them if there are none."""
+        content_hash = board.content_hash()
+        tables_path = cls.tables_path(board_file_path, content_hash)
+        if os.path.exists(tables_path):
+            heuristic = cls.load(tables_path, content_hash)
+            if heuristic is not None and \
+                    len(heuristic.landmarks) >= num_landmarks:
+                return heuristic
+        heuristic = cls.build(board, num_landmarks)
+        try:
+            heuristic.save(tables_path, content_hash)
+        except IOError:
+            # The tables are only a cache, so an unwritable directory just
+            # means they are rebuilt next time.
+            pass
+        return heuristic
+
+    @classmethod
+    def tables_path(cls, board_file_path, content_hash):
+        """Returns where the tables for a board file with the given content
+        hash are stored."""
+        return board_file_path + '.' + content_hash[:16] + \
+            cls.FILE_EXTENSION
+
+    def save(self, tables_path, content_hash):
+        """Writes the landmarks and tables to a file."""
+        num_squares = len(self.tables[0]) if self.tables else 0
+        with open(tables_path, 'wb') as tables_file:
+            tables_file.write(struct.pack(self._HEADER_FORMAT,
+                                          self._MAGIC,
+                                          content_hash,
+                                          self.width,
+                                          num_squares,
+                                          len(self.landmarks),
+                                          sys.byteorder[0]))
+            array('i', self.landmarks).tofile(tables_file)
+            for table in self.tables:
+                table.tofile(tables_file)
+
+    @classmethod
+    def load(cls, tables_path, content_hash):
+        """Reads landmarks and tables written by save. Returns None if the
+        file is not for a board with content_hash."""
+        header_size = struct.calcsize(cls._HEADER_FORMAT)
+        with open(tables_path, 'rb') as tables_file:
+            header = tables_file.read(header_size)
+            if len(header) != header_size:
+                return None
+            magic, stored_hash, width, num_squares, num_landmarks, \
+                byte_order = struct.unpack(cls._HEADER_FORMAT, header)
+            if magic != cls._MAGIC or stored_hash != content_hash:
+                return None
+            landmarks = array('i')
+            tables = []
+            try:
+                landmarks.fromfile(tables_file, num_landmarks)
+                for i in xrange(num_landmarks):
+                    table = array('i')
+                    table.fromfile(tables_file, num_squares)
+                    tables.append(table)
+            except EOFError:
+                return None
+        if byte_order != sys.byteorder[0]:
+            for table in [landmarks] + tables:
+                table.byteswap()
+        return cls(width, list(landmarks), tables)
@@ -0,0 +1,82 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import ctypes
+import mmap
+import struct
+
+from board_square import BoardSquare
+from board_state import BoardState
+from compact_board import CompactBoard
+
+
+'''A .maze file is a header followed by the squares of a CompactBoard, one
+byte each in row-major order including the border of walls, so a mapped
+file can be used as the board's buffer as it is.
+
+Header fields, little-endian: magic, version, width, height, agent x and
+y, food x and y (-1 when there is no food).'''
+FILE_EXTENSION = '.maze'
+MAGIC = 'MAZE'
+VERSION = 1
+HEADER_FORMAT = '<4sIIIiiii'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+
+def write_maze(board_state, maze_file_path):
+    """Writes a board state to a .maze file."""
+    board = board_state.board
+    agent_location = board_state.agent_start_location
+    food_location = board.get_food_location()
+    if food_location is None:
+        food_location = BoardSquare(-1, -1)
+    if isinstance(board, CompactBoard):
+        cells = board.cells
+    else:
+        cells = CompactBoard(board.width, board.height).cells
+        stride = board.width + 2
+        for y in xrange(board.height):
+            row_start = (y + 1) * stride + 1
+            cells[row_start:row_start + board.width] = board.get_row(y)
+    with open(maze_file_path, 'wb') as maze_file:
+        maze_file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION,
+                                    board.width, board.height,
+                                    agent_location.x, agent_location.y,
+                                    food_location.x, food_location.y))
+        maze_file.write(buffer(cells))
+
+
+def open_maze(maze_file_path):
+    """Returns the board state stored in a .maze file. The file is mapped
+    into memory copy-on-write, so its squares are not read or copied up
+    front, processes opening the same file share its pages, and changes to
+    the board are never written back to it. Raises ValueError if the file
+    is not a .maze file this version can read."""
+    with open(maze_file_path, 'rb') as maze_file:
+        header = maze_file.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE:
+            raise ValueError(maze_file_path + ' is not a maze file')
+        magic, version, width, height, agent_x, agent_y, food_x, food_y = \
+            struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC:
+            raise ValueError(maze_file_path + ' is not a maze file')
+        if version != VERSION:
+            raise ValueError(maze_file_path + ' is maze file version ' +
+                             str(version) + ', expected ' + str(VERSION))
+        num_cells = (width + 2) * (height + 2)
+        mapped_file = mmap.mmap(maze_file.fileno(), 0,
+                                access=mmap.ACCESS_COPY)
+    if len(mapped_file) != HEADER_SIZE + num_cells:
+        raise ValueError(maze_file_path + ' should have ' + str(num_cells) +
+                         ' squares for a ' + str(width) + 'x' + str(height) +
+                         ' board')
+    # Views the mapped squares without copying them.
+    cells = (ctypes.c_ubyte * num_cells).from_buffer(mapped_file,
+                                                     HEADER_SIZE)
+    board = CompactBoard(width, height, cells=cells)
+    if food_x >= 0:
+        board.set_food_location(BoardSquare(food_x, food_y))
+    return BoardState(board, agent_x, agent_y)
+
+
+def is_maze_file(file_path):
+    return file_path.endswith(FILE_EXTENSION)
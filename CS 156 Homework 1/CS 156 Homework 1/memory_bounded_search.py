@@ -0,0 +1,139 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from food_agent_ai import cell_heuristic, search_target
+
+
+class IterativeDeepeningAStar(object):
+    """IDA* with a transposition table that fits in a memory limit.
+
+    Each iteration is a depth-first search that skips squares whose path
+    cost plus estimate is over a threshold, which then rises to the least
+    such value. Only the current path is kept, with a bitmap of its squares
+    to avoid cycles, so memory does not grow with the squares explored.
+    What is left of memory_limit after the bitmaps and the path is spent
+    on a table of the least path cost each square has been reached with in
+    the iteration, which prunes repeated visits until it is full. As the
+    path grows, entries are dropped from the table to make room for it.
+    Only a path too long to fit in memory_limit by itself goes over it.
+
+    Squares are expanded again in later iterations, and in the same one
+    when the table is full or a shorter path is found. These are counted in
+    re_expansions, with a second bitmap of the squares expanded so far.
+    With a table much smaller than the squares within reach, the paths to
+    each square are searched again and again, and the time grows
+    exponentially with the length of the path."""
+
+    name = 'ida_star'
+    DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+    '''About how many bytes a table entry takes, including its share of
+    the dict's empty slots.'''
+    TABLE_ENTRY_BYTES = 100
+    '''About how many bytes each square on the path takes: its cell id, its
+    direction, and the generator of its successors.'''
+    PATH_STEP_BYTES = 700
+
+    def __init__(self, board, heuristic, memory_limit=DEFAULT_MEMORY_LIMIT):
+        """memory_limit is the number of bytes the bitmaps, path and table
+        may use. Raises ValueError if it cannot hold the bitmaps."""
+        self.board = board
+        self._heuristic = heuristic
+        self.memory_limit = memory_limit
+        self._bitmap_size = (board.cell_count + 7) // 8
+        self.table_capacity = \
+            (memory_limit - 2 * self._bitmap_size) // self.TABLE_ENTRY_BYTES
+        if self.table_capacity < 0:
+            raise ValueError('The memory limit must be at least ' +
+                             str(2 * self._bitmap_size) +
+                             ' bytes for this board')
+        self.nodes_expanded = 0
+        self.re_expansions = 0
+        self.iterations = 0
+
+    def search(self, start_cell, goal_cell=None):
+        """Returns the directions from start_cell to the food, or to
+        goal_cell if it is not None. Returns None if it cannot be
+        reached."""
+        board = self.board
+        target_location = search_target(board, goal_cell)
+        self.nodes_expanded = 0
+        self.re_expansions = 0
+        self.iterations = 0
+        if target_location is None:
+            return None
+        goal_cell = board.cell_id(target_location.x, target_location.y)
+        if start_cell == goal_cell:
+            return []
+        estimate = cell_heuristic(board, self._heuristic, target_location)
+        expanded = bytearray(self._bitmap_size)
+        threshold = estimate(start_cell)
+        while threshold is not None:
+            self.iterations += 1
+            directions, threshold = self._bounded_search(
+                start_cell, goal_cell, estimate, threshold, expanded)
+            if directions is not None:
+                return directions
+        return None
+
+    def _bounded_search(self, start_cell, goal_cell, estimate, threshold,
+                        expanded):
+        """Runs one iteration. Returns the directions to goal_cell and None
+        if it was found within threshold, or else None and the next
+        threshold, which is None if no square was over this one."""
+        successors = self.board.successors
+        table_capacity = self.table_capacity
+        path_step_entries = self.PATH_STEP_BYTES // self.TABLE_ENTRY_BYTES
+        on_path = bytearray(self._bitmap_size)
+        least_path_costs = {start_cell: 0}
+        next_threshold = None
+        path = [start_cell]
+        directions = []
+        children = [successors(start_cell)]
+        on_path[start_cell >> 3] |= 1 << (start_cell & 7)
+        self._count_expansion(start_cell, expanded)
+        while children:
+            child_path_cost = len(path)
+            table_room = table_capacity - child_path_cost * path_step_entries
+            for direction, child_cell in children[-1]:
+                bit = 1 << (child_cell & 7)
+                if on_path[child_cell >> 3] & bit:
+                    continue
+                cost = child_path_cost + estimate(child_cell)
+                if cost > threshold:
+                    if next_threshold is None or cost < next_threshold:
+                        next_threshold = cost
+                    continue
+                if child_cell == goal_cell:
+                    directions.append(direction)
+                    return directions, None
+                known_path_cost = least_path_costs.get(child_cell)
+                if known_path_cost is not None:
+                    if known_path_cost <= child_path_cost:
+                        continue
+                    least_path_costs[child_cell] = child_path_cost
+                elif len(least_path_costs) < table_room:
+                    least_path_costs[child_cell] = child_path_cost
+                self._count_expansion(child_cell, expanded)
+                on_path[child_cell >> 3] |= bit
+                path.append(child_cell)
+                directions.append(direction)
+                children.append(successors(child_cell))
+                # Any entry can go: the table only saves time.
+                while least_path_costs and \
+                        len(least_path_costs) > table_room - path_step_entries:
+                    least_path_costs.popitem()
+                break
+            else:
+                children.pop()
+                cell = path.pop()
+                on_path[cell >> 3] &= ~(1 << (cell & 7))
+                if directions:
+                    directions.pop()
+        return None, next_threshold
+
+    def _count_expansion(self, cell, expanded):
+        self.nodes_expanded += 1
+        bit = 1 << (cell & 7)
+        if expanded[cell >> 3] & bit:
+            self.re_expansions += 1
+        else:
+            expanded[cell >> 3] |= bit
@@ -4,6 +4,9 @@ __author__ = "Christopher Raleigh and Anthony Ferrero"
 class Node(object):
     """Represents a tree of nodes. Used for searching with A*."""
 
+    __slots__ = ('_agent_location', '_direction', '_path_cost', '_cost',
+                 '_parent')
+
     def __init__(
             self,
             agent_location,
@@ -1,27 +1,43 @@
 __author__ = 'Christopher Raleigh and Anthony Ferrero'
 
-import heapq
+from search_state import SparseCells, cell_table
 
 
 class NodePriorityQueue(object):
-    """A priority queue for nodes used in the A* algorithm."""
+    """A priority queue for nodes used in the A* algorithm.
+
+    Implemented as an indexed binary heap, so changing the priority of a
+    queued node costs O(log n) instead of re-heapifying the whole list."""
 
     class Priority(object):
-        """Allows the priority of a node to change without the priority
-        queue needing to know where it is in its internal list."""
+        """A queued node, its priority and its current index in the heap.
+        Ties on value are broken by insertion order, so the heap order is
+        always well defined."""
+
+        __slots__ = ('value', 'order', 'node', 'index')
 
-        def __init__(self, value):
+        def __init__(self, value, order, node, index):
             self.value = value
+            self.order = order
+            self.node = node
+            self.index = index
 
         def __cmp__(self, other):
-            return isinstance(other, type(self)) and self.value == other.value
+            return cmp(self.value, other.value) or \
+                cmp(self.order, other.order)
+
+        def __lt__(self, other):
+            if self.value == other.value:
+                return self.order < other.order
+            return self.value < other.value
 
     def __init__(self, start_node):
         self._internal_list = []
-        '''For easily checking for membership and accessing agent location
-        priority Maps node agent location (so we don't need to implement
+        '''For easily checking for membership and finding a node's place in
+        the heap. Maps node agent location (so we don't need to implement
         __hash__ for Node) to its associated Priority object'''
         self._priority_map = {}
+        self._push_count = 0
         self.push(start_node)
 
     def __len__(self):
@@ -30,25 +46,240 @@ class NodePriorityQueue(object):
     def __contains__(self, node):
         """Only checks to see if a node is in this queue, not the tuple of
         (priority, node) as might be expected."""
-        return node.get_agent_location() in self._priority_map
+        return self._location(node) in self._priority_map
 
     def push(self, node):
         """Adds a node to the priority queue with a priority equal to
            its cost."""
-        priority = self.Priority(node.get_cost())
-        heapq.heappush(self._internal_list, (priority, node))
-        self._priority_map[node.get_agent_location()] = priority
+        self._push(node, node.get_cost())
 
     def pop(self):
         """Returns a node on the board with the least cost."""
-        ignored_cost, popped_node = heapq.heappop(self._internal_list)
-        del self._priority_map[popped_node.get_agent_location()]
+        heap = self._internal_list
+        popped = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            last.index = 0
+            self._sift_down(0)
+        popped_node = popped.node
+        del self._priority_map[self._location(popped_node)]
         return popped_node
 
+    def peek(self):
+        """Returns a node on the board with the least cost without removing
+        it."""
+        return self._internal_list[0].node
+
     def set_priority(self, node, new_cost):
-        """Replaces a node's priority with a new one."""
-        self._priority_map[node.get_agent_location()].value = new_cost
-        heapq.heapify(self._internal_list)
+        """Replaces a queued node, found by its agent location, with node
+        and changes its priority to new_cost."""
+        priority = self._priority_map[self._location(node)]
+        old_cost = priority.value
+        priority.node = node
+        priority.value = new_cost
+        if new_cost < old_cost:
+            self._sift_up(priority.index)
+        else:
+            self._sift_down(priority.index)
 
     def get_priority(self, node):
-        return self._priority_map[node.get_agent_location()].value
+        return self._priority_map[self._location(node)].value
+
+    def get_location_priority(self, agent_location):
+        """Returns the priority of the node queued with agent_location, or
+        None if there is no such node. Lets a search check the frontier
+        before it creates a node."""
+        priority = self._priority_map.get(agent_location)
+        if priority is None:
+            return None
+        return priority.value
+
+    @staticmethod
+    def _location(node):
+        return node.get_agent_location()
+
+    def _push(self, node, value):
+        heap = self._internal_list
+        priority = self.Priority(value, self._push_count, node, len(heap))
+        self._push_count += 1
+        heap.append(priority)
+        self._priority_map[self._location(node)] = priority
+        self._sift_up(priority.index)
+
+    def _sift_up(self, index):
+        """Moves the entry at index towards the root until its parent is
+        no greater than it."""
+        heap = self._internal_list
+        priority = heap[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if not priority < parent:
+                break
+            heap[index] = parent
+            parent.index = index
+            index = parent_index
+        heap[index] = priority
+        priority.index = index
+
+    def _sift_down(self, index):
+        """Moves the entry at index towards the leaves until neither child
+        is less than it."""
+        heap = self._internal_list
+        size = len(heap)
+        priority = heap[index]
+        child_index = 2 * index + 1
+        while child_index < size:
+            right_index = child_index + 1
+            if right_index < size and heap[right_index] < heap[child_index]:
+                child_index = right_index
+            child = heap[child_index]
+            if not child < priority:
+                break
+            heap[index] = child
+            child.index = index
+            index = child_index
+            child_index = 2 * index + 1
+        heap[index] = priority
+        priority.index = index
+
+
+class CellPriorityQueue(object):
+    """An indexed binary heap of bare cell ids, for searches that keep their
+    nodes in a SearchState, with the same methods and tie breaking as
+    NodePriorityQueue.
+
+    The heap is a list of cells, and each cell's priority, insertion order
+    and place in the heap are kept in tables indexed by cell id made by
+    search_state.cell_table, so no object is made per queued cell. The
+    tables are reused by restart, which only resets the cells left in the
+    heap."""
+
+    def __init__(self, start_cell, start_cost, cell_count):
+        """cell_count is the number of cell ids of the board."""
+        self._heap = []
+        self._values = cell_table(cell_count, 'd', 0.0)
+        self._orders = cell_table(cell_count, 'i', 0)
+        '''The index of each cell in _heap, or -1 if it is not queued.'''
+        self._indices = cell_table(cell_count, 'i', -1)
+        self._push_count = 0
+        self.push(start_cell, start_cost)
+
+    def restart(self, start_cell, start_cost):
+        """Empties the queue and pushes start_cell with a priority of
+        start_cost."""
+        indices = self._indices
+        if isinstance(indices, SparseCells):
+            indices.clear()
+            self._values.clear()
+            self._orders.clear()
+        else:
+            for cell in self._heap:
+                indices[cell] = -1
+        self._heap = []
+        self._push_count = 0
+        self.push(start_cell, start_cost)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, cell):
+        return self._indices[cell] != -1
+
+    def push(self, cell, cost):
+        """Adds a cell to the priority queue with a priority of cost."""
+        heap = self._heap
+        self._values[cell] = cost
+        self._orders[cell] = self._push_count
+        self._push_count += 1
+        heap.append(cell)
+        self._sift_up(len(heap) - 1)
+
+    def pop(self):
+        """Returns a cell with the least priority."""
+        heap = self._heap
+        popped = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        self._indices[popped] = -1
+        return popped
+
+    def peek(self):
+        """Returns a cell with the least priority without removing it."""
+        return self._heap[0]
+
+    def set_priority(self, cell, new_cost):
+        """Changes the priority of a queued cell to new_cost."""
+        old_cost = self._values[cell]
+        self._values[cell] = new_cost
+        if new_cost < old_cost:
+            self._sift_up(self._indices[cell])
+        else:
+            self._sift_down(self._indices[cell])
+
+    def get_location_priority(self, cell):
+        """Returns the priority of a cell, or None if it is not queued."""
+        if self._indices[cell] == -1:
+            return None
+        return self._values[cell]
+
+    def _sift_up(self, index):
+        """Moves the cell at index towards the root until its parent is no
+        greater than it."""
+        heap = self._heap
+        values = self._values
+        orders = self._orders
+        indices = self._indices
+        cell = heap[index]
+        value = values[cell]
+        order = orders[cell]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            parent_value = values[parent]
+            if value > parent_value or \
+                    (value == parent_value and order > orders[parent]):
+                break
+            heap[index] = parent
+            indices[parent] = index
+            index = parent_index
+        heap[index] = cell
+        indices[cell] = index
+
+    def _sift_down(self, index):
+        """Moves the cell at index towards the leaves until neither child
+        is less than it."""
+        heap = self._heap
+        values = self._values
+        orders = self._orders
+        indices = self._indices
+        size = len(heap)
+        cell = heap[index]
+        value = values[cell]
+        order = orders[cell]
+        child_index = 2 * index + 1
+        while child_index < size:
+            child = heap[child_index]
+            child_value = values[child]
+            right_index = child_index + 1
+            if right_index < size:
+                right = heap[right_index]
+                right_value = values[right]
+                if right_value < child_value or \
+                        (right_value == child_value and
+                         orders[right] < orders[child]):
+                    child_index = right_index
+                    child = right
+                    child_value = right_value
+            if child_value > value or \
+                    (child_value == value and orders[child] > order):
+                break
+            heap[index] = child
+            indices[child] = index
+            index = child_index
+            child_index = 2 * index + 1
+        heap[index] = cell
+        indices[cell] = index
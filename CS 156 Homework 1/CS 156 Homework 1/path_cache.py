@@ -0,0 +1,119 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import shelve
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+
+class PathCache(object):
+    """A cache of search results in front of FoodAgentAI.find_path.
+
+    Keys are made by key() from a board's content hash, the engine, and
+    the start and goal squares, so boards with the same squares share
+    results. Each value is the list of directions from the start to the
+    goal, or None if the goal cannot be reached. The most recently used
+    entries are kept in memory, and every entry is also written to an
+    optional shelve file so later runs can reuse it. Calling set_square on
+    a board drops the entries in memory made with its old squares, and its
+    later keys use its new content hash. The shelve file keeps them, as
+    they still hold for boards with those squares."""
+
+    DEFAULT_CAPACITY = 10000
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, store_path=None):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        '''Maps each content hash to the keys in _entries made with it.'''
+        self._keys_by_hash = {}
+        '''Maps each board a key was made for to the content hash the key
+        used, or None once the board has changed.'''
+        self._board_hashes = WeakKeyDictionary()
+        self._store = None
+        if store_path is not None:
+            self._store = shelve.open(store_path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, board, start_location, goal_location, engine_name):
+        """Returns the key for a path on board found by an engine from
+        start_location to goal_location, or to the nearest food if
+        goal_location is None, and starts watching board for changes."""
+        if board not in self._board_hashes:
+            board.add_change_listener(self._board_changed)
+        content_hash = self._board_hashes.get(board)
+        if content_hash is None:
+            content_hash = board.content_hash()
+            self._board_hashes[board] = content_hash
+        goal = None
+        if goal_location is not None:
+            goal = (goal_location.x, goal_location.y)
+        return (content_hash, engine_name, start_location.x, start_location.y,
+                goal)
+
+    def __getitem__(self, key):
+        """Returns the cached directions for a key, counting a hit, or
+        raises KeyError, counting a miss."""
+        entries = self._entries
+        if key in entries:
+            directions = entries.pop(key)
+            entries[key] = directions
+            self.hits += 1
+            return directions
+        if self._store is not None:
+            store_key = self._store_key(key)
+            if store_key in self._store:
+                directions = self._store[store_key]
+                self._remember(key, directions)
+                self.hits += 1
+                return directions
+        self.misses += 1
+        raise KeyError(key)
+
+    def __setitem__(self, key, directions):
+        self._remember(key, directions)
+        if self._store is not None:
+            self._store[self._store_key(key)] = directions
+
+    def invalidate(self, content_hash):
+        """Drops the entries in memory for boards with content_hash. The
+        shelve file is left alone."""
+        for key in self._keys_by_hash.pop(content_hash, ()):
+            del self._entries[key]
+
+    def close(self):
+        """Writes out and closes the shelve file, if there is one."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _remember(self, key, directions):
+        """Adds an entry to memory, evicting the least recently used entry
+        if the cache is full."""
+        entries = self._entries
+        if key in entries:
+            del entries[key]
+        elif len(entries) >= self.capacity:
+            old_key, old_directions = entries.popitem(last=False)
+            self._forget_key(old_key)
+        entries[key] = directions
+        self._keys_by_hash.setdefault(key[0], set()).add(key)
+
+    def _forget_key(self, key):
+        keys = self._keys_by_hash[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_hash[key[0]]
+
+    def _board_changed(self, board, x, y):
+        content_hash = self._board_hashes.get(board)
+        if content_hash is not None:
+            self.invalidate(content_hash)
+            # The next key is made with the board's new content hash.
+            self._board_hashes[board] = None
+
+    @staticmethod
+    def _store_key(key):
+        return ' '.join(str(part) for part in key)
@@ -0,0 +1,215 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import json
+import multiprocessing
+import os
+from Queue import Empty
+from sys import argv
+
+from batch_food_agent import share_board
+from board_state import BoardState
+from compact_board import CompactBoard
+from food_agent_ai import FoodAgentAI
+import board_state_generator
+import food_agent
+
+
+'''Engines whose paths to a given square are always shortest when the
+heuristic is admissible, as every heuristic in food_agent.heuristic_map
+is.'''
+optimal_engine_names = ['a_star', 'jump_point', 'bidirectional',
+                        'd_star_lite', 'distance_field', 'corridor']
+'''(heuristic name, engine name) pairs raced when none are given.'''
+DEFAULT_CONFIGURATIONS = [('euclidean', 'a_star'),
+                          ('made_up', 'a_star'),
+                          ('manhattan', 'a_star'),
+                          ('manhattan', 'bidirectional'),
+                          ('manhattan', 'jump_point')]
+'''How long the portfolio waits for an answer before checking that its
+processes are still running.'''
+POLL_SECONDS = 1.0
+
+
+def print_error(error_message):
+    print('')
+    print(error_message)
+    print('')
+    print('Usage: portfolio_search.py [file name] [statistics file name]')
+    print('\t[statistics file name] -> JSON file of wins by board, read and '
+          'updated (optional)')
+
+
+def configuration_name(configuration):
+    """Returns the name win statistics are kept under for a (heuristic
+    name, engine name) pair."""
+    return '/'.join(configuration)
+
+
+class PortfolioStats(object):
+    """How many races each configuration has won on each board, keyed by
+    the board's content hash, optionally kept in a JSON file."""
+
+    '''Races on a board before only configurations that have won on it are
+    launched.'''
+    LEARNING_RACES = 5
+
+    def __init__(self, path=None):
+        self.path = path
+        '''Maps each board key to a dict of wins by configuration name.'''
+        self.wins = {}
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as stats_file:
+                self.wins = json.load(stats_file)
+
+    def record_win(self, board_key, configuration):
+        board_wins = self.wins.setdefault(board_key, {})
+        name = configuration_name(configuration)
+        board_wins[name] = board_wins.get(name, 0) + 1
+
+    def likely_winners(self, board_key, configurations):
+        """Returns the configurations worth launching on a board, those
+        with the most wins first. Until the board has had LEARNING_RACES
+        races, every configuration is returned; after that, only those that
+        have won on it."""
+        board_wins = self.wins.get(board_key, {})
+
+        def wins(configuration):
+            return board_wins.get(configuration_name(configuration), 0)
+        ranked = sorted(configurations, key=wins, reverse=True)
+        if sum(board_wins.values()) < self.LEARNING_RACES:
+            return ranked
+        return [configuration for configuration in ranked
+                if wins(configuration) > 0]
+
+    def save(self):
+        """Writes the statistics to path, if there is one."""
+        if self.path is None:
+            return
+        with open(self.path, 'w') as stats_file:
+            json.dump(self.wins, stats_file, indent=2, sort_keys=True)
+            stats_file.write('\n')
+
+
+def _race(width, height, shared_cells, start_location, goal_location,
+          configuration, results):
+    """Solves the query with one configuration in a racing process and puts
+    the configuration, directions and nodes expanded on results."""
+    heuristic_name, engine_name = configuration
+    board = CompactBoard(width, height, cells=shared_cells)
+    board_state = BoardState(board, start_location.x, start_location.y)
+    ai = FoodAgentAI(board_state, food_agent.heuristic_map[heuristic_name],
+                     food_agent.engine_map[engine_name])
+    ai.find_path(goal_location)
+    directions = None
+    if not ai.board_is_unsolvable:
+        # Ignore agent start position node.
+        directions = ai.movement_path_list[1:]
+    results.put((configuration, directions, ai.nodes_expanded))
+
+
+class PortfolioSearch(object):
+    """Races several configurations of FoodAgentAI on one board and keeps
+    the first answer.
+
+    Each configuration is a (heuristic name, engine name) pair from
+    food_agent.py. Every configuration is given the same goal square, and
+    all of them find shortest paths to it, so whichever finishes first has
+    a shortest path, and the others are terminated. The squares are
+    copied into shared memory once per race, and every process searches
+    them in place."""
+
+    def __init__(self, configurations=None, stats=None):
+        """stats is an optional PortfolioStats, used to launch only the
+        likely winners on boards it has seen and updated after each race.
+        Raises ValueError for a configuration that is not known or is not
+        optimal."""
+        if configurations is None:
+            configurations = DEFAULT_CONFIGURATIONS
+        for heuristic_name, engine_name in configurations:
+            if heuristic_name not in food_agent.heuristic_map:
+                raise ValueError('Invalid heuristic name "' +
+                                 heuristic_name + '"')
+            if engine_name not in optimal_engine_names:
+                raise ValueError('The engine "' + engine_name +
+                                 '" does not always find shortest paths')
+        self.configurations = [tuple(configuration)
+                               for configuration in configurations]
+        if stats is None:
+            stats = PortfolioStats()
+        self.stats = stats
+        '''After race, the configuration that answered first.'''
+        self.winner = None
+        self.nodes_expanded = 0
+
+    def race(self, board, start_location, goal_location=None):
+        """Returns the directions from start_location to goal_location
+        on a CompactBoard, or None if it cannot be reached. goal_location
+        defaults to the square Board.get_food_location returns, even when
+        another food square is nearer."""
+        if goal_location is None:
+            # Some engines stop at any food and others head for this
+            # square, so without one goal, which answer came first would
+            # decide which food the path ends on.
+            goal_location = board.get_food_location()
+        board_key = board.content_hash()
+        configurations = self.stats.likely_winners(board_key,
+                                                   self.configurations)
+        shared_cells = share_board(board)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(
+            target=_race,
+            args=(board.width, board.height, shared_cells, start_location,
+                  goal_location, configuration, results))
+            for configuration in configurations]
+        for process in processes:
+            process.start()
+        try:
+            while True:
+                try:
+                    configuration, directions, nodes_expanded = \
+                        results.get(timeout=POLL_SECONDS)
+                    break
+                except Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError('Every search process failed')
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+        self.winner = configuration
+        self.nodes_expanded = nodes_expanded
+        self.stats.record_win(board_key, configuration)
+        return directions
+
+
+def main(args):
+    NUM_SUPPORTED_PROGRAM_ARGS = 1
+    NUM_OPTIONAL_PROGRAM_ARGS = 1
+    # Python passes in the name of the executed module as the first argument
+    NUM_EXPECTED_ARGS = NUM_SUPPORTED_PROGRAM_ARGS + 1
+    num_args = len(args)
+    if not NUM_EXPECTED_ARGS <= num_args <= \
+            NUM_EXPECTED_ARGS + NUM_OPTIONAL_PROGRAM_ARGS:
+        print_error('You must enter one argument.')
+        return
+    stats_path = None
+    if num_args > NUM_EXPECTED_ARGS:
+        stats_path = args[2]
+    board_state = board_state_generator.generate_from_file(args[1],
+                                                           compact=True)
+    stats = PortfolioStats(stats_path)
+    portfolio = PortfolioSearch(stats=stats)
+    directions = portfolio.race(board_state.board,
+                                board_state.agent.get_location())
+    stats.save()
+    if directions is None:
+        print('This board is unsolvable')
+    else:
+        print('Shortest path: ' + str(len(directions)) + ' steps')
+    print('Won by ' + configuration_name(portfolio.winner) + ', with ' +
+          str(portfolio.nodes_expanded) + ' nodes expanded')
+
+
+if __name__ == '__main__':
+    main(argv)
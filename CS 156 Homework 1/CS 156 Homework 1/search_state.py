@@ -0,0 +1,116 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+from array import array
+
+NO_CELL = -1
+'''Values of SearchState.closed: a cell not expanded, one expanded in this
+pass of the search, and one expanded only in earlier passes.'''
+OPEN = 0
+CLOSED = 1
+CLOSED_BEFORE = 2
+'''Boards with more cell ids than this keep search tables in SparseCells,
+as arrays of every cell would not fit in memory. It is also below 2 ** 31,
+the most cell ids an array('i') can hold.'''
+SPARSE_CELL_COUNT = 1 << 26
+
+
+class SparseCells(dict):
+    """Stands in for an array indexed by cell id, holding only the cells
+    that were set and giving default for the rest."""
+
+    def __init__(self, default):
+        dict.__init__(self)
+        self.default = default
+
+    def __missing__(self, cell):
+        return self.default
+
+
+def cell_table(cell_count, typecode, default):
+    """Returns a table with an entry of default for each cell id: an array
+    of typecode, or SparseCells if cell_count is over SPARSE_CELL_COUNT."""
+    if cell_count > SPARSE_CELL_COUNT:
+        return SparseCells(default)
+    return array(typecode, [default]) * cell_count
+
+
+class SearchState(object):
+    """The nodes of a search over the cell ids of a board, kept in parallel
+    tables instead of Node objects.
+
+    For each cell, path_costs holds the cost of the best known path to it
+    (-1 if it has not been reached), parents holds the cell it was reached
+    from, directions the move made from there, and closed is CLOSED once
+    it has been expanded. These cost ten bytes per square of the board,
+    and the CellPriorityQueue beside them sixteen more, whether or not the
+    search reaches the square. A Node costs some seventy to a hundred and
+    fifty bytes per square reached, so a search that expands less than
+    about a third of a board can take more memory this way.
+
+    The tables are made once and reused: start resets only the cells the
+    last search reached, so a short search on a large board costs time for
+    the cells it reaches, not for the board."""
+
+    def __init__(self, cell_count):
+        self.path_costs = cell_table(cell_count, 'i', -1)
+        self.parents = cell_table(cell_count, 'i', NO_CELL)
+        self.directions = cell_table(cell_count, 'b', -1)
+        self.closed = cell_table(cell_count, 'b', 0)
+        '''Every cell given a path cost since the last start, for start to
+        reset.'''
+        self.reached = self._new_reached()
+
+    def start(self, start_cell):
+        """Clears the last search and begins one from start_cell."""
+        path_costs = self.path_costs
+        if isinstance(path_costs, SparseCells):
+            path_costs.clear()
+            self.parents.clear()
+            self.directions.clear()
+            self.closed.clear()
+        else:
+            parents = self.parents
+            closed = self.closed
+            for cell in self.reached:
+                path_costs[cell] = -1
+                parents[cell] = NO_CELL
+                closed[cell] = OPEN
+        self.reached = self._new_reached()
+        self.reached.append(start_cell)
+        path_costs[start_cell] = 0
+
+    def _new_reached(self):
+        if isinstance(self.path_costs, SparseCells):
+            # Cell ids of the largest boards do not fit in an int.
+            return []
+        return array('i')
+
+    def reopen(self):
+        """Opens the cells expanded in this pass for the next one, marking
+        them CLOSED_BEFORE."""
+        closed = self.closed
+        cells = self.reached
+        if isinstance(closed, SparseCells):
+            cells = closed.keys()
+        for cell in cells:
+            if closed[cell] == CLOSED:
+                closed[cell] = CLOSED_BEFORE
+
+    def reach(self, cell, parent_cell, direction, path_cost):
+        """Records a path to cell through parent_cell."""
+        if self.path_costs[cell] == -1:
+            self.reached.append(cell)
+        self.path_costs[cell] = path_cost
+        self.parents[cell] = parent_cell
+        self.directions[cell] = direction
+
+    def solution(self, cell):
+        """Returns the directions from the start of the search to cell."""
+        parents = self.parents
+        directions = self.directions
+        solution_list = []
+        while parents[cell] != NO_CELL:
+            solution_list.append(directions[cell])
+            cell = parents[cell]
+        solution_list.reverse()
+        return solution_list
@@ -0,0 +1,51 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import json
+
+
+class SearchStats(object):
+    """Counters from one call of FoodAgentAI.find_path.
+
+    The built in A* and ARA* fill in every counter. Engines only report
+    nodes_expanded, so their other search counters are None, as they are
+    when the path came from the path cache or the connected components
+    showed there is none."""
+
+    def __init__(self):
+        self.nodes_expanded = 0
+        '''Nodes added to the frontier or given a shorter path in it.'''
+        self.nodes_generated = None
+        '''Nodes whose priority in the frontier was lowered.'''
+        self.decrease_keys = None
+        self.peak_frontier_size = None
+        '''Squares in the explored set: the distinct squares expanded. A*
+        expands each square once, so it matches nodes_expanded, but ARA*
+        can expand a square again in a later pass.'''
+        self.explored_size = None
+        self.heuristic_calls = 0
+        self.heuristic_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.path_cache_hit = False
+
+    def record_search(self, nodes_generated, decrease_keys,
+                      peak_frontier_size, explored_size):
+        self.nodes_generated = nodes_generated
+        self.decrease_keys = decrease_keys
+        self.peak_frontier_size = peak_frontier_size
+        self.explored_size = explored_size
+
+    def to_dict(self):
+        return {
+            'nodes_expanded': self.nodes_expanded,
+            'nodes_generated': self.nodes_generated,
+            'decrease_keys': self.decrease_keys,
+            'peak_frontier_size': self.peak_frontier_size,
+            'explored_size': self.explored_size,
+            'heuristic_calls': self.heuristic_calls,
+            'heuristic_seconds': self.heuristic_seconds,
+            'wall_seconds': self.wall_seconds,
+            'path_cache_hit': self.path_cache_hit,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), sort_keys=True)
@@ -0,0 +1,331 @@
+__author__ = "Christopher Raleigh and Anthony Ferrero"
+
+import ctypes
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from itertools import chain
+
+from board import Board
+from board_square import BoardSquare
+from board_square_type import BoardSquareType
+from board_state import BoardState
+from direction import Direction
+
+
+'''A .tiles file is a header followed by the squares of a board cut into
+square tiles, tile after tile in row-major order, with the squares of each
+tile one byte each in row-major order. Tiles past the right or bottom edge
+of the board are filled out with walls.
+
+Header fields, little-endian: magic, version, width, height, tile size,
+agent x and y, food x and y (-1 when there is no food).'''
+FILE_EXTENSION = '.tiles'
+MAGIC = 'TILE'
+VERSION = 1
+HEADER_FORMAT = '<4sIIIIiiii'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+DEFAULT_TILE_SIZE = 256
+DEFAULT_MAX_RESIDENT_TILES = 64
+
+
+class TiledBoard(Board):
+    """A board read from a .tiles file a tile at a time, for boards too
+    large to hold in memory.
+
+    A tile is mapped from the file the first time one of its squares is
+    read, and the least recently used tile is unmapped when more than
+    max_resident_tiles are mapped, so memory stays bounded whatever the
+    size of the board. Tiles are mapped copy-on-write: a tile with a
+    square that was set is kept mapped from then on so the change is not
+    lost, and the file itself is never changed.
+
+    Cell ids are y * width + x, as on a Board. On boards over
+    search_state.SPARSE_CELL_COUNT cells the built in A* keeps its tables
+    in dicts, so memory follows the squares searched; the engines that do
+    the same are listed in food_agent.bounded_engine_names."""
+
+    def __init__(self, tiles_file, width, height, tile_size,
+                 max_resident_tiles=DEFAULT_MAX_RESIDENT_TILES):
+        """tiles_file is the open .tiles file, which the board keeps open."""
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.max_resident_tiles = max_resident_tiles
+        self.tiles_across = -(-width // tile_size)
+        self.tile_misses = 0
+        self._tiles_file = tiles_file
+        '''The mapped tiles that may be unmapped, least recently used
+        first.'''
+        self._resident_tiles = OrderedDict()
+        '''Tiles with a square that was set, which are never unmapped.'''
+        self._changed_tiles = {}
+        self._last_tile_index = None
+        self._last_tile = None
+        self._food_location = None
+        self._content_hash = None
+        self._change_listeners = []
+
+    @property
+    def resident_tile_count(self):
+        """The number of tiles mapped into memory."""
+        return len(self._resident_tiles) + len(self._changed_tiles)
+
+    def _tile(self, tile_index):
+        """Returns the squares of a tile, mapping it if it is not
+        resident."""
+        if tile_index == self._last_tile_index:
+            return self._last_tile
+        tile = self._changed_tiles.get(tile_index)
+        if tile is None:
+            resident_tiles = self._resident_tiles
+            tile = resident_tiles.pop(tile_index, None)
+            if tile is None:
+                self.tile_misses += 1
+                tile = self._map_tile(tile_index)
+                while resident_tiles and \
+                        self.resident_tile_count >= self.max_resident_tiles:
+                    resident_tiles.popitem(last=False)
+            resident_tiles[tile_index] = tile
+        self._last_tile_index = tile_index
+        self._last_tile = tile
+        return tile
+
+    def _map_tile(self, tile_index):
+        tile_bytes = self.tile_size * self.tile_size
+        offset = HEADER_SIZE + tile_index * tile_bytes
+        # Maps must start on a multiple of the allocation granularity.
+        map_offset = offset - offset % mmap.ALLOCATIONGRANULARITY
+        mapped_file = mmap.mmap(self._tiles_file.fileno(),
+                                offset - map_offset + tile_bytes,
+                                access=mmap.ACCESS_COPY, offset=map_offset)
+        # The view keeps the map open until the tile is dropped.
+        return (ctypes.c_ubyte * tile_bytes).from_buffer(
+            mapped_file, offset - map_offset)
+
+    def _square_index(self, x, y):
+        """Returns (tile index, index in tile) of a square."""
+        tile_size = self.tile_size
+        tile_y, y_in_tile = divmod(y, tile_size)
+        tile_x, x_in_tile = divmod(x, tile_size)
+        return (tile_y * self.tiles_across + tile_x,
+                y_in_tile * tile_size + x_in_tile)
+
+    def get_square(self, x, y):
+        """Returns the type of a square."""
+        tile_index, index = self._square_index(x, y)
+        return self._tile(tile_index)[index]
+
+    def get_row(self, y):
+        """Returns the types of the squares of row y as a bytearray."""
+        tile_size = self.tile_size
+        tile_y, y_in_tile = divmod(y, tile_size)
+        row_start = y_in_tile * tile_size
+        first_tile_index = tile_y * self.tiles_across
+        row = bytearray()
+        for tile_x in xrange(self.tiles_across):
+            tile = self._tile(first_tile_index + tile_x)
+            row += bytearray(tile[row_start:row_start + tile_size])
+        del row[self.width:]
+        return row
+
+    def set_square(self, x, y, square_type):
+        """Sets the type of a square."""
+        tile_index, index = self._square_index(x, y)
+        tile = self._tile(tile_index)
+        if tile_index not in self._changed_tiles:
+            del self._resident_tiles[tile_index]
+            self._changed_tiles[tile_index] = tile
+        tile[index] = square_type
+        self._square_changed(x, y)
+
+    def cell_type(self, cell):
+        """Returns the type of the square with a cell id."""
+        y, x = divmod(cell, self.width)
+        return self.get_square(x, y)
+
+    def successors(self, cell):
+        """Yields (direction, cell id) for every square that can be moved to
+        from a cell, in the order up, down, left, right."""
+        width = self.width
+        y, x = divmod(cell, width)
+        get_square = self.get_square
+        wall = BoardSquareType.wall
+        if y > 0 and get_square(x, y - 1) != wall:
+            yield Direction.up, cell - width
+        if y < self.height - 1 and get_square(x, y + 1) != wall:
+            yield Direction.down, cell + width
+        if x > 0 and get_square(x - 1, y) != wall:
+            yield Direction.left, cell - 1
+        if x < width - 1 and get_square(x + 1, y) != wall:
+            yield Direction.right, cell + 1
+
+    def neighbor(self, cell, direction):
+        """Returns the cell id reached by moving from a cell in direction, or
+        None if that move is blocked."""
+        y, x = divmod(cell, self.width)
+        if not self.can_move(x, y, direction):
+            return None
+        return cell + {
+            Direction.up: -self.width,
+            Direction.down: self.width,
+            Direction.left: -1,
+            Direction.right: 1,
+        }[direction]
+
+    def can_move(self, x, y, direction):
+        """Can move from a square in the specified direction."""
+        if direction == Direction.up:
+            y -= 1
+        elif direction == Direction.down:
+            y += 1
+        elif direction == Direction.left:
+            x -= 1
+        elif direction == Direction.right:
+            x += 1
+        else:
+            return False
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self.get_square(x, y) != BoardSquareType.wall
+
+    def get_food_location(self):
+        """Lazily evaluated food location. Matches Board by choosing the
+        food square with the greatest x, then the greatest y."""
+        if self._food_location is None:
+            food_locations = self.get_food_locations()
+            if food_locations:
+                self._food_location = max(
+                    food_locations,
+                    key=lambda location: (location.x, location.y))
+        return self._food_location
+
+    def get_food_locations(self):
+        """Returns the location of every food square, in row-major order.
+        Unlike get_food_location, the squares are read again on each
+        call."""
+        food = chr(BoardSquareType.food)
+        food_locations = []
+        for y in xrange(self.height):
+            row = self.get_row(y)
+            x = row.find(food)
+            while x != -1:
+                food_locations.append(BoardSquare(x, y))
+                x = row.find(food, x + 1)
+        return food_locations
+
+
+def write_tiles(board_state, tiles_file_path, tile_size=DEFAULT_TILE_SIZE):
+    """Writes a board state to a .tiles file, from any kind of board."""
+    board = board_state.board
+    with open(tiles_file_path, 'wb') as tiles_file:
+        tiles_file.write('\0' * HEADER_SIZE)
+        _write_tiles(tiles_file,
+                     (board.get_row(y) for y in xrange(board.height)),
+                     board.width, tile_size)
+        _write_header(tiles_file, board.width, board.height, tile_size,
+                      board_state.agent_start_location,
+                      board.get_food_location())
+
+
+def convert_ascii(ascii_board_file_path, tiles_file_path,
+                  tile_size=DEFAULT_TILE_SIZE):
+    """Writes the board in an ASCII board file to a .tiles file. The file is
+    streamed a row at a time and written a row of tiles at a time, so a
+    board too large to load can be converted. Raises ValueError if the rows
+    are not all the same width."""
+    # Imported here, as board_state_generator opens .tiles files.
+    from board_state_generator import AsciiBoardRows
+    with open(ascii_board_file_path, 'rb') as ascii_board_file:
+        rows = AsciiBoardRows(ascii_board_file, ascii_board_file_path)
+        with open(tiles_file_path, 'wb') as tiles_file:
+            tiles_file.write('\0' * HEADER_SIZE)
+            _write_tiles(tiles_file, rows, rows.width, tile_size)
+            _write_header(tiles_file, rows.width, rows.height, tile_size,
+                          rows.agent_location, rows.food_location)
+
+
+def _write_tiles(tiles_file, rows, width, tile_size):
+    """Writes the tiles of an iterable of rows of square types, a row of
+    tiles at a time. Returns the number of rows."""
+    tiles_across = -(-width // tile_size)
+    padded_width = tiles_across * tile_size
+    wall = chr(BoardSquareType.wall)
+    right_padding = wall * (padded_width - width)
+    height = 0
+    band = []
+    for row in chain(rows, [None]):
+        if row is not None:
+            band.append(str(row) + right_padding)
+            height += 1
+            if len(band) < tile_size:
+                continue
+        elif not band:
+            break
+        band.extend([wall * padded_width] * (tile_size - len(band)))
+        for tile_start in xrange(0, padded_width, tile_size):
+            tiles_file.write(''.join(
+                band_row[tile_start:tile_start + tile_size]
+                for band_row in band))
+        band = []
+    return height
+
+
+def _write_header(tiles_file, width, height, tile_size, agent_location,
+                  food_location):
+    if food_location is None:
+        food_location = BoardSquare(-1, -1)
+    tiles_file.seek(0)
+    tiles_file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, width, height,
+                                 tile_size, agent_location.x,
+                                 agent_location.y, food_location.x,
+                                 food_location.y))
+
+
+def open_tiles(tiles_file_path,
+               max_resident_tiles=DEFAULT_MAX_RESIDENT_TILES):
+    """Returns the board state stored in a .tiles file, on a TiledBoard
+    that maps its tiles as they are used, keeping the file open. Raises
+    ValueError if the file is not a .tiles file this version can read."""
+    tiles_file = open(tiles_file_path, 'rb')
+    try:
+        width, height, tile_size, agent_x, agent_y, food_x, food_y = \
+            _read_header(tiles_file, tiles_file_path)
+    except ValueError:
+        tiles_file.close()
+        raise
+    board = TiledBoard(tiles_file, width, height, tile_size,
+                       max_resident_tiles)
+    if food_x >= 0:
+        board.set_food_location(BoardSquare(food_x, food_y))
+    return BoardState(board, agent_x, agent_y)
+
+
+def _read_header(tiles_file, tiles_file_path):
+    """Returns the header fields after the version, checking them against
+    the size of the file."""
+    header = tiles_file.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE:
+        raise ValueError(tiles_file_path + ' is not a tiles file')
+    fields = struct.unpack(HEADER_FORMAT, header)
+    magic, version, width, height, tile_size = fields[:5]
+    if magic != MAGIC:
+        raise ValueError(tiles_file_path + ' is not a tiles file')
+    if version != VERSION:
+        raise ValueError(tiles_file_path + ' is tiles file version ' +
+                         str(version) + ', expected ' + str(VERSION))
+    if tile_size == 0:
+        raise ValueError(tiles_file_path + ' has tiles of no squares')
+    tile_count = -(-width // tile_size) * -(-height // tile_size)
+    file_size = HEADER_SIZE + tile_count * tile_size * tile_size
+    if os.fstat(tiles_file.fileno()).st_size != file_size:
+        raise ValueError(tiles_file_path + ' should have ' + str(tile_count) +
+                         ' tiles of ' + str(tile_size) + 'x' +
+                         str(tile_size) + ' squares for a ' + str(width) +
+                         'x' + str(height) + ' board')
+    return fields[2:]
+
+
+def is_tiles_file(file_path):
+    return file_path.endswith(FILE_EXTENSION)